@@ -0,0 +1,98 @@
+"""Gemini 응답 캐시
+
+같은 질문(공백/대소문자/끝 문장부호만 다른 경우 포함)과 같은 모델/생성 설정이면 저장해 둔
+응답을 돌려준다. 키는 정규화한 프롬프트와 설정의 sha256 이다. 프로세스 내 TTL+LRU
+캐시를 먼저 보고, 공유 캐시 서버가 설정되어 있으면 다른 파드의 응답도 재사용한다.
+사용자 정보가 들어간 프롬프트는 호출하는 쪽에서 캐시를 건너뛴다(personalized).
+"""
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+
+import shared_cache
+from cache import TTLCache
+from singleflight import SingleFlight
+
+_SPACES = re.compile(r'\s+')
+_TRAILING = re.compile(r'[\s.?!~…]+$')
+
+
+def normalize_prompt(prompt):
+    text = unicodedata.normalize('NFC', prompt or '')
+    text = _SPACES.sub(' ', text).strip().lower()
+    return _TRAILING.sub('', text)
+
+
+class ResponseCache:
+    def __init__(self, name, ttl, max_entries=1000, max_bytes=None, enabled=True):
+        self.name = name
+        self.ttl = ttl
+        self.enabled = enabled
+        self._cache = TTLCache(name, ttl=ttl, max_entries=max_entries, max_bytes=max_bytes)
+        self._flight = SingleFlight(name)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def key(self, model, prompt, config=None):
+        raw = json.dumps([model, normalize_prompt(prompt), config or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """저장된 응답 (없으면 None)"""
+        text = self._cache.get(key)
+        if text is None and shared_cache.backend.is_shared:
+            text = shared_cache.backend.get((self.name, key))
+            if text is not None:
+                self._cache.set(key, text)
+                self._count('shared_hits')
+        self._count('hits' if text is not None else 'misses')
+        return text
+
+    def set(self, key, text):
+        if not text:
+            return
+        self._cache.set(key, text)
+        if shared_cache.backend.is_shared:
+            shared_cache.backend.set((self.name, key), text, self.ttl)
+
+    def get_or_generate(self, key, generate, personalized=False):
+        """캐시된 응답 또는 generate() 결과 -> (응답, 캐시 적중 여부)
+
+        generate() 가 None 을 돌려주거나 예외를 내면 저장하지 않는다. 같은 키의 동시
+        요청은 한 번만 generate() 를 호출한다.
+        """
+        if personalized or not self.enabled:
+            self._count('bypassed')
+            return generate(), False
+        text = self.get(key)
+        if text is not None:
+            return text, True
+
+        def load():
+            text = generate()
+            self.set(key, text)
+            return text
+
+        return self._flight.do(key, load), False
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            counters = {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+            }
+        return dict(counters, local=self._cache.stats(), singleflight=self._flight.stats())
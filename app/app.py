@@ -1,20 +1,47 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, Response
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, text
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-import requests
+from datetime import datetime, timedelta
+import log
+import metrics
+import upstream
+import transport
+import async_transport
+import shared_cache
+from registry import registry
+import suggest
+import stations
+import timetable
+import ai_cache
+from chat_writer import ChatHistoryWriter
+from breaker import CircuitOpenError
+import quota
+from quota import QuotaExceeded
+import chat_history
+import backgrounds
+import health
+import warmer
 from bs4 import BeautifulSoup
 import os
+import re
 import json
 import time
+import asyncio
 import google.generativeai as genai
 import boto3
 from config import Config
-from boto3.dynamodb.conditions import Key
 from dotenv import load_dotenv
 load_dotenv()
 
+log_db = log.get_logger('db')
+log_search = log.get_logger('search')
+log_chatbot = log.get_logger('chatbot')
+log_history = log.get_logger('chat_history')
+log_account = log.get_logger('account')
+log_index = log.get_logger('index')
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI
@@ -25,13 +52,17 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+# 요청/의존성 메트릭 (/metrics)
+metrics.init_app(app)
+
 # 앱 시작 시 테이블 자동 생성 (EKS, Docker, Gunicorn 등 모든 환경에서 동작)
 with app.app_context():
+    metrics.instrument_sqlalchemy(db.engine)
     try:
         db.create_all()
-        print("SQLAlchemy 테이블 생성 시도")
+        log_db.info("SQLAlchemy 테이블 생성 시도")
     except Exception as e:
-        print(f"SQLAlchemy 테이블 생성 오류: {e}")
+        log_db.error("SQLAlchemy 테이블 생성 오류", error=e)
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -66,6 +97,17 @@ dynamodb = boto3.resource(
     aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY
 )
 chat_table = dynamodb.Table(Config.DYNAMODB_TABLE)
+metrics.instrument_boto3(dynamodb.meta.client, 'dynamodb')
+# 대화 기록은 요청 스레드에서 바로 쓰지 않고 백그라운드에서 모아서 저장
+chat_writer = ChatHistoryWriter(
+    dynamodb,
+    Config.DYNAMODB_TABLE,
+    batch_size=Config.CHAT_WRITE_BATCH_SIZE,
+    flush_interval=Config.CHAT_WRITE_FLUSH_INTERVAL,
+    max_queue=Config.CHAT_WRITE_QUEUE_SIZE,
+    max_retries=Config.CHAT_WRITE_MAX_RETRIES,
+)
+history_cache = chat_history.HistoryCache(ttl=Config.CHAT_HISTORY_CACHE_TTL)
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -132,12 +174,14 @@ def chatbot():
 @app.route('/mypage')
 @login_required
 def mypage():
-    # 예매내역 대신 AI 대화내역을 가져옴
-    chat_history = chat_table.query(
-        KeyConditionExpression=Key('user_id').eq(str(current_user.id)),
-        ScanIndexForward=False,
-        Limit=50
-    )['Items']
+    # 예매내역 대신 AI 대화내역을 가져옴 (첫 페이지 미리보기, 이후는 /api/chat_history 커서로)
+    try:
+        chat_history_dicts, chat_next_cursor = history_cache.first_page(
+            chat_table, current_user.id, Config.CHAT_HISTORY_PAGE_SIZE,
+            preview_chars=Config.CHAT_HISTORY_PREVIEW_CHARS)
+    except Exception as e:
+        log_history.error("채팅 기록 조회 오류", error=e)
+        chat_history_dicts, chat_next_cursor = [], None
     favorites = list(Favorite.query.filter_by(user_id=current_user.id).all())
 
     def safe_str(val):
@@ -148,15 +192,6 @@ def mypage():
         except Exception:
             return ''
 
-    chat_history_dicts = [
-        {
-            'id': safe_str(chat['timestamp']),
-            'message': safe_str(chat['message']),
-            'response': safe_str(chat['response']),
-            'timestamp': datetime.fromtimestamp(float(chat['timestamp'])).strftime('%Y-%m-%d %H:%M')
-        }
-        for chat in chat_history
-    ]
     favorites_dicts = [
         {
             'id': safe_str(fav.id),
@@ -168,17 +203,18 @@ def mypage():
         for fav in favorites
     ]
 
-    return render_template('mypage.html', chat_history=chat_history_dicts, favorites=favorites_dicts)
+    return render_template('mypage.html', chat_history=chat_history_dicts, chat_next_cursor=chat_next_cursor,
+                           favorites=favorites_dicts)
 
-@app.route('/search_transportation', methods=['POST'])
-def search_transportation():
-    departure = request.form.get('departure')
-    destination = request.form.get('destination')
-    departure_date = request.form.get('departure_date')
-    transport_type = request.form.get('transport_type', 'srt')
+def parse_search_form(form):
+    """검색 폼 파싱 -> (search_info, bus_date, 오류 메시지)"""
+    departure = form.get('departure')
+    destination = form.get('destination')
+    departure_date = form.get('departure_date')
+    transport_type = form.get('transport_type', 'srt')
 
     if not departure or not destination or not departure_date:
-        return jsonify({'error': '필수 입력이 누락되었습니다.'})
+        return None, None, '필수 입력이 누락되었습니다.'
 
     # 날짜 포맷 처리
     try:
@@ -192,195 +228,138 @@ def search_transportation():
         dep_date = datetime.today().date()
         bus_date = dep_date.strftime('%Y%m%d')
 
-    result = {'search_info': {
+    search_info = {
         'departure': departure,
         'destination': destination,
         'departure_date': departure_date,
         'transport_type': transport_type
-    }}
+    }
+    return search_info, bus_date, None
+
+def parse_search_options(values):
+    """정렬/필터/페이지 옵션 (잘못된 값은 무시하고 기본값 사용)
+
+    dep_from, dep_to: 출발 시각 범위 'HH:MM', max_fare: 최대 요금(원),
+    sort: departure / arrival / fare / duration, page, page_size
+    page/page_size 를 보내지 않으면(페이지 이동이 없는 기존 검색 화면) 전체 결과를 한 번에 준다.
+    """
+    def to_int(name):
+        try:
+            return int(values.get(name))
+        except (TypeError, ValueError):
+            return None
+
+    paged = values.get('page') is not None or values.get('page_size') is not None
+    page_size = to_int('page_size') or Config.SEARCH_PAGE_SIZE
+    return {
+        'dep_from': timetable.parse_minutes(values.get('dep_from')),
+        'dep_to': timetable.parse_minutes(values.get('dep_to')),
+        'max_fare': to_int('max_fare'),
+        'sort': values.get('sort', 'departure'),
+        'page': max(to_int('page') or 1, 1),
+        'page_size': min(max(page_size, 1), Config.SEARCH_MAX_PAGE_SIZE) if paged else None,
+    }
+
+def _select_page(result, records, options):
+    page, total = timetable.select(records, **options)
+    page_size = options['page_size'] or total
+    result['paging'] = {
+        'total': total,
+        'page': options['page'],
+        'page_size': page_size,
+        'has_more': options['page'] * page_size < total,
+        'sort': options['sort'] if options['sort'] in timetable.SORT_KEYS else 'departure',
+    }
+    return page
+
+def log_upstream_error(source, error):
+    """서킷이 열렸거나 할당량이 없어 바로 샘플 데이터로 응답하는 경우는 요청마다 경고를 남기지 않는다"""
+    if isinstance(error, (CircuitOpenError, QuotaExceeded)):
+        log_search.debug(f"{source} API 호출 생략", error=error)
+    else:
+        log_search.warning(f"{source} API 오류", error=error)
+
+def data_age(freshness, fetched=True):
+    """응답에 넣을 데이터 나이 (캐시 저장 후 경과 초, 만료된 캐시 사용 여부). 샘플 데이터면 None"""
+    return freshness.to_dict() if freshness is not None and fetched else None
+
+def build_train_result(result, items, departure, destination, options, freshness=None):
+    """열차 item 목록 -> 화면용 결과 (결과가 없거나 API 오류(items=None)면 샘플 데이터)"""
+    records = timetable.normalize_trains(items)
+    if not records:
+        log_search.debug("열차 API 결과 없음, 샘플 데이터 반환")
+        trains = get_sample_train_data()
+    else:
+        trains = [r.to_train_dict(departure, destination) for r in _select_page(result, records, options)]
+        log_search.debug("열차 검색 결과", total=len(records), returned=len(trains))
+    result['ktx'] = trains
+    result['ktx_srt'] = trains
+    result['data_age'] = data_age(freshness, bool(records))
+    return result
+
+def build_bus_result(result, items, options, freshness=None):
+    """버스 item 목록 -> 화면용 결과 (결과가 없거나 API 오류(items=None)면 샘플 데이터)"""
+    records = timetable.normalize_buses(items)
+    if not records:
+        log_search.debug("버스 API 결과 없음, 샘플 데이터 반환")
+        buses = get_sample_bus_data()
+    else:
+        buses = [r.to_bus_dict() for r in _select_page(result, records, options)]
+        log_search.debug("버스 검색 결과", total=len(records), returned=len(buses))
+    result['bus'] = buses
+    result['data_age'] = data_age(freshness, bool(records))
+    return result
+
+@app.route('/search_transportation', methods=['POST'])
+def search_transportation():
+    search_info, bus_date, error = parse_search_form(request.form)
+    if error:
+        return jsonify({'error': error})
+    options = parse_search_options(request.values)
+
+    departure = search_info['departure']
+    destination = search_info['destination']
+    transport_type = search_info['transport_type']
+    result = {'search_info': search_info}
+    cache_warmer.record_search(departure, destination, transport_type)
 
     if transport_type in ['ktx', 'ktx_srt']:
         # KTX/SRT 조회 로직 (TAGO API 사용)
+        # 출발지/도착지 역 코드 찾기
+        dep_code = registry.station_code(departure)
+        arr_code = registry.station_code(destination)
+
+        if not dep_code or not arr_code:
+            return jsonify({'error': f'지원하지 않는 역입니다. 출발지: {departure}, 도착지: {destination}'})
+
+        # TAGO API 호출 (캐시 우선, 만료된 캐시는 바로 응답 후 백그라운드 재조회), 오류 시 샘플 데이터 반환
+        freshness = transport.Freshness()
         try:
-            # 출발지/도착지 역 코드 찾기
-            dep_code = KTX_STATION_CODES.get(departure)
-            arr_code = KTX_STATION_CODES.get(destination)
-            
-            if not dep_code or not arr_code:
-                return jsonify({'error': f'지원하지 않는 역입니다. 출발지: {departure}, 도착지: {destination}'})
-            
-            # TAGO API 호출
-            base_url = 'http://apis.data.go.kr/1613000/TrainInfoService/getStrtpntAlocFndTrainInfo'
-            params = {
-                'serviceKey': TAGO_API_KEY,
-                'pageNo': 1,
-                'numOfRows': 100,
-                '_type': 'json',
-                'depPlaceId': dep_code,
-                'arrPlaceId': arr_code,
-                'depPlandTime': bus_date
-            }
-            
-            print(f"[DEBUG] TAGO API 요청: {base_url} params={params}")
-            resp = requests.get(base_url, params=params, timeout=10)
-            print(f"[DEBUG] TAGO API 응답 상태: {resp.status_code}")
-            
-            if resp.status_code != 200:
-                print(f"[DEBUG] TAGO API 오류 응답: {resp.text}")
-                # API 오류 시 샘플 데이터 반환
-                trains = get_sample_train_data()
-                result['ktx'] = trains
-                result['ktx_srt'] = trains
-                return jsonify(result)
-            
-            data = resp.json()
-            items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-            
-            if not items:
-                print("[DEBUG] TAGO API에서 결과 없음, 샘플 데이터 반환")
-                trains = get_sample_train_data()
-                result['ktx'] = trains
-                result['ktx_srt'] = trains
-                return jsonify(result)
-            
-            if isinstance(items, dict):
-                items = [items]
-            
-            trains = []
-            for item in items:
-                dep_time = item.get('depPlandTime', '') or item.get('depplandtime', '')
-                arr_time = item.get('arrPlandTime', '') or item.get('arrplandtime', '')
-                price = item.get('adultCharge') or item.get('adultcharge', 50000)
-                if dep_time and arr_time:
-                    dep_time_str = str(dep_time)
-                    arr_time_str = str(arr_time)
-                    if len(dep_time_str) >= 12:
-                        dep_time = f"{dep_time_str[8:10]}:{dep_time_str[10:12]}"
-                    if len(arr_time_str) >= 12:
-                        arr_time = f"{arr_time_str[8:10]}:{arr_time_str[10:12]}"
-                    trains.append({
-                        'type': item.get('trainGradeName', 'KTX') or item.get('traingradename', 'KTX'),
-                        'train_no': item.get('trainNo', '') or item.get('trainno', ''),
-                        'departure_time': dep_time,
-                        'arrival_time': arr_time,
-                        'departure': item.get('depPlaceName') or item.get('depplacename', departure),
-                        'arrival': item.get('arrPlaceName') or item.get('arrplacename', destination),
-                        'price': f"{int(price):,}원",
-                        'available': True,
-                        'seat_info': '예약가능'
-                    })
-            
-            if not trains:
-                trains = get_sample_train_data()
-            
-            result['ktx'] = trains
-            result['ktx_srt'] = trains
-            print(f"KTX/SRT 검색 결과: {len(trains)}개 열차")
-            
+            items = transport.fetch_train_items(dep_code, arr_code, bus_date, freshness=freshness)
         except Exception as e:
-            print(f"[DEBUG] KTX/SRT API 오류: {e}")
-            # 오류 시 샘플 데이터 반환
-            trains = get_sample_train_data()
-            result['ktx'] = trains
-            result['ktx_srt'] = trains
-        
-        return jsonify(result)
-        
+            log_upstream_error("KTX/SRT", e)
+            items = None
+        return jsonify(build_train_result(result, items, departure, destination, options, freshness))
+
     elif transport_type == 'bus':
         # 버스 조회 로직 (API_KEY 사용)
+        # 터미널명으로 터미널 ID 찾기
+        dep_ids = registry.terminal_ids(departure)
+        arr_ids = registry.terminal_ids(destination)
+
+        if not dep_ids or not arr_ids:
+            return jsonify({'error': f'지원하지 않는 터미널입니다. 출발지: {departure}, 도착지: {destination}'})
+
+        log_search.debug("터미널 ID", departure=departure, dep_ids=dep_ids, destination=destination, arr_ids=arr_ids)
+
+        # 버스 API 호출 (캐시 우선, 만료된 캐시는 바로 응답 후 백그라운드 재조회), 오류 시 샘플 데이터 반환
+        freshness = transport.Freshness()
         try:
-            # all_terminal_codes.json에서 터미널 ID 찾기
-            with open(os.path.join(os.path.dirname(__file__), 'all_terminal_codes.json'), encoding='utf-8') as f:
-                terminal_data = json.load(f)
-            
-            # 터미널명으로 터미널 ID 찾기
-            dep_terminal = next((t for t in terminal_data if t['터미널명'] == departure), None)
-            arr_terminal = next((t for t in terminal_data if t['터미널명'] == destination), None)
-            
-            if not dep_terminal or not arr_terminal:
-                return jsonify({'error': f'지원하지 않는 터미널입니다. 출발지: {departure}, 도착지: {destination}'})
-            
-            dep_id = dep_terminal['터미널ID']
-            arr_id = arr_terminal['터미널ID']
-            
-            print(f"[DEBUG] 터미널 ID - 출발지: {departure}({dep_id}), 도착지: {destination}({arr_id})")
-            
-            # 버스 API 호출
-            base_url = 'http://apis.data.go.kr/1613000/ExpBusInfoService/getStrtpntAlocFndExpbusInfo'
-            params = {
-                'serviceKey': API_KEY,
-                'depTerminalId': dep_id,
-                'arrTerminalId': arr_id,
-                'depPlandTime': bus_date,
-                'numOfRows': 100,
-                'pageNo': 1,
-                '_type': 'json'
-            }
-            print(f"[DEBUG] 버스 API 요청: {base_url}")
-            print(f"[DEBUG] 버스 API 파라미터: {params}")
-            print(f"[DEBUG] API_KEY: {API_KEY[:20]}...")
-            resp = requests.get(base_url, params=params, timeout=10)
-            print(f"[DEBUG] 버스 API 응답 상태: {resp.status_code}")
-            print(f"[DEBUG] 버스 API 응답 헤더: {dict(resp.headers)}")
-            
-            if resp.status_code != 200:
-                print(f"[DEBUG] 버스 API 오류 응답: {resp.text}")
-                # API 오류 시 샘플 데이터 반환
-                buses = get_sample_bus_data()
-                result['bus'] = buses
-                return jsonify(result)
-            
-            data = resp.json()
-            print(f"[DEBUG] 버스 API 응답 데이터: {json.dumps(data, indent=2, ensure_ascii=False)[:1000]}")
-            
-            items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-            print(f"[DEBUG] 버스 API items: {items}")
-            
-            if not items:
-                print("[DEBUG] 버스 API에서 결과 없음, 샘플 데이터 반환")
-                buses = get_sample_bus_data()
-                result['bus'] = buses
-                return jsonify(result)
-            
-            if isinstance(items, dict):
-                items = [items]
-            
-            buses = []
-            for item in items:
-                dep_time = item.get('depPlandTime', '')
-                arr_time = item.get('arrPlandTime', '')
-                if dep_time and arr_time:
-                    # 시간 포맷 변환 (YYYYMMDDHHMM -> HH:MM)
-                    dep_time_str = str(dep_time)
-                    arr_time_str = str(arr_time)
-                    
-                    # YYYYMMDDHHMM 형식에서 HH:MM 추출
-                    if len(dep_time_str) >= 10:
-                        dep_time = f"{dep_time_str[8:10]}:{dep_time_str[10:12]}"
-                    if len(arr_time_str) >= 10:
-                        arr_time = f"{arr_time_str[8:10]}:{arr_time_str[10:12]}"
-                    
-                    buses.append({
-                        'company': item.get('companyNm', ''),
-                        'departure_time': dep_time,
-                        'arrival_time': arr_time,
-                        'price': f"{item.get('charge', 25000):,}원",
-                        'available': True
-                    })
-            
-            if not buses:
-                buses = get_sample_bus_data()
-            
-            result['bus'] = buses
-            print(f"버스 검색 결과: {len(buses)}개 버스")
-            
+            items = transport.fetch_bus_items_between(dep_ids, arr_ids, bus_date, freshness=freshness)
         except Exception as e:
-            print(f"[DEBUG] 버스 API 오류: {e}")
-            # 오류 시 샘플 데이터 반환
-            buses = get_sample_bus_data()
-            result['bus'] = buses
-        
-        return jsonify(result)
+            log_upstream_error("버스", e)
+            items = None
+        return jsonify(build_bus_result(result, items, options, freshness))
     else:
         return jsonify({'error': '지원하지 않는 교통수단입니다.'})
 
@@ -421,6 +400,13 @@ def get_sample_bus_data(date=None, dep=None, arr=None):
         })
     return {'header': header, 'buses': buses}
 
+def format_date(date):
+    """'YYYYMMDD' -> 'YYYY-MM-DD'"""
+    try:
+        return datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        return date
+
 # 즐겨찾기 추가
 @app.route('/api/save_favorite', methods=['POST'])
 @login_required
@@ -486,6 +472,41 @@ def update_favorite(favorite_id):
     db.session.commit()
     return jsonify({'success': True, 'message': '즐겨찾기가 수정되었습니다.'})
 
+def build_favorite_result(departure, destination, today, fetched, freshness=None, bus_dicts=False):
+    """즐겨찾기 검색 결과 (fetched: transport.fetch_train_and_bus 결과)
+
+    bus 는 기존 /api/search_from_favorite 형태("HH:MM~HH:MM 회사 버스" 문자열)이고,
+    bus_dicts 면 ktx_srt 처럼 항상 dict 목록이다.
+    """
+    train_records, _ = timetable.select(timetable.normalize_trains(fetched.results.get('train')))
+    bus_records, _ = timetable.select(timetable.normalize_buses(fetched.results.get('bus')))
+    trains = [r.to_train_dict(departure, destination) for r in train_records]
+    if bus_dicts:
+        buses = [r.to_bus_dict() for r in bus_records]
+    else:
+        buses = [r.summary() for r in bus_records]
+
+    # 결과가 없으면 샘플 데이터 반환
+    if not trains:
+        trains = get_sample_train_data()
+    if not buses and bus_dicts:
+        buses = get_sample_bus_data(today.strftime('%Y-%m-%d'), departure, destination)['buses']
+    elif not buses:
+        buses = get_sample_bus_data()
+
+    return {
+        'success': True,
+        'ktx_srt': trains,
+        'bus': buses,
+        'timed_out': fetched.timed_out,
+        'data_age': data_age(freshness, bool(train_records or bus_records)),
+        'search_info': {
+            'departure': departure,
+            'destination': destination,
+            'departure_date': today.strftime('%Y-%m-%d')
+        }
+    }
+
 @app.route('/api/search_from_favorite', methods=['POST'])
 def search_from_favorite():
     """즐겨찾기에서 바로 검색"""
@@ -497,116 +518,99 @@ def search_from_favorite():
         if not departure or not destination:
             return jsonify({'error': '출발지와 도착지가 필요합니다.'})
         
+        cache_warmer.record_search(departure, destination)
+
         # 오늘 날짜로 검색
         today = datetime.today().date()
         bus_date = today.strftime('%Y-%m-%d')
         
-        # KTX/SRT 검색
-        trains = []
-        try:
-            dep_code = KTX_STATION_CODES.get(departure)
-            arr_code = KTX_STATION_CODES.get(destination)
-            
-            if dep_code and arr_code:
-                base_url = 'http://apis.data.go.kr/1613000/TrainInfoService/getStrtpntAlocFndTrainInfo'
-                params = {
-                    'serviceKey': TAGO_API_KEY,
-                    'pageNo': 1,
-                    'numOfRows': 100,
-                    '_type': 'json',
-                    'depPlaceId': dep_code,
-                    'arrPlaceId': arr_code,
-                    'depPlandTime': bus_date
-                }
-                
-                resp = requests.get(base_url, params=params, timeout=10)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-                    
-                    if items:
-                        if isinstance(items, dict):
-                            items = [items]
-                        
-                        for item in items:
-                            dep_time = item.get('depPlandTime', '')
-                            arr_time = item.get('arrPlandTime', '')
-                            if dep_time and arr_time:
-                                dep_time = f"{dep_time[:2]}:{dep_time[2:4]}"
-                                arr_time = f"{arr_time[:2]}:{arr_time[2:4]}"
-                                
-                                trains.append({
-                                    'type': item.get('trainGradeName', 'KTX'),
-                                    'train_no': item.get('trainNo', ''),
-                                    'departure_time': dep_time,
-                                    'arrival_time': arr_time,
-                                    'price': f"{item.get('adultcharge', 50000):,}원",
-                                    'available': True,
-                                    'seat_info': '예약가능'
-                                })
-        except Exception as e:
-            print(f"즐겨찾기 KTX/SRT 검색 오류: {e}")
-        
-        # 버스 검색
-        buses = []
+        # KTX/SRT + 버스 동시 조회 (전체 마감 시간 안에 끝난 쪽만 사용)
+        freshness = transport.Freshness()
+        fetched = transport.fetch_train_and_bus(departure, destination, bus_date, freshness=freshness)
+        return jsonify(build_favorite_result(departure, destination, today, fetched, freshness))
+
+    except Exception:
+        log_search.exception("즐겨찾기 검색 오류")
+        return jsonify({'success': False, 'error': '검색 중 오류가 발생했습니다.'})
+
+@app.route('/api/favorites/search', methods=['POST'])
+@login_required
+def search_favorites():
+    """즐겨찾기 여러 개를 한 번에 검색 (ids 를 주지 않으면 내 즐겨찾기 전체)
+
+    요청: {"ids": [즐겨찾기 ID, ...], "date": "YYYY-MM-DD", "stream": false}
+    경로별 결과는 /api/search_from_favorite 와 같은 모양에 favorite_id 가 붙고, bus 만
+    ktx_srt 처럼 dict 목록(company, departure_time, arrival_time, price 등)이다.
+    stream 이면 경로가 끝나는 대로 event: result 를 보내고 마지막에 event: done 을 보낸다.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        day = datetime.strptime(data['date'], '%Y-%m-%d').date() if data.get('date') else datetime.today().date()
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'})
+    ids = data.get('ids')
+    if ids is not None:
         try:
-            # all_terminal_codes.json에서 터미널 ID 찾기
-            with open(os.path.join(os.path.dirname(__file__), 'all_terminal_codes.json'), encoding='utf-8') as f:
-                terminal_data = json.load(f)
-            # 터미널명으로 터미널 ID 찾기
-            dep_terminal = next((t for t in terminal_data if t['터미널명'] == departure), None)
-            arr_terminal = next((t for t in terminal_data if t['터미널명'] == destination), None)
-            if dep_terminal and arr_terminal:
-                dep_id = dep_terminal['터미널ID']
-                arr_id = arr_terminal['터미널ID']
-                base_url = 'http://apis.data.go.kr/1613000/ExpBusInfoService/getStrtpntAlocFndExpbusInfo'
-                params = {
-                    'serviceKey': API_KEY,
-                    'depTerminalId': dep_id,
-                    'arrTerminalId': arr_id,
-                    'depPlandTime': bus_date,
-                    'numOfRows': 100,
-                    'pageNo': 1,
-                    '_type': 'json'
-                }
-                resp = requests.get(base_url, params=params, timeout=10)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-                    
-                    if items:
-                        if isinstance(items, dict):
-                            items = [items]
-                        
-                        for item in items:
-                            dep_time = item.get('depPlandTime', '')
-                            arr_time = item.get('arrPlandTime', '')
-                            if dep_time and arr_time:
-                                dep_time = f"{dep_time[8:10]}:{dep_time[10:12]}" if len(dep_time) >= 12 else dep_time
-                                arr_time = f"{arr_time[8:10]}:{arr_time[10:12]}" if len(arr_time) >= 12 else arr_time
-                                buses.append(f"{dep_time}~{arr_time} {item.get('companyNm', '')} 버스")
-        except Exception as e:
-            print(f"즐겨찾기 버스 검색 오류: {e}")
-        
-        # 결과가 없으면 샘플 데이터 반환
-        if not trains:
-            trains = get_sample_train_data()
-        if not buses:
-            buses = get_sample_bus_data()
+            ids = [int(i) for i in ids]
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'ids 는 즐겨찾기 ID 목록이어야 합니다.'})
+
+    try:
+        query = Favorite.query.filter_by(user_id=current_user.id)
+        if ids is not None:
+            query = query.filter(Favorite.id.in_(ids))
+        favorites = query.order_by(Favorite.id).limit(Config.FAVORITE_BATCH_MAX).all()
+    except Exception as e:
+        log_db.error("즐겨찾기 조회 오류", error=e)
+        return jsonify({'success': False, 'error': '즐겨찾기를 불러오지 못했습니다.'})
+
+    # 스트리밍 중에는 DB 세션을 쓰지 않도록 필요한 값만 꺼내 둔다
+    routes = [(f.departure, f.arrival) for f in favorites]
+    favorite_ids = [f.id for f in favorites]
+    for departure, destination in routes:
+        cache_warmer.record_search(departure, destination)
+    start = time.monotonic()
+
+    def results():
+        for index, fetched, freshness in transport.fetch_routes(routes, day.strftime('%Y-%m-%d'),
+                                                                Config.FAVORITE_BATCH_DEADLINE,
+                                                                Config.FAVORITE_BATCH_CONCURRENCY):
+            departure, destination = routes[index]
+            result = build_favorite_result(departure, destination, day, fetched, freshness, bus_dicts=True)
+            yield index, dict(result, favorite_id=favorite_ids[index])
+
+    def elapsed_ms():
+        return round((time.monotonic() - start) * 1000)
+
+    if data.get('stream'):
+        def generate():
+            try:
+                for _, result in results():
+                    yield sse_event('result', result)
+            except Exception:
+                log_search.exception("즐겨찾기 일괄 검색 오류")
+                yield sse_event('error', {'success': False, 'error': '검색 중 오류가 발생했습니다.'})
+                return
+            yield sse_event('done', {'success': True, 'count': len(routes), 'elapsed_ms': elapsed_ms()})
+
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # 프록시(nginx ingress) 버퍼링 끄기
+        })
 
+    try:
+        ordered = [None] * len(routes)
+        for index, result in results():
+            ordered[index] = result
         return jsonify({
             'success': True,
-            'ktx_srt': trains,
-            'bus': buses,
-            'search_info': {
-                'departure': departure,
-                'destination': destination,
-                'departure_date': today.strftime('%Y-%m-%d')
-            }
+            'date': day.strftime('%Y-%m-%d'),
+            'count': len(ordered),
+            'results': ordered,
+            'elapsed_ms': elapsed_ms(),
         })
-
-    except Exception as e:
-        print(f"즐겨찾기 검색 오류: {e}")
+    except Exception:
+        log_search.exception("즐겨찾기 일괄 검색 오류")
         return jsonify({'success': False, 'error': '검색 중 오류가 발생했습니다.'})
 
 @app.route('/api/booking/<string:booking_id>')
@@ -621,7 +625,7 @@ def get_booking_detail(booking_id):
         raise NotImplementedError("예매 상세 조회는 현재 구현되지 않았습니다.")
         
     except Exception as e:
-        print(f"예매 정보 조회 오류: {e}")
+        log_account.error("예매 정보 조회 오류", error=e)
         return jsonify({'success': False, 'message': '예매 정보 조회 중 오류가 발생했습니다.'})
 
 @app.route('/update_profile', methods=['POST'])
@@ -643,7 +647,7 @@ def update_profile():
             flash('사용자를 찾을 수 없습니다.', 'error')
 
     except Exception as e:
-        print(f"프로필 업데이트 오류: {e}")
+        log_account.error("프로필 업데이트 오류", error=e)
         flash('프로필 업데이트 중 오류가 발생했습니다.', 'error')
 
     return redirect(url_for('mypage'))
@@ -670,7 +674,7 @@ def change_password():
             return redirect(url_for('mypage'))
 
     except Exception as e:
-        print(f"비밀번호 변경 오류: {e}")
+        log_account.error("비밀번호 변경 오류", error=e)
         flash('비밀번호 변경 중 오류가 발생했습니다.', 'error')
 
     return redirect(url_for('mypage'))
@@ -678,58 +682,176 @@ def change_password():
 # Gemini API 키 설정
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 genai.configure(api_key=GEMINI_API_KEY)
-gemini_model = genai.GenerativeModel('gemini-2.0-flash')
+GEMINI_MODEL_NAME = 'gemini-2.0-flash'
+gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
 
 # TAGO API 키 설정 (국토교통부 열차정보 API)
 TAGO_API_KEY = os.environ.get('TAGO_API_KEY')
 
-# KTX 역 코드 매핑 (실제 TAGO API 역 코드로 업데이트)
-KTX_STATION_CODES = {
-    '서울': 'NAT010000', '용산': 'NAT010032', '노량진': 'NAT010058', '영등포': 'NAT010091',
-    '신도림': 'NAT010106', '청량리': 'NAT130126', '왕십리': 'NAT130104', '옥수': 'NAT130070',
-    '서빙고': 'NAT130036', '광운대': 'NAT130182', '상봉': 'NAT020040', '수서': 'NATH30000',
-    '부산': 'NAT014445', '구포': 'NAT014281', '사상': 'NAT014331', '화명': 'NAT014244',
-    '부전': 'NAT750046', '동래': 'NAT750106', '센텀': 'NAT750161', '신해운대': 'NAT750189',
-    '송정': 'NAT750254', '기장': 'NAT750329', '좌천': 'NAT750412',
-    '대전': 'NAT011668', '서대전': 'NAT030057', '신탄진': 'NAT011524', '흑석리': 'NAT030173',
-    '동대구': 'NAT013271', '대구': 'NAT013239', '서대구': 'NAT013189',
-    '광주송정': 'NAT031857', '광주': 'NAT883012', '서광주': 'NAT882936', '효천': 'NAT882904',
-    '울산(통도사)': 'NATH13717', '북울산': 'NAT750781', '남창': 'NAT750560', '덕하': 'NAT750653',
-    '태화강': 'NAT750726', '효문': 'NAT750760'
+# Gemini 생성 설정 (응답 캐시 키에 포함)
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.8,
+    "top_k": 40,
+    "max_output_tokens": 2048,
 }
+gemini_cache = ai_cache.ResponseCache(
+    'gemini',
+    ttl=Config.GEMINI_CACHE_TTL,
+    max_entries=Config.GEMINI_CACHE_MAX_ENTRIES,
+    max_bytes=Config.GEMINI_CACHE_MAX_BYTES,
+    enabled=Config.GEMINI_CACHE_ENABLED,
+)
+
+# 이메일 주소, 휴대폰 번호
+PERSONAL_INFO_PATTERN = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+|01[016789][-\s.]?\d{3,4}[-\s.]?\d{4}')
+
+def is_personal_message(user, message):
+    """이메일/휴대폰 번호나 로그인한 사용자의 아이디/이름/이메일/전화번호가 들어간 메시지인지"""
+    if PERSONAL_INFO_PATTERN.search(message):
+        return True
+    if user is None:
+        return False
+    values = (getattr(user, field, None) for field in ('username', 'name', 'email', 'phone'))
+    return any(value and len(str(value)) >= 2 and str(value) in message for value in values)
+
+def build_gemini_prompt(user, message):
+    """-> (프롬프트, 사용자 정보 포함 여부). 사용자 정보가 들어간 프롬프트의 응답은
+    다른 사용자/파드와 나누는 응답 캐시에 남기지 않는다"""
+    # (원한다면 사용자 정보 기반 프롬프트 확장 가능, 그 경우에도 personalized=True)
+    return message, is_personal_message(user, message)
 
 def generate_gemini_response(user, message):
-    """Gemini 2.5 Flash를 사용한 AI 응답 생성"""
+    """Gemini 2.5 Flash를 사용한 AI 응답 생성 (같은 질문은 캐시된 응답 사용)"""
+    prompt, personalized = build_gemini_prompt(user, message)
+
+    def generate():
+        with metrics.track_dependency('gemini', 'generate_content'):
+            response = gemini_model.generate_content(prompt, generation_config=GEMINI_GENERATION_CONFIG)
+        # 빈 응답은 캐시하지 않도록 None
+        return response.text.strip() if response and response.text else None
+
     try:
-        # (원한다면 사용자 정보 기반 프롬프트 확장 가능)
-        prompt = message
-        response = gemini_model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.7,
-                "top_p": 0.8,
-                "top_k": 40,
-                "max_output_tokens": 2048,
-            }
-        )
-        if response and response.text:
-            return response.text.strip()
-        else:
-            return "죄송합니다. AI 응답 생성에 실패했습니다."
+        key = gemini_cache.key(GEMINI_MODEL_NAME, prompt, GEMINI_GENERATION_CONFIG)
+        text, _ = gemini_cache.get_or_generate(key, generate, personalized=personalized)
+        return text or "죄송합니다. AI 응답 생성에 실패했습니다."
     except Exception as e:
-        print(f"Gemini API 오류: {e}")
+        log_chatbot.error("Gemini API 오류", error=e)
         return f"AI 서비스 오류: {str(e)}"
 
+def stream_gemini_response(user, message):
+    """Gemini 응답을 생성되는 대로 조각(str)으로 내보낸다
+
+    캐시에 있으면 저장된 응답을 한 번에 내보내고, 끝까지 받은 응답은 캐시에 저장한다.
+    """
+    prompt, personalized = build_gemini_prompt(user, message)
+    key = gemini_cache.key(GEMINI_MODEL_NAME, prompt, GEMINI_GENERATION_CONFIG)
+    if not personalized:
+        cached = gemini_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+    parts = []
+    # 스트림 전체(첫 조각부터 마지막 조각까지)를 한 번의 호출로 기록
+    with metrics.track_dependency('gemini', 'generate_content_stream'):
+        for chunk in gemini_model.generate_content(prompt, generation_config=GEMINI_GENERATION_CONFIG, stream=True):
+            chunk_text = getattr(chunk, 'text', '')
+            if chunk_text:
+                parts.append(chunk_text)
+                yield chunk_text
+    if not personalized:
+        gemini_cache.set(key, ''.join(parts).strip())
+
+def sse_event(event, data):
+    """Server-Sent Events 한 건 (data 는 JSON, 줄바꿈이 있어도 한 줄로 전송)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# 실시간 교통편 추천 키워드 확장
+TRANSPORT_KEYWORDS = ['여행', '추천', '경로', '교통편', '버스', '버스 시간표', '버스 시간']
+
+def parse_transport_query(user_message):
+    """챗봇 메시지 -> (출발지, 도착지, YYYYMMDD). 출발지/도착지를 못 찾으면 None"""
+    # 출발지/도착지/날짜 파싱 강화
+    dep, arr, date = None, None, None
+    # "A에서 B까지" 패턴
+    m = re.search(r'([가-힣]+)[에서|발][ ]*([가-힣]+)[까지|행|도착]', user_message)
+    if m:
+        dep, arr = m.group(1), m.group(2)
+    else:
+        # "A-B" 패턴
+        m2 = re.search(r'([가-힣]+)[-~→\->]+([가-힣]+)', user_message)
+        if m2:
+            dep, arr = m2.group(1), m2.group(2)
+    # 날짜 추출 ("내일", "오늘", "YYYY-MM-DD", "YYYYMMDD")
+    if '내일' in user_message:
+        date = (datetime.today() + timedelta(days=1)).strftime('%Y%m%d')
+    elif '오늘' in user_message:
+        date = datetime.today().strftime('%Y%m%d')
+    else:
+        m3 = re.search(r'(20\d{2}-\d{2}-\d{2})', user_message)
+        if m3:
+            date = m3.group(1).replace('-', '')
+        else:
+            m4 = re.search(r'(20\d{6})', user_message)
+            if m4:
+                date = m4.group(1)
+    if not date:
+        date = datetime.today().strftime('%Y%m%d')
+    if not dep or not arr:
+        return None
+    # strip() 적용해 공백 문제 방지
+    return dep.strip(), arr.strip(), date
+
+def build_transport_answer(dep, arr, date, fetched):
+    """챗봇 교통편 안내 문구 (fetched: transport.fetch_train_and_bus 결과)"""
+    trains = timetable.select(timetable.normalize_trains(fetched.results.get('train')), page_size=3)[0]
+    if not registry.terminal_ids(dep) or not registry.terminal_ids(arr):
+        log_chatbot.warning("터미널명 매칭 실패", dep=dep, arr=arr)
+    # 터미널명 매칭 실패, API 오류, 결과 없음은 샘플 시간표로 안내
+    buses = timetable.select(timetable.normalize_buses(fetched.results.get('bus')), page_size=3)[0]
+    if not buses:
+        sample = get_sample_bus_data(date=datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d'), dep=dep, arr=arr)
+        answer = f"{sample['header']}\n(실제 시간표는 예매사이트에서 확인하세요)"
+        for bus in sample['buses']:
+            answer += f"\n- {bus['departure_time']}~{bus['arrival_time']} {bus['company']} {bus['price']}"
+        return answer
+    answer = f"{dep} → {arr} ({format_date(date)})\n"
+    if trains:
+        answer += "\n[기차]"
+        for t in trains[:2]:
+            answer += f"\n- {t.summary()}"
+    if buses:
+        answer += "\n[고속버스]"
+        for b in buses:
+            answer += f"\n- {b.summary()}"
+    if not trains and not buses:
+        answer += "\n(해당 날짜에 조회된 교통편이 없습니다.)"
+    if fetched.timed_out:
+        answer += "\n(일부 교통편 정보는 응답 지연으로 제외되었습니다.)"
+    return answer
+
+def save_chat_record(user_id, user_message, ai_response):
+    """로그인한 사용자의 대화 기록 저장 (DynamoDB, 백그라운드 일괄 저장)"""
+    try:
+        chat_record = {
+            'user_id': str(user_id),
+            'message': user_message,
+            'response': ai_response,
+            'timestamp': int(time.time())
+        }
+        chat_writer.submit(chat_record)
+        history_cache.append(user_id, chat_record, preview_chars=Config.CHAT_HISTORY_PREVIEW_CHARS)
+    except Exception as e:
+        log_history.error("채팅 기록 저장 오류", error=e)
+
 # AI 대화내역 저장 (DynamoDB)
 @app.route('/api/chatbot', methods=['POST'])
 def chatbot_api():
     """Gemini 2.5 Flash 기반 AI 챗봇 API + 실시간 교통편 추천"""
     try:
-        from datetime import datetime, timedelta
-        import re
         data = request.get_json()
         user_message = data.get('message', '').strip()
-        print(f"[챗봇] 사용자 메시지: {user_message}")
+        log_chatbot.debug("사용자 메시지", length=len(user_message), message=lambda: user_message[:200])
         if not user_message:
             return jsonify({'success': False, 'response': '메시지를 입력해주세요.'})
 
@@ -738,230 +860,224 @@ def chatbot_api():
             today = datetime.today().strftime('%Y-%m-%d')
             return jsonify({'success': True, 'response': f'오늘 날짜는 {today} 입니다.'})
 
-        # 실시간 교통편 추천 키워드 확장
-        transport_keywords = ['여행', '추천', '경로', '교통편', '버스', '버스 시간표', '버스 시간']
-        if any(kw in user_message for kw in transport_keywords):
-            # 출발지/도착지/날짜 파싱 강화
-            dep, arr, date = None, None, None
-            # "A에서 B까지" 패턴
-            m = re.search(r'([가-힣]+)[에서|발][ ]*([가-힣]+)[까지|행|도착]', user_message)
-            if m:
-                dep, arr = m.group(1), m.group(2)
-            else:
-                # "A-B" 패턴
-                m2 = re.search(r'([가-힣]+)[-~→\->]+([가-힣]+)', user_message)
-                if m2:
-                    dep, arr = m2.group(1), m2.group(2)
-            # 날짜 추출 ("내일", "오늘", "YYYY-MM-DD", "YYYYMMDD")
-            if '내일' in user_message:
-                date = (datetime.today() + timedelta(days=1)).strftime('%Y%m%d')
-            elif '오늘' in user_message:
-                date = datetime.today().strftime('%Y%m%d')
-            else:
-                m3 = re.search(r'(20\d{2}-\d{2}-\d{2})', user_message)
-                if m3:
-                    date = m3.group(1).replace('-', '')
-                else:
-                    m4 = re.search(r'(20\d{6})', user_message)
-                    if m4:
-                        date = m4.group(1)
-            if not date:
-                date = datetime.today().strftime('%Y%m%d')
-            if not dep or not arr:
+        if any(kw in user_message for kw in TRANSPORT_KEYWORDS):
+            parsed = parse_transport_query(user_message)
+            if not parsed:
                 ai_response = generate_gemini_response(current_user if current_user.is_authenticated else None, user_message)
                 return jsonify({'success': True, 'response': ai_response})
-            # strip() 적용해 공백 문제 방지
-            dep = dep.strip()
-            arr = arr.strip()
-            # 실시간 교통편 조회
-            trains = []
-            buses = []
-            
-            # KTX/SRT 검색
-            try:
-                dep_code = KTX_STATION_CODES.get(dep)
-                arr_code = KTX_STATION_CODES.get(arr)
-                
-                if dep_code and arr_code:
-                    base_url = 'http://apis.data.go.kr/1613000/TrainInfoService/getStrtpntAlocFndTrainInfo'
-                    params = {
-                        'serviceKey': TAGO_API_KEY,
-                        'pageNo': 1,
-                        'numOfRows': 100,
-                        '_type': 'json',
-                        'depPlaceId': dep_code,
-                        'arrPlaceId': arr_code,
-                        'depPlandTime': date
-                    }
-                    
-                    resp = requests.get(base_url, params=params, timeout=10)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-                        
-                        if items:
-                            if isinstance(items, dict):
-                                items = [items]
-                            
-                            for item in items[:3]:  # 상위 3개만
-                                dep_time = item.get('depPlandTime', '')
-                                arr_time = item.get('arrPlandTime', '')
-                                if dep_time and arr_time:
-                                    dep_time = f"{dep_time[:2]}:{dep_time[2:4]}"
-                                    arr_time = f"{arr_time[:2]}:{arr_time[2:4]}"
-                                    
-                                    trains.append({
-                                        'type': item.get('trainGradeName', 'KTX'),
-                                        'train_no': item.get('trainNo', ''),
-                                        'departure_time': dep_time,
-                                        'arrival_time': arr_time,
-                                        'price': f"{item.get('adultcharge', 50000):,}원",
-                                        'available': True,
-                                        'seat_info': '예약가능'
-                                    })
-            except Exception as e:
-                print(f"챗봇 KTX/SRT 검색 오류: {e}")
-            
-            # 버스 검색
-            try:
-                with open(os.path.join(os.path.dirname(__file__), 'all_terminal_codes.json'), encoding='utf-8') as f:
-                    terminal_data = json.load(f)
-                dep_terminal = next((t for t in terminal_data if t['터미널명'].strip() == dep), None)
-                arr_terminal = next((t for t in terminal_data if t['터미널명'].strip() == arr), None)
-                if not dep_terminal or not arr_terminal:
-                    print(f"[ERROR] 터미널명 매칭 실패: dep={dep}, arr={arr}")
-                    sample = get_sample_bus_data(date=datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d'), dep=dep, arr=arr)
-                    answer = f"{sample['header']}\n(실제 시간표는 예매사이트에서 확인하세요)"
-                    for bus in sample['buses']:
-                        answer += f"\n- {bus['departure_time']}~{bus['arrival_time']} {bus['company']} {bus['price']}"
-                    return jsonify({'success': True, 'response': answer})
-                dep_id = dep_terminal['터미널ID']
-                arr_id = arr_terminal['터미널ID']
-                base_url = 'http://apis.data.go.kr/1613000/ExpBusInfoService/getStrtpntAlocFndExpbusInfo'
-                params = {
-                    'serviceKey': API_KEY,
-                    'depTerminalId': dep_id,
-                    'arrTerminalId': arr_id,
-                    'depPlandTime': date,
-                    'numOfRows': 100,
-                    'pageNo': 1,
-                    '_type': 'json'
-                }
-                print(f"[DEBUG] 버스 API 요청: {base_url}")
-                print(f"[DEBUG] 버스 API 파라미터: {params}")
-                print(f"[DEBUG] API_KEY: {API_KEY[:20]}...")
-                resp = requests.get(base_url, params=params, timeout=10)
-                print(f"[DEBUG] 버스 API 응답 상태: {resp.status_code}")
-                print(f"[DEBUG] 버스 API 응답 헤더: {dict(resp.headers)}")
-                if resp.status_code != 200:
-                    print(f"[DEBUG] 버스 API 오류 응답: {resp.text}")
-                    sample = get_sample_bus_data(date=datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d'), dep=dep, arr=arr)
-                    answer = f"{sample['header']}\n(실제 시간표는 예매사이트에서 확인하세요)"
-                    for bus in sample['buses']:
-                        answer += f"\n- {bus['departure_time']}~{bus['arrival_time']} {bus['company']} {bus['price']}"
-                    return jsonify({'success': True, 'response': answer})
-                data = resp.json()
-                print(f"[DEBUG] 버스 API 응답 데이터: {json.dumps(data, indent=2, ensure_ascii=False)[:1000]}")
-                items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-                print(f"[DEBUG] 버스 API items: {items}")
-                if not items:
-                    print("[DEBUG] 버스 API에서 결과 없음, 샘플 데이터 반환")
-                    sample = get_sample_bus_data(date=datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d'), dep=dep, arr=arr)
-                    answer = f"{sample['header']}\n(실제 시간표는 예매사이트에서 확인하세요)"
-                    for bus in sample['buses']:
-                        answer += f"\n- {bus['departure_time']}~{bus['arrival_time']} {bus['company']} {bus['price']}"
-                    return jsonify({'success': True, 'response': answer})
-                if isinstance(items, dict):
-                    items = [items]
-                for item in items[:3]:  # 상위 3개만
-                    dep_time = item.get('depPlandTime', '')
-                    arr_time = item.get('arrPlandTime', '')
-                    if dep_time and arr_time:
-                        dep_time = f"{dep_time[8:10]}:{dep_time[10:12]}" if len(dep_time) >= 12 else dep_time
-                        arr_time = f"{arr_time[8:10]}:{arr_time[10:12]}" if len(arr_time) >= 12 else arr_time
-                        buses.append(f"{dep_time}~{arr_time} {item.get('companyNm', '')} 버스")
-            except Exception as e:
-                print(f"챗봇 버스 검색 오류: {e}")
-            if not buses:
-                sample = get_sample_bus_data(date=datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d'), dep=dep, arr=arr)
-                answer = f"{sample['header']}\n(실제 시간표는 예매사이트에서 확인하세요)"
-                for bus in sample['buses']:
-                    answer += f"\n- {bus['departure_time']}~{bus['arrival_time']} {bus['company']} {bus['price']}"
-                return jsonify({'success': True, 'response': answer})
-            answer = f"{dep} → {arr} ({format_date(date)})\n"
-            if trains:
-                answer += "\n[기차]"
-                for t in trains[:2]:
-                    answer += f"\n- {t.get('type','')} {t.get('departure_time','')}~{t.get('arrival_time','')} {t.get('price','')}"
-            if buses:
-                answer += "\n[고속버스]"
-                for b in buses:
-                    answer += f"\n- {b}"
-            if not trains and not buses:
-                answer += "\n(해당 날짜에 조회된 교통편이 없습니다.)"
-            return jsonify({'success': True, 'response': answer})
+            dep, arr, date = parsed
+            # 실시간 교통편 조회 (열차/버스 동시 조회, 전체 마감 시간 적용, 안내에 쓰는 상위 3건만)
+            fetched = transport.fetch_train_and_bus(dep, arr, date, limit=3)
+            answer = build_transport_answer(dep, arr, date, fetched)
+            return jsonify({'success': True, 'response': answer, 'timed_out': fetched.timed_out})
 
         # 그 외는 Gemini AI로 처리
         ai_response = generate_gemini_response(current_user if current_user.is_authenticated else None, user_message)
-        print(f"[챗봇] Gemini 응답: {ai_response}")
+        log_chatbot.debug("Gemini 응답", length=len(ai_response), response=lambda: ai_response[:200])
 
         # (로그인한 경우 대화 기록 저장)
         if current_user.is_authenticated:
-            try:
-                chat_record = {
-                    'user_id': str(current_user.id),
-                    'message': user_message,
-                    'response': ai_response,
-                    'timestamp': int(time.time())
-                }
-                chat_table.put_item(Item=chat_record)
-            except Exception as e:
-                print(f"채팅 기록 저장 오류: {e}")
+            save_chat_record(current_user.id, user_message, ai_response)
 
         return jsonify({'success': True, 'response': ai_response})
 
-    except Exception as e:
-        print(f"[챗봇] 챗봇 API 오류: {e}")
+    except Exception:
+        log_chatbot.exception("챗봇 API 오류")
+        return jsonify({'success': False, 'response': 'AI 서비스 오류가 발생했습니다.'})
+
+# ---- 비동기 검색 엔드포인트 ----
+# Flask async 뷰는 요청마다 이벤트 루프를 하나 띄워 실행한다. 요청 안의 외부 API 호출(열차, 버스
+# 터미널 조합)은 스레드 없이 동시에 대기하고, 블로킹 SDK(Gemini, DynamoDB)는 to_thread 로 넘긴다.
+
+@app.route('/async/search_transportation', methods=['POST'])
+async def search_transportation_async():
+    """/search_transportation 의 비동기 버전 (같은 입력/응답 형식)"""
+    search_info, bus_date, error = parse_search_form(request.form)
+    if error:
+        return jsonify({'error': error})
+    options = parse_search_options(request.values)
+
+    departure = search_info['departure']
+    destination = search_info['destination']
+    transport_type = search_info['transport_type']
+    result = {'search_info': search_info}
+    cache_warmer.record_search(departure, destination, transport_type)
+
+    if transport_type in ['ktx', 'ktx_srt']:
+        dep_code = registry.station_code(departure)
+        arr_code = registry.station_code(destination)
+        if not dep_code or not arr_code:
+            return jsonify({'error': f'지원하지 않는 역입니다. 출발지: {departure}, 도착지: {destination}'})
+        freshness = transport.Freshness()
+        try:
+            items = await async_transport.fetch_train_items(dep_code, arr_code, bus_date, freshness=freshness)
+        except Exception as e:
+            log_upstream_error("KTX/SRT", e)
+            items = None
+        return jsonify(build_train_result(result, items, departure, destination, options, freshness))
+
+    elif transport_type == 'bus':
+        dep_ids = registry.terminal_ids(departure)
+        arr_ids = registry.terminal_ids(destination)
+        if not dep_ids or not arr_ids:
+            return jsonify({'error': f'지원하지 않는 터미널입니다. 출발지: {departure}, 도착지: {destination}'})
+        freshness = transport.Freshness()
+        try:
+            items = await async_transport.fetch_bus_items_between(dep_ids, arr_ids, bus_date, freshness=freshness)
+        except Exception as e:
+            log_upstream_error("버스", e)
+            items = None
+        return jsonify(build_bus_result(result, items, options, freshness))
+    else:
+        return jsonify({'error': '지원하지 않는 교통수단입니다.'})
+
+@app.route('/api/async/search_from_favorite', methods=['POST'])
+async def search_from_favorite_async():
+    """/api/search_from_favorite 의 비동기 버전"""
+    try:
+        data = request.get_json()
+        departure = data.get('departure')
+        destination = data.get('destination')
+        if not departure or not destination:
+            return jsonify({'error': '출발지와 도착지가 필요합니다.'})
+        cache_warmer.record_search(departure, destination)
+
+        today = datetime.today().date()
+        freshness = transport.Freshness()
+        fetched = await async_transport.fetch_train_and_bus(departure, destination, today.strftime('%Y-%m-%d'),
+                                                            freshness=freshness)
+        return jsonify(build_favorite_result(departure, destination, today, fetched, freshness))
+
+    except Exception:
+        log_search.exception("즐겨찾기 검색 오류")
+        return jsonify({'success': False, 'error': '검색 중 오류가 발생했습니다.'})
+
+@app.route('/api/async/chatbot', methods=['POST'])
+async def chatbot_api_async():
+    """/api/chatbot 의 비동기 버전"""
+    try:
+        data = request.get_json()
+        user_message = data.get('message', '').strip()
+        if not user_message:
+            return jsonify({'success': False, 'response': '메시지를 입력해주세요.'})
+
+        if re.search(r'(오늘|지금|현재)[\s]*(날짜|date)', user_message):
+            today = datetime.today().strftime('%Y-%m-%d')
+            return jsonify({'success': True, 'response': f'오늘 날짜는 {today} 입니다.'})
+
+        user = current_user if current_user.is_authenticated else None
+        parsed = parse_transport_query(user_message) if any(kw in user_message for kw in TRANSPORT_KEYWORDS) else None
+        if parsed:
+            dep, arr, date = parsed
+            fetched = await async_transport.fetch_train_and_bus(dep, arr, date, limit=3)
+            answer = build_transport_answer(dep, arr, date, fetched)
+            return jsonify({'success': True, 'response': answer, 'timed_out': fetched.timed_out})
+
+        # Gemini SDK 의 비동기 클라이언트는 처음 만든 이벤트 루프에 묶이므로 동기 호출을 스레드로 실행
+        ai_response = await asyncio.to_thread(generate_gemini_response, user, user_message)
+        if user is not None and not any(kw in user_message for kw in TRANSPORT_KEYWORDS):
+            await asyncio.to_thread(save_chat_record, user.id, user_message, ai_response)
+        return jsonify({'success': True, 'response': ai_response})
+
+    except Exception:
+        log_chatbot.exception("챗봇 API 오류")
         return jsonify({'success': False, 'response': 'AI 서비스 오류가 발생했습니다.'})
 
+@app.route('/api/chatbot/stream', methods=['POST'])
+def chatbot_stream():
+    """/api/chatbot 의 스트리밍 버전 (text/event-stream)
+
+    event: chunk {'text'} 를 생성되는 대로 보내고, 마지막에 event: done {'response'} 를 보낸다.
+    교통편 안내/날짜 질문처럼 Gemini 를 쓰지 않는 응답은 done 한 건만 보낸다.
+    대화 기록은 스트림이 끝까지 전송된 뒤에 저장한다.
+    """
+    data = request.get_json(silent=True) or {}
+    user_message = (data.get('message') or '').strip()
+    user = current_user._get_current_object() if current_user.is_authenticated else None
+
+    def single(response, **extra):
+        return Response(sse_event('done', dict({'success': True, 'response': response}, **extra)),
+                        mimetype='text/event-stream')
+
+    if not user_message:
+        return Response(sse_event('done', {'success': False, 'response': '메시지를 입력해주세요.'}),
+                        mimetype='text/event-stream')
+    if re.search(r'(오늘|지금|현재)[\s]*(날짜|date)', user_message):
+        return single(f"오늘 날짜는 {datetime.today().strftime('%Y-%m-%d')} 입니다.")
+
+    is_transport = any(kw in user_message for kw in TRANSPORT_KEYWORDS)
+    parsed = parse_transport_query(user_message) if is_transport else None
+    if parsed:
+        dep, arr, date = parsed
+        fetched = transport.fetch_train_and_bus(dep, arr, date, limit=3)
+        return single(build_transport_answer(dep, arr, date, fetched), timed_out=fetched.timed_out)
+
+    def generate():
+        parts = []
+        try:
+            for chunk in stream_gemini_response(user, user_message):
+                parts.append(chunk)
+                yield sse_event('chunk', {'text': chunk})
+        except Exception as e:
+            log_chatbot.error("Gemini API 오류", error=e)
+            yield sse_event('error', {'success': False, 'response': f"AI 서비스 오류: {str(e)}"})
+            return
+        ai_response = ''.join(parts).strip() or "죄송합니다. AI 응답 생성에 실패했습니다."
+        yield sse_event('done', {'success': True, 'response': ai_response})
+        # 클라이언트가 중간에 끊으면 여기까지 오지 않으므로 완성된 대화만 저장된다
+        if user is not None and not is_transport:
+            save_chat_record(user.id, user_message, ai_response)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # 프록시(nginx ingress) 버퍼링 끄기
+    })
+
 @app.route('/api/chat_history')
 @login_required
 def get_chat_history():
-    """사용자의 채팅 기록 조회"""
+    """사용자의 채팅 기록 조회 (최신순, ?limit=&cursor= 로 이어서 조회)"""
     try:
-        from boto3.dynamodb.conditions import Key
-        history = list(chat_table.query(
-            KeyConditionExpression=Key('user_id').eq(str(current_user.id)),
-            ScanIndexForward=False,
-            Limit=50
-        )['Items'])
-        
-        chat_data = []
-        for chat in history:
-            # timestamp가 decimal.Decimal일 수 있으므로 float으로 변환
-            ts = chat['timestamp']
-            try:
-                ts_val = float(ts)
-            except Exception:
-                ts_val = 0
-            chat_data.append({
-                'message': chat['message'],
-                'response': chat['response'],
-                'timestamp': datetime.fromtimestamp(ts_val).strftime('%Y-%m-%d %H:%M')
-            })
-        
+        limit = request.args.get('limit', Config.CHAT_HISTORY_PAGE_SIZE, type=int)
+        limit = min(max(limit, 1), Config.CHAT_HISTORY_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        if cursor:
+            chat_data, next_cursor = chat_history.query_page(
+                chat_table, current_user.id, limit, cursor=cursor,
+                preview_chars=Config.CHAT_HISTORY_PREVIEW_CHARS)
+        else:
+            # 최신 목록은 사용자별 캐시 (새 기록 저장 시 갱신)
+            chat_data, next_cursor = history_cache.first_page(
+                chat_table, current_user.id, limit,
+                preview_chars=Config.CHAT_HISTORY_PREVIEW_CHARS)
         return jsonify({
             'success': True,
-            'history': chat_data
+            'history': chat_data,
+            'next_cursor': next_cursor
         })
-        
+
+    except chat_history.InvalidCursor:
+        return jsonify({'success': False, 'history': [], 'message': '잘못된 커서입니다.'}), 400
     except Exception as e:
-        print(f"채팅 기록 조회 오류: {e}")
+        log_history.error("채팅 기록 조회 오류", error=e)
         return jsonify({
             'success': False,
             'history': []
         })
 
+@app.route('/api/chat_history/<chat_id>')
+@login_required
+def get_chat_conversation(chat_id):
+    """대화 한 건 전체 내용"""
+    try:
+        chat = chat_history.get_conversation(chat_table, current_user.id, chat_id)
+    except Exception as e:
+        log_history.error("채팅 기록 조회 오류", error=e)
+        return jsonify({'success': False, 'message': '대화 기록 조회 중 오류가 발생했습니다.'})
+    if chat is None:
+        return jsonify({'success': False, 'message': '대화 기록을 찾을 수 없습니다.'}), 404
+    return jsonify({'success': True, 'chat': chat})
+
 @app.route('/redirect_booking')
 def redirect_booking():
     """외부 예매 사이트로 리다이렉트"""
@@ -990,7 +1106,7 @@ def create_sample_booking():
         raise NotImplementedError("샘플 예매 데이터 생성은 현재 구현되지 않았습니다.")
         
     except Exception as e:
-        print(f"샘플 데이터 생성 오류: {e}")
+        log_db.error("샘플 데이터 생성 오류", error=e)
         return jsonify({'success': False, 'message': '샘플 데이터 생성 중 오류가 발생했습니다.'})
 
 # 관리자용 데이터베이스 초기화
@@ -1004,9 +1120,9 @@ def init_database():
         # 실제 MongoDB는 컬렉션 생성 시 데이터베이스 존재 여부를 확인하지 않으므로 오류 발생 시 무시
         try:
             db.create_all() # SQLAlchemy 테이블 생성
-            print("SQLAlchemy 테이블 생성 시도")
+            log_db.info("SQLAlchemy 테이블 생성 시도")
         except Exception as e:
-            print(f"SQLAlchemy 테이블 생성 오류 (이미 존재할 수 있음): {e}")
+            log_db.warning("SQLAlchemy 테이블 생성 오류 (이미 존재할 수 있음)", error=e)
 
         try:
             dynamodb.create_table(
@@ -1024,9 +1140,9 @@ def init_database():
                     'WriteCapacityUnits': 5
                 }
             )
-            print("DynamoDB 테이블 생성 시도")
+            log_db.info("DynamoDB 테이블 생성 시도")
         except Exception as e:
-            print(f"DynamoDB 테이블 생성 오류 (이미 존재할 수 있음): {e}")
+            log_db.warning("DynamoDB 테이블 생성 오류 (이미 존재할 수 있음)", error=e)
 
         return jsonify({'success': True, 'message': '데이터베이스가 초기화되었습니다.'})
     except Exception as e:
@@ -1047,7 +1163,7 @@ def internal_error(error):
         # 또는 데이터베이스 연결 방식에 따라 다르게 처리
         pass # MongoDB에서는 세션 관리가 없으므로 이 부분은 무시
     except Exception as e:
-        print(f"데이터베이스 세션 롤백 오류: {e}")
+        log_db.error("데이터베이스 세션 롤백 오류", error=e)
     return render_template('500.html'), 500
 
 # 컨텍스트 프로세서 - 템플릿에서 사용할 전역 변수
@@ -1061,74 +1177,105 @@ def inject_global_vars():
 
 API_KEY = os.environ.get('API_KEY')  # URL-encoded 인증키 사용
 
-# 터미널 코드 로드
-with open(os.path.join(os.path.dirname(__file__), 'all_terminal_codes.json'), encoding='utf-8') as f:
-    TERMINALS = json.load(f)
+# 터미널/역 코드는 registry 모듈에서 앱 시작 시 한 번 로드
+place_index = suggest.build_index(registry)
+
+# 열차역 카탈로그 (외부 API 실패 시 registry 의 KTX 역 코드표로 대체)
+station_catalogue = stations.StationCatalogue(
+    stations.CITY_CODES,
+    ttl=Config.STATION_CATALOGUE_TTL,
+    refresh_interval=Config.STATION_CATALOGUE_REFRESH_INTERVAL,
+    snapshot_path=Config.STATION_SNAPSHOT_PATH,
+    max_staleness=Config.STATION_CATALOGUE_MAX_STALENESS,
+    fallback=[{'name': name, 'code': code} for name, code in registry.station_codes.items()]
+)
+
+def _rebuild_place_index(station_list):
+    # 카탈로그가 갱신되면 자동완성 색인에도 반영
+    global place_index
+    place_index = suggest.build_index(registry, extra_stations=[s['name'] for s in station_list])
+
+station_catalogue.on_update = _rebuild_place_index
+
+# ---- 인기 경로 시간표 예열 ----
+def popular_favorite_routes(limit):
+    """즐겨찾기에 많이 등록된 (출발지, 도착지, 교통수단, 등록 수)"""
+    try:
+        with app.app_context():
+            count = func.count(Favorite.id)
+            rows = (db.session.query(Favorite.departure, Favorite.arrival, Favorite.transport_type, count)
+                    .group_by(Favorite.departure, Favorite.arrival, Favorite.transport_type)
+                    .order_by(count.desc())
+                    .limit(limit)
+                    .all())
+    except Exception as e:
+        log_db.warning("즐겨찾기 경로 집계 오류", error=e)
+        return []
+    return [tuple(row) for row in rows]
+
+cache_warmer = warmer.CacheWarmer(
+    popular_favorite_routes,
+    Config.WARMER_INTERVAL,
+    days=Config.WARMER_DAYS,
+    top_routes=Config.WARMER_TOP_ROUTES,
+    budget=Config.WARMER_BUDGET,
+    peak_hours=warmer.parse_hours(Config.WARMER_PEAK_HOURS),
+)
+
+@app.before_request
+def _start_cache_warmer():
+    # gunicorn 워커마다 첫 요청 때 예열 스레드 시작
+    cache_warmer.start()
 
 @app.route('/api/stations')
 def get_stations():
+    """열차역 목록 (캐시된 카탈로그, 백그라운드 갱신)"""
     try:
-        base_url = 'http://apis.data.go.kr/1613000/TrainInfoService/getCtyAcctoTrainSttnList'
-        api_key = TAGO_API_KEY
-        print("[DEBUG] TAGO_API_KEY:", api_key)
-        stations = []
-        city_codes = [11, 21, 25, 24, 22, 26]  # 서울, 부산, 대전, 광주, 대구, 울산
-        for city_code in city_codes:
-            params = {
-                'serviceKey': api_key,
-                'pageNo': 1,
-                'numOfRows': 100,
-                '_type': 'json',
-                'cityCode': city_code
-            }
-            print(f"[DEBUG] API 요청: {base_url} params={params}")
-            resp = requests.get(base_url, params=params, timeout=10)
-            print("[DEBUG] API 응답:", resp.text[:500])
-            data = resp.json()
-            items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-            if isinstance(items, dict):
-                items = [items]
-            for item in items:
-                stations.append({
-                    'name': item.get('stationName') or item.get('nodename'),
-                    'code': item.get('stationCode') or item.get('nodeid')
-                })
-        # 중복 제거 (역 이름 기준)
-        unique_stations = {s['name']: s for s in stations}.values()
-        return jsonify({'success': True, 'stations': list(unique_stations)})
+        station_list = station_catalogue.get()
+        return jsonify({'success': True, 'stations': station_list, 'catalogue': station_catalogue.info()})
     except Exception as e:
-        print(f"[DEBUG] 역 목록 API 오류: {e}")
+        log_search.error("역 목록 API 오류", error=e)
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/bus_terminals')
 def get_bus_terminals():
     """버스 터미널 목록 제공"""
     try:
-        # all_terminal_codes.json 파일에서 터미널 목록 로드
-        with open(os.path.join(os.path.dirname(__file__), 'all_terminal_codes.json'), encoding='utf-8') as f:
-            terminals = json.load(f)
-        
-        # 터미널명으로 정렬
-        terminals.sort(key=lambda x: x['터미널명'])
-        
+        # 터미널명으로 정렬된 목록 (registry 에서 미리 정렬)
         return jsonify({
-            'success': True, 
-            'terminals': terminals
+            'success': True,
+            'terminals': registry.terminals_sorted
         })
     except Exception as e:
-        print(f"[DEBUG] 버스 터미널 목록 로드 오류: {e}")
+        log_search.error("버스 터미널 목록 로드 오류", error=e)
         return jsonify({
             'success': False, 
             'error': str(e),
             'terminals': []
         })
 
+@app.route('/api/places/suggest')
+def suggest_places():
+    """역/터미널 이름 자동완성 (접두사 및 초성 검색)"""
+    query = request.args.get('q', '').strip()
+    place_type = request.args.get('type')
+    if place_type not in ('station', 'terminal'):
+        place_type = None
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    return jsonify({
+        'success': True,
+        'query': query,
+        'suggestions': place_index.suggest(query, kind=place_type, limit=limit)
+    })
+
 @app.route('/bus', methods=['GET', 'POST'])
 def bus():
     results = []
     error = None
-    # all_terminal_codes.json에서 터미널명 목록 가져오기
-    terminal_names = sorted([t['터미널명'] for t in TERMINALS])
+    terminal_names = registry.terminal_names
     
     if request.method == 'POST':
         dep = request.form['departure']
@@ -1136,40 +1283,18 @@ def bus():
         date = request.form['date'].replace('-', '')  # YYYYMMDD
         
         # 터미널명으로 터미널 ID 찾기
-        dep_terminal = next((t for t in TERMINALS if t['터미널명'] == dep), None)
-        arr_terminal = next((t for t in TERMINALS if t['터미널명'] == arr), None)
-        
-        if not dep_terminal or not arr_terminal:
+        dep_id = registry.terminal_id(dep)
+        arr_id = registry.terminal_id(arr)
+
+        if not dep_id or not arr_id:
             error = '출발지 또는 도착지 터미널명이 올바르지 않습니다.'
         else:
-            dep_id = dep_terminal['터미널ID']
-            arr_id = arr_terminal['터미널ID']
-            
-            base_url = 'http://apis.data.go.kr/1613000/ExpBusInfoService/getStrtpntAlocFndExpbusInfo'
-            params = {
-                'depTerminalId': dep_id,
-                'arrTerminalId': arr_id,
-                'depPlandTime': date,
-                'numOfRows': 100,
-                'pageNo': 1,
-                '_type': 'json'
-            }
-            url = f"{base_url}?serviceKey={API_KEY}"
             try:
-                resp = requests.get(url, params=params, timeout=10)
-                with open("bus_api_debug.txt", "w", encoding="utf-8") as f:
-                    f.write(resp.text)
-                try:
-                    data = resp.json()
-                except Exception:
-                    error = f'API 응답이 JSON이 아님: {resp.text[:500]}'
-                    return render_template('bus.html', results=[], error=error, terminals=terminal_names)
-                items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
+                # 페이지 나눔/단건 item 처리는 transport.ItemPager 가 맡는다 (캐시 공유)
+                items = transport.fetch_bus_items(dep_id, arr_id, date)
                 if not items:
                     error = '조회 결과가 없습니다.'
                 else:
-                    if isinstance(items, dict):
-                        items = [items]
                     for item in items:
                         results.append({
                             'depTime': item.get('depPlandTime', ''),
@@ -1191,8 +1316,8 @@ def test_tago_api():
         # KTX/SRT API 테스트 (서울-부산)
         ktx_test_result = None
         try:
-            dep_code = KTX_STATION_CODES.get('서울')
-            arr_code = KTX_STATION_CODES.get('부산')
+            dep_code = registry.station_code('서울')
+            arr_code = registry.station_code('부산')
             
             if dep_code and arr_code:
                 base_url = 'http://apis.data.go.kr/1613000/TrainInfoService/getStrtpntAlocFndTrainInfo'
@@ -1206,7 +1331,9 @@ def test_tago_api():
                     'depPlandTime': today
                 }
                 
-                resp = requests.get(base_url, params=params, timeout=10)
+                # 진단용 호출은 사용자 검색에 할당량을 양보
+                with quota.background():
+                    resp = upstream.get(base_url, params=params)
                 ktx_test_result = {
                     'status_code': resp.status_code,
                     'response': resp.text[:500] if resp.status_code != 200 else 'Success'
@@ -1217,13 +1344,9 @@ def test_tago_api():
         # 버스 API 테스트 (서울-부산)
         bus_test_result = None
         try:
-            # all_terminal_codes.json에서 터미널 ID 찾기
-            with open(os.path.join(os.path.dirname(__file__), 'all_terminal_codes.json'), encoding='utf-8') as f:
-                terminal_data = json.load(f)
-            
             # 서울경부와 부산 터미널 찾기
-            dep_terminal = next((t for t in terminal_data if '서울' in t['터미널명']), None)
-            arr_terminal = next((t for t in terminal_data if '부산' in t['터미널명']), None)
+            dep_terminal = registry.find_terminal('서울')
+            arr_terminal = registry.find_terminal('부산')
             
             if dep_terminal and arr_terminal:
                 dep_id = dep_terminal['터미널ID']
@@ -1240,7 +1363,9 @@ def test_tago_api():
                     '_type': 'json'
                 }
                 
-                resp = requests.get(base_url, params=params, timeout=10)
+                # 진단용 호출은 사용자 검색에 할당량을 양보
+                with quota.background():
+                    resp = upstream.get(base_url, params=params)
                 bus_test_result = {
                     'status_code': resp.status_code,
                     'response': resp.text[:500] if resp.status_code != 200 else 'Success',
@@ -1252,10 +1377,10 @@ def test_tago_api():
 
         return jsonify({
             'success': True,
-            'station_list': TERMINALS, # 역 목록 데이터
+            'station_list': registry.terminals, # 역 목록 데이터
             'api_keys': {
-                'TAGO_API_KEY': TAGO_API_KEY[:20] + '...' if TAGO_API_KEY else 'Not set',
-                'API_KEY': API_KEY[:20] + '...' if API_KEY else 'Not set'
+                'TAGO_API_KEY': 'Set' if TAGO_API_KEY else 'Not set',
+                'API_KEY': 'Set' if API_KEY else 'Not set'
             },
             'test_result': {
                 'ktx_api_test': ktx_test_result,
@@ -1266,65 +1391,112 @@ def test_tago_api():
         })
         
     except Exception as e:
-        print(f"TAGO API 테스트 오류: {e}")
+        log_search.exception("TAGO API 테스트 오류")
         return jsonify({
             'success': False,
             'error': str(e)
         })
 
+@app.route('/api/upstream_stats')
+def upstream_stats():
+    """외부 API 커넥션 풀 재사용 / 시간표 캐시 통계 (워커 프로세스 단위)"""
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'stats': upstream.get_stats(),
+        'timetable_cache': transport.timetable_cache.stats(),
+        'shared_cache': shared_cache.backend.stats(),
+        'timetable_singleflight': transport.timetable_flight.stats(),
+        'gemini_cache': gemini_cache.stats(),
+        'chat_writer': chat_writer.stats(),
+        'chat_history_cache': history_cache.stats(),
+        'cache_warmer': cache_warmer.stats()
+    })
+
+background_manifest = backgrounds.BackgroundManifest(
+    Config.S3_BUCKET or 'project-trip-pic',
+    Config.S3_BACKGROUND_PREFIX,
+    Config.BACKGROUND_MANIFEST_REFRESH_INTERVAL,
+    region=Config.AWS_REGION,
+)
+
+# ---- 헬스/레디니스 체크 ----
+health_monitor = health.HealthMonitor(
+    Config.HEALTH_CHECK_INTERVAL,
+    Config.HEALTH_MAX_STALENESS,
+    timeout=Config.HEALTH_CHECK_TIMEOUT,
+    required=Config.READINESS_REQUIRED_CHECKS,
+)
+
+def _check_mysql():
+    with app.app_context():
+        try:
+            db.session.execute(text('SELECT 1'))
+        finally:
+            db.session.remove()
+
+def _check_dynamodb():
+    table = dynamodb.meta.client.describe_table(TableName=Config.DYNAMODB_TABLE)['Table']
+    return {'status': table.get('TableStatus')}
+
+def _check_s3():
+    background_manifest.client.head_bucket(Bucket=background_manifest.bucket)
+
+def _check_upstream():
+    # 외부 API 할당량을 쓰지 않도록 실제 요청 결과로만 판단 (호출 기록이 없으면 정상)
+    status = upstream.host_status('apis.data.go.kr')
+    if status and not status['ok']:
+        raise RuntimeError(f"last request failed at {status['last_error']:.0f}")
+    return status
+
+health_monitor.register('mysql', _check_mysql)
+health_monitor.register('dynamodb', _check_dynamodb)
+health_monitor.register('s3', _check_s3)
+health_monitor.register('upstream', _check_upstream)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus 메트릭 (multiprocess 모드면 모든 워커 합산)"""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+@app.route('/healthz')
+def healthz():
+    """프로세스 생존 확인 (의존성 확인 없음, livenessProbe)"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """의존성 상태 (백그라운드 체크 결과, readinessProbe)"""
+    ready, checks = health_monitor.status()
+    degraded = [name for name, result in checks.items() if not result['ok'] or result['stale']]
+    body = {
+        'status': 'ready' if ready else 'not_ready',
+        'degraded': degraded,
+        'checks': checks
+    }
+    return jsonify(body), 200 if ready else 503
+
 @app.route('/', endpoint='index')
 def index():
-    s3 = boto3.client(
-        's3',
-        region_name=os.environ.get('AWS_REGION', 'ap-northeast-2'),
-        aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY')
-    )
-    bucket = os.environ.get('S3_BUCKET', 'project-trip-pic')
-    prefix = 'backgrounds/'
-    print("[DEBUG] S3_BUCKET:", bucket)
-    print("[DEBUG] AWS_REGION:", os.environ.get('AWS_REGION', 'ap-northeast-2'))
-    response = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-    bg_images = []
-    for obj in response.get('Contents', []):
-        key = obj['Key']
-        if key != prefix and not key.endswith('/'):
-            bg_images.append(key)
-    print("[DEBUG] bg_images:", bg_images)
+    bucket = background_manifest.bucket
+    # 배경 이미지 목록은 프로세스 내 캐시 (백그라운드에서 주기적으로 S3 재조회)
+    bg_images = background_manifest.get()
+    log_index.debug("배경 이미지 목록", count=len(bg_images or []))
     bg_image = None
     if bg_images:
         import random
         bg_image = random.choice(bg_images)
-        print("[DEBUG] bg_image (random):", bg_image)
+        log_index.debug("배경 이미지 선택", key=bg_image)
         from urllib.parse import quote
-        aws_region = os.environ.get('AWS_REGION', 'ap-northeast-2')
+        aws_region = background_manifest.region
         s3_url = f"https://{bucket}.s3.{aws_region}.amazonaws.com/{quote(bg_image)}"
-        print("[DEBUG] S3 URL:", s3_url)
-
-    # KTX 역 목록 (KTX_STATION_CODES의 키)
-    KTX_STATION_CODES = {
-        '서울': 'NAT010000', '용산': 'NAT010032', '노량진': 'NAT010058', '영등포': 'NAT010091',
-        '신도림': 'NAT010106', '청량리': 'NAT130126', '왕십리': 'NAT130104', '옥수': 'NAT130070',
-        '서빙고': 'NAT130036', '광운대': 'NAT130182', '상봉': 'NAT020040', '수서': 'NATH30000',
-        '부산': 'NAT014445', '구포': 'NAT014281', '사상': 'NAT014331', '화명': 'NAT014244',
-        '부전': 'NAT750046', '동래': 'NAT750106', '센텀': 'NAT750161', '신해운대': 'NAT750189',
-        '송정': 'NAT750254', '기장': 'NAT750329', '좌천': 'NAT750412',
-        '대전': 'NAT011668', '서대전': 'NAT030057', '신탄진': 'NAT011524', '흑석리': 'NAT030173',
-        '동대구': 'NAT013271', '대구': 'NAT013239', '서대구': 'NAT013189',
-        '광주송정': 'NAT031857', '광주': 'NAT883012', '서광주': 'NAT882936', '효천': 'NAT882904',
-        '울산(통도사)': 'NATH13717', '북울산': 'NAT750781', '남창': 'NAT750560', '덕하': 'NAT750653',
-        '태화강': 'NAT750726', '효문': 'NAT750760'
-    }
-    ktx_stations = list(KTX_STATION_CODES.keys())
-
-    # 버스 터미널 목록 (TERMINALS에서 터미널명만 추출)
-    bus_terminals = [t['터미널명'] for t in TERMINALS if '터미널명' in t]
+        log_index.debug("배경 이미지 URL", url=s3_url)
 
+    # 역/터미널 목록은 /api/places/suggest 등 API 로 필요한 만큼만 조회
     return render_template(
         'index.html',
         bg_images=bg_images,
-        ktx_stations=ktx_stations,
-        bus_terminals=bus_terminals,
         # ...다른 변수들...
     )
 
@@ -1336,9 +1508,9 @@ if __name__ == '__main__':
         # 실제 MongoDB는 컬렉션 생성 시 데이터베이스 존재 여부를 확인하지 않으므로 오류 발생 시 무시
         try:
             db.create_all() # SQLAlchemy 테이블 생성
-            print("SQLAlchemy 테이블 생성 시도")
+            log_db.info("SQLAlchemy 테이블 생성 시도")
         except Exception as e:
-            print(f"SQLAlchemy 테이블 생성 오류 (이미 존재할 수 있음): {e}")
+            log_db.warning("SQLAlchemy 테이블 생성 오류 (이미 존재할 수 있음)", error=e)
 
         try:
             dynamodb.create_table(
@@ -1356,8 +1528,8 @@ if __name__ == '__main__':
                     'WriteCapacityUnits': 5
                 }
             )
-            print("DynamoDB 테이블 생성 시도")
+            log_db.info("DynamoDB 테이블 생성 시도")
         except Exception as e:
-            print(f"DynamoDB 테이블 생성 오류 (이미 존재할 수 있음): {e}")
+            log_db.warning("DynamoDB 테이블 생성 오류 (이미 존재할 수 있음)", error=e)
 
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
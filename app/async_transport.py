@@ -0,0 +1,225 @@
+"""비동기(asyncio + httpx) 열차/버스 시간표 조회
+
+transport 모듈과 같은 캐시(프로세스 내 + 공유)와 single-flight 를 사용하고, 외부 API
+호출만 httpx.AsyncClient 로 수행한다. Flask 의 async 뷰는 요청마다 새 이벤트 루프에서
+실행되므로, 실제 조회는 워커 프로세스당 하나인 전용 루프 스레드에서 실행하고(run) 뷰는
+그 결과를 기다린다. 클라이언트도 그 루프에 하나만 두어 요청이 바뀌어도 keep-alive
+커넥션을 재사용한다.
+
+async 뷰도 요청이 끝날 때까지 gthread 워커 스레드 하나를 차지한다. 워커당 동시 요청 수는
+스레드 수(gunicorn.conf.py)로 정해지고, 비동기 조회는 한 요청 안의 외부 API 대기를
+겹치게 할 뿐이다.
+"""
+import asyncio
+import functools
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+import log
+import metrics
+import transport
+import upstream
+from breaker import CircuitOpenError
+from cache import MISSING
+from config import Config
+from fanout import FanOutResult
+from quota import QuotaExceeded
+from registry import registry
+
+logger = log.get_logger('async_transport')
+
+_loop = None
+_loop_lock = threading.Lock()
+_client = None
+
+
+def _build_client():
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(Config.UPSTREAM_READ_TIMEOUT, connect=Config.UPSTREAM_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=Config.UPSTREAM_POOL_MAXSIZE,
+            max_keepalive_connections=Config.UPSTREAM_POOL_MAXSIZE,
+        ),
+        headers={'Connection': 'keep-alive'},
+    )
+
+
+def get_loop():
+    """프로세스 공용 이벤트 루프 (gunicorn fork 이후 워커별로 처음 필요할 때 스레드 시작)"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='async-upstream', daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def get_client():
+    """공용 루프에 묶인 HTTP 클라이언트 (공용 루프 안에서만 호출)"""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def run(coro):
+    """coro 를 공용 루프에서 실행하고 결과를 기다린다 (요청의 이벤트 루프에서 호출)"""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, get_loop()))
+
+
+async def _get(url, params):
+    """upstream.get 과 같은 서킷 브레이커/할당량/호스트 통계/메트릭 기록을 거쳐 GET"""
+    parts = urlsplit(url)
+    dependency = metrics.upstream_dependency(url)
+    breaker = upstream.circuit(dependency)
+    trial = breaker.before_call() if breaker else None
+    bucket = upstream.quota(dependency)
+    start = time.monotonic()
+    try:
+        if bucket:
+            await bucket.acquire_async()
+        start = time.monotonic()
+        with metrics.track_dependency(dependency, parts.path.rsplit('/', 1)[-1]):
+            resp = await get_client().get(url, params=params)
+    except (QuotaExceeded, asyncio.CancelledError):
+        # 할당량 부족이나 마감 시간으로 우리가 취소한 호출은 외부 API 실패로 세지 않는다
+        if breaker:
+            breaker.release(trial)
+        raise
+    except Exception:
+        elapsed = time.monotonic() - start
+        upstream.record(parts.netloc, elapsed, error=True)
+        if breaker:
+            breaker.record(False, elapsed, trial)
+        raise
+    elapsed = time.monotonic() - start
+    ok = upstream.response_ok(resp)
+    upstream.record(parts.netloc, elapsed, error=not ok)
+    if breaker:
+        breaker.record(ok, elapsed, trial)
+    return resp
+
+
+async def _fetch_items(url, params, limit=None):
+    """transport.ItemPager 와 같은 방식으로 페이지를 받아 item 목록과 완료 여부 반환"""
+    page_size = limit or Config.UPSTREAM_PAGE_SIZE
+    items, seen = [], 0
+    for page_no in range(1, Config.UPSTREAM_MAX_PAGES + 1):
+        resp = await _get(url, transport.page_params(params, page_no, page_size))
+        if resp.status_code != 200:
+            raise transport.UpstreamError(resp.status_code, resp.text[:500])
+        page, total = transport.extract_page(resp.json())
+        seen += len(page)
+        items.extend(page)
+        if transport.is_last_page(page, total, seen, page_size):
+            return items, True
+        if limit and len(items) >= limit:
+            return items[:limit], False
+    return items, False
+
+
+async def _fetch_all(url, params):
+    items, _ = await _fetch_items(url, params)
+    return items
+
+
+async def _fetch_first(key, url, params, limit):
+    """transport.fetch_first_items 의 비동기 버전"""
+    items, complete = await _fetch_items(url, params, limit)
+    if complete:
+        transport.store(key, items)
+    return items
+
+
+async def _load(key, fetch):
+    items = transport.lookup_cached(key)
+    if items is not MISSING:
+        return items
+    items = await fetch()
+    transport.store(key, items)
+    return items
+
+
+async def _cached(key, url, params, limit=None, freshness=None):
+    # 만료된 목록은 그대로 쓰고 재조회는 transport 의 백그라운드 스레드에 맡긴다
+    items = transport.cached_or_stale(key, lambda: transport.fetch_all_items(url, params), freshness)
+    if items is not MISSING:
+        return items[:limit] if limit else items
+    if limit:
+        # 앞의 limit 건은 transport 와 같은 키로 따로 캐시
+        flight_key = transport.first_key(key, limit)
+        items = transport.cached_or_stale(
+            flight_key, lambda: transport.fetch_first_items(key, url, params, limit), freshness)
+        if items is not MISSING:
+            return items
+        fetch = functools.partial(_fetch_first, key, url, params, limit)
+    else:
+        flight_key = key
+        fetch = functools.partial(_fetch_all, url, params)
+    # 같은 경로/날짜의 동시 조회(동기 요청 포함)는 한 번만 외부 API 를 호출
+    items = await transport.timetable_flight.do_async(flight_key, lambda: _load(flight_key, fetch))
+    if freshness is not None:
+        freshness.observe(time.time())
+    return items
+
+
+async def _train_items(dep_code, arr_code, date, limit=None, freshness=None):
+    date = transport.normalize_date(date)
+    params = transport.train_params(dep_code, arr_code, date)
+    return await _cached(('train', dep_code, arr_code, date), transport.TRAIN_URL, params, limit, freshness)
+
+
+async def _bus_items_between(dep_ids, arr_ids, date, limit=None, freshness=None):
+    date = transport.normalize_date(date)
+    results = await asyncio.gather(*[
+        _cached(('bus', dep_id, arr_id, date), transport.BUS_URL, transport.bus_params(dep_id, arr_id, date),
+                limit, freshness)
+        for dep_id in dep_ids
+        for arr_id in arr_ids
+    ])
+    return transport.merge_bus_items(results, limit)
+
+
+async def _train_and_bus(departure, destination, date, deadline=None, limit=None, freshness=None):
+    deadline = Config.SEARCH_DEADLINE if deadline is None else deadline
+    start = time.monotonic()
+    dep_code, arr_code = registry.station_code(departure), registry.station_code(destination)
+    dep_ids, arr_ids = registry.terminal_ids(departure), registry.terminal_ids(destination)
+    tasks = {}
+    if dep_code and arr_code:
+        tasks['train'] = asyncio.ensure_future(_train_items(dep_code, arr_code, date, limit, freshness))
+    if dep_ids and arr_ids:
+        tasks['bus'] = asyncio.ensure_future(_bus_items_between(dep_ids, arr_ids, date, limit, freshness))
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+    results, errors, timed_out = {}, {}, []
+    for name, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            timed_out.append(name)
+        elif task.exception() is not None:
+            errors[name] = task.exception()
+            (logger.debug if isinstance(errors[name], (CircuitOpenError, QuotaExceeded)) else logger.warning)(
+                '조회 오류', source=name, error=errors[name])
+        else:
+            results[name] = task.result()
+    return FanOutResult(results, errors, timed_out, time.monotonic() - start)
+
+
+async def fetch_train_items(dep_code, arr_code, date, limit=None, freshness=None):
+    return await run(_train_items(dep_code, arr_code, date, limit, freshness))
+
+
+async def fetch_bus_items_between(dep_ids, arr_ids, date, limit=None, freshness=None):
+    return await run(_bus_items_between(dep_ids, arr_ids, date, limit, freshness))
+
+
+async def fetch_train_and_bus(departure, destination, date, deadline=None, limit=None, freshness=None):
+    """transport.fetch_train_and_bus 의 비동기 버전 (같은 FanOutResult 반환)"""
+    return await run(_train_and_bus(departure, destination, date, deadline, limit, freshness))
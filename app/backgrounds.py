@@ -0,0 +1,90 @@
+"""메인 화면 배경 이미지 목록 (S3)
+
+S3 클라이언트는 프로세스마다 한 번만 만들고, backgrounds/ 아래 객체 목록은 메모리에
+두었다가 백그라운드 스레드가 주기적으로 다시 읽는다. 요청 처리 중에는 S3 를 호출하지
+않으며, 갱신에 실패하면 이전 목록을 그대로 쓴다.
+"""
+import threading
+import time
+
+import boto3
+
+import log
+import metrics
+from config import Config
+
+logger = log.get_logger('backgrounds')
+
+
+class BackgroundManifest:
+    def __init__(self, bucket, prefix, refresh_interval, region=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.refresh_interval = refresh_interval
+        self.region = region
+        self._client = None
+        self._keys = None
+        self.updated_at = None
+        self.errors = 0
+        self._lock = threading.RLock()  # get() 안의 refresh() 가 client 생성 시 다시 잡음
+        self._thread = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = boto3.client(
+                        's3',
+                        region_name=self.region,
+                        aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY
+                    )
+                    metrics.instrument_boto3(self._client, 's3')
+        return self._client
+
+    def get(self):
+        """배경 이미지 key 목록 (최초 호출 시 한 번 읽고 이후 백그라운드 갱신)"""
+        if self._keys is None:
+            with self._lock:
+                if self._keys is None and not self.refresh():
+                    self._keys = []
+        self.start_background_refresh()
+        return self._keys
+
+    def refresh(self):
+        try:
+            keys = []
+            paginator = self.client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+                for obj in page.get('Contents', []):
+                    key = obj['Key']
+                    if key != self.prefix and not key.endswith('/'):
+                        keys.append(key)
+        except Exception as e:
+            self.errors += 1
+            logger.error('S3 목록 조회 오류', error=e)
+            return False
+        self._keys = keys
+        self.updated_at = time.time()
+        return True
+
+    def start_background_refresh(self):
+        if self._thread is not None or self.refresh_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refresh_loop, name='background-manifest', daemon=True)
+                self._thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            self.refresh()
+
+    def info(self):
+        return {
+            'count': len(self._keys or []),
+            'updated_at': self.updated_at,
+            'errors': self.errors,
+        }
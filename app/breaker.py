@@ -0,0 +1,133 @@
+"""외부 API 서킷 브레이커
+
+의존성(tago_train, expbus)별로 최근 호출 결과를 window 건까지 기억하고, 그중 실패
+비율이 failure_ratio 이상이면 open 상태가 된다. 응답은 왔지만 slow_call 초보다 오래
+걸린 호출도 실패로 센다. open 동안에는 외부 API 를 부르지 않고 CircuitOpenError 를
+바로 던지므로 호출하는 쪽은 타임아웃을 기다리지 않고 캐시/샘플 데이터로 응답한다.
+open_seconds 가 지나면 half-open 으로 바뀌어 half_open_calls 건의 시험 호출만 보내고,
+성공하면 closed, 실패하면 다시 open 이 된다. before_call 이 돌려준 시험 토큰으로 결과를
+기록하므로 closed 때 시작되어 늦게 끝난 호출은 시험 결과로 세지 않는다.
+
+상태는 워커 프로세스마다 따로 가진다(각 워커가 스스로 장애를 감지하고 복구를 확인).
+"""
+import threading
+import time
+from collections import deque
+
+import log
+import metrics
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+logger = log.get_logger('breaker')
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출하지 않음"""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"circuit open: {name} (retry after {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name, window=20, min_calls=5, failure_ratio=0.5, slow_call=3.0,
+                 open_seconds=30.0, half_open_calls=1):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)  # True = 실패
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_at = 0.0
+        self._generation = 0  # half-open 으로 바뀔 때마다 증가 (시험 토큰)
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+        metrics.circuit_state(name, CLOSED, changed=False)
+
+    def before_call(self):
+        """호출 가능하면 시험 토큰(half-open 시험 호출이 아니면 None) 반환, 아니면 CircuitOpenError
+
+        토큰은 release/record 에 그대로 넘긴다.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self._reject(remaining)
+                self._transition(HALF_OPEN)
+                self._trials = 0
+                self._generation += 1
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    # 결과가 기록되지 않은 시험 호출이 있어도 open_seconds 뒤에는 다시 시험
+                    waited = time.monotonic() - self._trial_at
+                    if waited < self.open_seconds:
+                        self._reject(self.open_seconds - waited)
+                    self._trials = 0
+                self._trials += 1
+                self._trial_at = time.monotonic()
+                return self._generation
+            return None
+
+    def release(self, token=None):
+        """before_call 뒤 호출하지 않고 끝난 경우(할당량 부족, 마감 시간 취소): 시험 호출 자리를 돌려준다"""
+        with self._lock:
+            if self.state == HALF_OPEN and token == self._generation and self._trials > 0:
+                self._trials -= 1
+
+    def record(self, ok, elapsed, token=None):
+        """호출 결과 기록 (ok: 응답 성공 여부, elapsed: 걸린 초, token: before_call 이 돌려준 값)"""
+        failed = not ok or (self.slow_call and elapsed > self.slow_call)
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if token != self._generation:
+                    # half-open 이 되기 전에 시작된 호출: 시험 결과가 아니다
+                    return
+                if failed:
+                    self._open()
+                else:
+                    self._outcomes.clear()
+                    self._transition(CLOSED)
+                return
+            if self.state == OPEN:
+                # open 직전에 시작된 호출의 결과
+                return
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if len(self._outcomes) >= self.min_calls and failures >= self.failure_ratio * len(self._outcomes):
+                self._open()
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        self._outcomes.clear()
+        self._transition(OPEN)
+
+    def _reject(self, retry_after):
+        self.rejected += 1
+        metrics.circuit_rejected(self.name)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _transition(self, state):
+        if state == self.state:
+            return
+        logger.warning('서킷 상태 변경', dependency=self.name, before=self.state, after=state)
+        self.state = state
+        metrics.circuit_state(self.name, state)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': sum(self._outcomes),
+                'opened': self.opened,
+                'rejected': self.rejected,
+            }
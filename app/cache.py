@@ -0,0 +1,156 @@
+"""프로세스 내 TTL + LRU 캐시
+
+항목 수와 대략적인 바이트 크기 두 가지 한도를 두고, 한도를 넘으면 가장 오래 사용되지
+않은 항목부터 제거한다. 만료된 항목은 조회 시점에 지운다.
+
+stale_ttl 을 주면 만료 후에도 그 시간 동안은 항목을 남겨 두고, get() 은 miss 로 보지만
+get_entry() 로 만료된 값을 꺼낼 수 있다(stale-while-revalidate).
+"""
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+MISSING = object()
+
+
+def estimate_size(value):
+    """값의 대략적인 메모리 크기 (JSON 직렬화 길이 기준)"""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class CacheEntry:
+    __slots__ = ('value', 'stored_at', 'fresh')
+
+    def __init__(self, value, stored_at, fresh):
+        self.value = value
+        self.stored_at = stored_at  # time.time() 기준 저장 시각
+        self.fresh = fresh
+
+    @property
+    def age(self):
+        return max(time.time() - self.stored_at, 0)
+
+
+class TTLCache:
+    def __init__(self, name, ttl, max_entries=1024, max_bytes=None, stale_ttl=0):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (value, expires_at, size, stale_until, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key, now):
+        """만료 기한까지 지난 항목은 지우고 반환 (호출 측에서 lock 보유)"""
+        entry = self._data.get(key)
+        if entry is not None and entry[3] <= now:
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            now = time.monotonic()
+            entry = self._lookup(key, now)
+            if entry is not None and entry[1] <= now:
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        metrics.cache_result(self.name, entry is not None)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """만료되었지만 stale_ttl 안인 항목까지 CacheEntry 로 반환 (없으면 None)"""
+        with self._lock:
+            now = time.monotonic()
+            entry = self._lookup(key, now)
+            if entry is None:
+                self.misses += 1
+                result = None
+            else:
+                self._data.move_to_end(key)
+                fresh = entry[1] > now
+                if fresh:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                result = CacheEntry(entry[0], entry[4], fresh)
+        metrics.cache_result(self.name, False if result is None else (True if result.fresh else None))
+        return result
+
+    def set(self, key, value, ttl=None, stale_ttl=None, stored_at=None):
+        size = estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # 담을 수 없는 값: 이전 값이 계속 쓰이지 않도록 지운다
+            self.delete(key)
+            return
+        now = time.monotonic()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        stale_until = expires_at + (self.stale_ttl if stale_ttl is None else stale_ttl)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size, stale_until, time.time() if stored_at is None else stored_at)
+            self._bytes += size
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        size = self._data.pop(key)[2]
+        self._bytes -= size
+
+    def _evict(self):
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+                'stale_hits': self.stale_hits,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
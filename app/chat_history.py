@@ -0,0 +1,184 @@
+"""DynamoDB 대화 기록 조회 (커서 기반 페이지)
+
+목록 화면은 필요한 속성만 읽어(ProjectionExpression) 메시지/응답을 미리보기 길이로 잘라
+보내고, 다음 페이지는 LastEvaluatedKey 를 감싼 불투명 커서로 이어서 조회한다.
+대화 전체 내용은 get_conversation 으로 한 건씩 가져온다. 공유 캐시 서버가 있으면 최신 목록
+첫 페이지를 HistoryCache 로 사용자별 캐시해 반복 조회 시 DynamoDB 를 읽지 않는다.
+"""
+import base64
+import json
+import threading
+from datetime import datetime
+
+from boto3.dynamodb.conditions import Key
+
+import shared_cache
+
+# timestamp 등은 DynamoDB 예약어라 별칭 사용
+LIST_PROJECTION = '#uid, #ts, #msg, #resp'
+LIST_ATTRIBUTE_NAMES = {'#uid': 'user_id', '#ts': 'timestamp', '#msg': 'message', '#resp': 'response'}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(last_key):
+    if not last_key:
+        return None
+    data = {'user_id': str(last_key['user_id']), 'timestamp': int(last_key['timestamp'])}
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, user_id):
+    """커서 -> ExclusiveStartKey (다른 사용자의 커서나 잘못된 값이면 InvalidCursor)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = {'user_id': str(data['user_id']), 'timestamp': int(data['timestamp'])}
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+    if key['user_id'] != str(user_id):
+        raise InvalidCursor(cursor)
+    return key
+
+
+def preview(text, limit):
+    text = '' if text is None else str(text)
+    return (text[:limit] + '...', True) if len(text) > limit else (text, False)
+
+
+def format_timestamp(ts):
+    # timestamp 가 decimal.Decimal 일 수 있으므로 float 으로 변환
+    try:
+        return datetime.fromtimestamp(float(ts)).strftime('%Y-%m-%d %H:%M')
+    except (TypeError, ValueError):
+        return ''
+
+
+def to_summary(item, preview_chars):
+    message, message_cut = preview(item.get('message'), preview_chars)
+    response, response_cut = preview(item.get('response'), preview_chars)
+    return {
+        'id': str(int(item['timestamp'])),
+        'message': message,
+        'response': response,
+        'truncated': message_cut or response_cut,
+        'timestamp': format_timestamp(item['timestamp'])
+    }
+
+
+def query_page(table, user_id, page_size, cursor=None, preview_chars=120):
+    """최신순 한 페이지 -> (요약 목록, 다음 커서 또는 None)"""
+    kwargs = {
+        'KeyConditionExpression': Key('user_id').eq(str(user_id)),
+        'ScanIndexForward': False,
+        'Limit': page_size,
+        'ProjectionExpression': LIST_PROJECTION,
+        'ExpressionAttributeNames': LIST_ATTRIBUTE_NAMES,
+    }
+    if cursor:
+        kwargs['ExclusiveStartKey'] = decode_cursor(cursor, user_id)
+    resp = table.query(**kwargs)
+    items = [to_summary(item, preview_chars) for item in resp.get('Items', [])]
+    return items, encode_cursor(resp.get('LastEvaluatedKey'))
+
+
+def get_conversation(table, user_id, chat_id):
+    """대화 한 건 전체 (없으면 None)"""
+    try:
+        timestamp = int(chat_id)
+    except (TypeError, ValueError):
+        return None
+    item = table.get_item(Key={'user_id': str(user_id), 'timestamp': timestamp}).get('Item')
+    if not item:
+        return None
+    return {
+        'id': str(timestamp),
+        'message': str(item.get('message', '')),
+        'response': str(item.get('response', '')),
+        'timestamp': format_timestamp(item.get('timestamp'))
+    }
+
+
+class HistoryCache:
+    """사용자별 최신 대화 목록 첫 페이지 캐시 (read-through)
+
+    가장 크게 조회한 페이지를 보관하고 그보다 작은 limit 은 잘라서 응답한다(다음 커서는
+    잘린 위치의 키로 다시 만든다). 새 기록이 저장되면 앞에 붙여 바로 보이게 한다.
+    모든 워커/파드가 같은 목록을 보도록 공유 캐시 서버에만 저장하고, 서버가 없으면 캐시하지
+    않는다(워커마다 따로 캐시하면 다른 워커가 저장한 기록이 TTL 동안 보이지 않음).
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.appends = 0
+        self.bypassed = 0
+
+    @property
+    def enabled(self):
+        return shared_cache.backend.is_shared
+
+    def first_page(self, table, user_id, page_size, preview_chars=120):
+        """query_page(cursor=None) 와 같은 결과를 캐시에서 (없거나 더 큰 페이지면 조회 후 저장)"""
+        if not self.enabled:
+            self._count('bypassed')
+            return query_page(table, user_id, page_size, preview_chars=preview_chars)
+        entry = shared_cache.backend.get(('chat_history', user_id))
+        if entry and (len(entry['items']) >= page_size or not entry['next_cursor']):
+            self._count('hits')
+            items = entry['items'][:page_size]
+            if len(entry['items']) > page_size:
+                next_cursor = encode_cursor({'user_id': user_id, 'timestamp': items[-1]['id']})
+            else:
+                next_cursor = entry['next_cursor']
+            return items, next_cursor
+        self._count('misses')
+        items, next_cursor = query_page(table, user_id, page_size, preview_chars=preview_chars)
+        shared_cache.backend.set(('chat_history', user_id), {'items': items, 'next_cursor': next_cursor}, self.ttl)
+        return items, next_cursor
+
+    def append(self, user_id, record, preview_chars=120):
+        """새 대화 기록을 캐시된 목록 맨 앞에 추가 (캐시가 없으면 다음 조회 때 읽어 온다)
+
+        다른 워커의 동시 추가를 잃지 않도록 공유 캐시의 원자적 update 로 고친다.
+        """
+        if not self.enabled:
+            return
+        summary = to_summary(record, preview_chars)
+
+        def prepend(entry):
+            size = len(entry['items'])
+            items = [summary] + [item for item in entry['items'] if item['id'] != summary['id']]
+            if len(items) > size and size:
+                # 페이지 크기 유지, 밀려난 기록은 다음 커서로 이어서 조회
+                items = items[:size]
+                entry['next_cursor'] = encode_cursor({'user_id': user_id, 'timestamp': items[-1]['id']})
+            entry['items'] = items
+            return entry
+
+        if shared_cache.backend.update(('chat_history', user_id), prepend, self.ttl) is not None:
+            self._count('appends')
+
+    def invalidate(self, user_id):
+        if self.enabled:
+            shared_cache.backend.delete(('chat_history', user_id))
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            counters = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'appends': self.appends,
+                'bypassed': self.bypassed,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+            }
+        return dict(counters, enabled=self.enabled)
@@ -0,0 +1,129 @@
+"""DynamoDB 대화 기록 백그라운드 일괄 저장
+
+요청 스레드는 기록을 큐에 넣기만 하고, 워커 스레드가 batch_size 건이 모이거나
+flush_interval 초가 지나면 batch_write_item 으로 한 번에 저장한다. 처리되지 않은 항목
+(UnprocessedItems)은 지수 백오프로 다시 보내고, 프로세스 종료 시 남은 기록을 비운다.
+"""
+import atexit
+import queue
+import random
+import threading
+import time
+
+import log
+
+logger = log.get_logger('chat_writer')
+
+MAX_BATCH = 25  # batch_write_item 한 번에 보낼 수 있는 최대 항목 수
+
+
+class ChatHistoryWriter:
+    def __init__(self, dynamodb, table_name, batch_size=MAX_BATCH, flush_interval=1.0,
+                 max_queue=10000, max_retries=5, key_fields=('user_id', 'timestamp')):
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.batch_size = min(max(batch_size, 1), MAX_BATCH)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.key_fields = key_fields
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.dropped = 0
+        self.direct_writes = 0
+
+    def submit(self, item):
+        """기록을 큐에 넣는다 (큐가 가득 차면 요청 스레드에서 바로 저장)"""
+        self._start()
+        try:
+            if self._closed:
+                raise queue.Full
+            self._queue.put_nowait(item)
+            self.submitted += 1
+        except queue.Full:
+            self.direct_writes += 1
+            self.dynamodb.Table(self.table_name).put_item(Item=item)
+
+    def _start(self):
+        # gunicorn 워커 프로세스마다 첫 기록 시 스레드 시작
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='chat-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._write(batch)
+
+    def _collect(self):
+        """첫 기록을 기다린 뒤 batch_size 건 또는 flush_interval 초까지 모은다 -> (기록 목록, 종료 여부)"""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # 종료 신호: 모은 기록을 저장한 뒤 끝낸다
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch):
+        # 같은 키가 한 요청에 두 번 있으면 배치 전체가 거부되므로 마지막 기록만 남긴다 (put_item 과 같은 결과)
+        unique = {tuple(item.get(f) for f in self.key_fields): item for item in batch}
+        requests = [{'PutRequest': {'Item': item}} for item in unique.values()]
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                time.sleep(min(0.05 * 2 ** attempt, 5) * random.uniform(0.5, 1.5))
+            try:
+                resp = self.dynamodb.batch_write_item(RequestItems={self.table_name: requests})
+            except Exception as e:
+                logger.warning('batch_write_item 오류', attempt=attempt + 1, error=e)
+                continue
+            self.batches += 1
+            unprocessed = resp.get('UnprocessedItems', {}).get(self.table_name, [])
+            self.written += len(requests) - len(unprocessed)
+            if not unprocessed:
+                return
+            requests = unprocessed
+        self.dropped += len(requests)
+        logger.error('대화 기록 저장 실패 (재시도 횟수 초과)', count=len(requests), max_retries=self.max_retries)
+
+    def close(self, timeout=10):
+        """남은 기록을 모두 저장하고 스레드 종료"""
+        if self._closed or self._thread is None:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'submitted': self.submitted,
+            'written': self.written,
+            'batches': self.batches,
+            'retries': self.retries,
+            'dropped': self.dropped,
+            'direct_writes': self.direct_writes,
+        }
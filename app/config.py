@@ -17,4 +17,117 @@ class Config:
     DYNAMODB_TABLE = os.environ.get('DYNAMODB_TABLE', 'project-chat')
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     TAGO_API_KEY = os.environ.get('TAGO_API_KEY')
-    API_KEY = os.environ.get('API_KEY') 
\ No newline at end of file
+    API_KEY = os.environ.get('API_KEY')
+
+    # 외부 API 공용 HTTP 클라이언트 (커넥션 풀/타임아웃)
+    UPSTREAM_POOL_CONNECTIONS = int(os.environ.get('UPSTREAM_POOL_CONNECTIONS', 10))
+    UPSTREAM_POOL_MAXSIZE = int(os.environ.get('UPSTREAM_POOL_MAXSIZE', 20))
+    UPSTREAM_MAX_RETRIES = int(os.environ.get('UPSTREAM_MAX_RETRIES', 0))
+    UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 3.05))
+    UPSTREAM_READ_TIMEOUT = float(os.environ.get('UPSTREAM_READ_TIMEOUT', 10))
+
+    # 외부 API 서킷 브레이커 (최근 호출 수, 판단 최소 호출 수, 실패 비율, 느린 호출 기준 초, open 유지 초, half-open 시험 호출 수)
+    CIRCUIT_BREAKER_ENABLED = os.environ.get('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+    CIRCUIT_WINDOW = int(os.environ.get('CIRCUIT_WINDOW', 20))
+    CIRCUIT_MIN_CALLS = int(os.environ.get('CIRCUIT_MIN_CALLS', 5))
+    CIRCUIT_FAILURE_RATIO = float(os.environ.get('CIRCUIT_FAILURE_RATIO', 0.5))
+    CIRCUIT_SLOW_CALL = float(os.environ.get('CIRCUIT_SLOW_CALL', 5))
+    CIRCUIT_OPEN_SECONDS = float(os.environ.get('CIRCUIT_OPEN_SECONDS', 30))
+    CIRCUIT_HALF_OPEN_CALLS = int(os.environ.get('CIRCUIT_HALF_OPEN_CALLS', 1))
+
+    # data.go.kr API 키 호출 할당량 (초당 호출 수, 일일 호출 수(0=무제한))
+    QUOTA_ENABLED = os.environ.get('QUOTA_ENABLED', 'true').lower() == 'true'
+    QUOTA_TAGO_RATE = float(os.environ.get('QUOTA_TAGO_RATE', 30))
+    QUOTA_TAGO_DAILY = int(os.environ.get('QUOTA_TAGO_DAILY', 10000))
+    QUOTA_EXPBUS_RATE = float(os.environ.get('QUOTA_EXPBUS_RATE', 30))
+    QUOTA_EXPBUS_DAILY = int(os.environ.get('QUOTA_EXPBUS_DAILY', 10000))
+    # 백그라운드 작업(역 목록 갱신, API 테스트)에 쓰지 않고 남겨 둘 비율, 토큰 대기 시간(사용자 요청, 백그라운드)
+    QUOTA_BACKGROUND_RESERVE = float(os.environ.get('QUOTA_BACKGROUND_RESERVE', 0.2))
+    QUOTA_MAX_WAIT = float(os.environ.get('QUOTA_MAX_WAIT', 0.5))
+    QUOTA_BACKGROUND_MAX_WAIT = float(os.environ.get('QUOTA_BACKGROUND_MAX_WAIT', 5))
+    # 공유 캐시 서버(Lua 지원 Redis) 없이 프로세스마다 따로 셀 때 할당량을 나눌 프로세스 수
+    # (기본: 파드당 gunicorn 워커 수 x 최대 파드 수)
+    QUOTA_LOCAL_PROCESSES = int(os.environ.get(
+        'QUOTA_LOCAL_PROCESSES',
+        int(os.environ.get('GUNICORN_WORKERS', 2)) * int(os.environ.get('QUOTA_MAX_REPLICAS', 10))))
+
+    # 열차/버스 시간표 캐시
+    TIMETABLE_CACHE_TTL = int(os.environ.get('TIMETABLE_CACHE_TTL', 1800))
+    TIMETABLE_EMPTY_CACHE_TTL = int(os.environ.get('TIMETABLE_EMPTY_CACHE_TTL', 60))
+    TIMETABLE_CACHE_MAX_ENTRIES = int(os.environ.get('TIMETABLE_CACHE_MAX_ENTRIES', 2000))
+    TIMETABLE_CACHE_MAX_BYTES = int(os.environ.get('TIMETABLE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    # 만료된 시간표를 바로 내보내고 백그라운드에서 재조회할 수 있는 최대 나이(초), 재조회 스레드 수
+    TIMETABLE_MAX_STALENESS = int(os.environ.get('TIMETABLE_MAX_STALENESS', 2 * 3600))
+    TIMETABLE_REVALIDATE_WORKERS = int(os.environ.get('TIMETABLE_REVALIDATE_WORKERS', 4))
+
+    # 인기 경로 시간표 예열 (실행 주기 초(0=끔), 오늘부터 며칠, 경로 수, 실행당 외부 API 조회 수, 실행하지 않을 시간대(한국 시간))
+    WARMER_INTERVAL = int(os.environ.get('WARMER_INTERVAL', 1800))
+    WARMER_DAYS = int(os.environ.get('WARMER_DAYS', 3))
+    WARMER_TOP_ROUTES = int(os.environ.get('WARMER_TOP_ROUTES', 30))
+    WARMER_BUDGET = int(os.environ.get('WARMER_BUDGET', 200))
+    WARMER_PEAK_HOURS = os.environ.get('WARMER_PEAK_HOURS', '7-10,17-20')
+
+    # 파드 간 공유 캐시 (redis://host:6379/0, 미설정 시 프로세스 내 메모리 사용)
+    SHARED_CACHE_URL = os.environ.get('SHARED_CACHE_URL')
+    SHARED_CACHE_SERIALIZER = os.environ.get('SHARED_CACHE_SERIALIZER', 'json')
+    SHARED_CACHE_PREFIX = os.environ.get('SHARED_CACHE_PREFIX', 'project07:')
+    SHARED_CACHE_TIMEOUT = float(os.environ.get('SHARED_CACHE_TIMEOUT', 0.25))
+
+    # 열차역 카탈로그 (/api/stations)
+    STATION_CATALOGUE_TTL = int(os.environ.get('STATION_CATALOGUE_TTL', 12 * 3600))
+    STATION_CATALOGUE_REFRESH_INTERVAL = int(os.environ.get('STATION_CATALOGUE_REFRESH_INTERVAL', 6 * 3600))
+    # 이보다 오래된 역 목록은 백그라운드가 아니라 요청 중에 바로 갱신
+    STATION_CATALOGUE_MAX_STALENESS = int(os.environ.get('STATION_CATALOGUE_MAX_STALENESS', 3 * 24 * 3600))
+    STATION_CATALOGUE_SHARED_TTL = int(os.environ.get('STATION_CATALOGUE_SHARED_TTL', 7 * 24 * 3600))
+    STATION_SNAPSHOT_PATH = os.environ.get('STATION_SNAPSHOT_PATH', '/tmp/station_catalogue.json')
+
+    # 열차+버스 동시 조회 (전체 마감 시간, 스레드 수)
+    SEARCH_DEADLINE = float(os.environ.get('SEARCH_DEADLINE', 8))
+    FANOUT_MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', 16))
+    # 즐겨찾기 일괄 검색 (한 번에 검색할 최대 경로 수, 동시 조회 수, 전체 마감 시간)
+    FAVORITE_BATCH_MAX = int(os.environ.get('FAVORITE_BATCH_MAX', 30))
+    FAVORITE_BATCH_CONCURRENCY = int(os.environ.get('FAVORITE_BATCH_CONCURRENCY', 8))
+    FAVORITE_BATCH_DEADLINE = float(os.environ.get('FAVORITE_BATCH_DEADLINE', 10))
+
+    # 외부 API 페이지 조회 (한 페이지 행 수, 최대 페이지 수)
+    UPSTREAM_PAGE_SIZE = int(os.environ.get('UPSTREAM_PAGE_SIZE', 100))
+    UPSTREAM_MAX_PAGES = int(os.environ.get('UPSTREAM_MAX_PAGES', 10))
+
+    # /search_transportation 결과 페이지 크기 (기본, 최대)
+    SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', 50))
+    SEARCH_MAX_PAGE_SIZE = int(os.environ.get('SEARCH_MAX_PAGE_SIZE', 200))
+
+    # Gemini 응답 캐시 (같은 질문 + 같은 생성 설정)
+    GEMINI_CACHE_ENABLED = os.environ.get('GEMINI_CACHE_ENABLED', 'true').lower() == 'true'
+    GEMINI_CACHE_TTL = int(os.environ.get('GEMINI_CACHE_TTL', 6 * 3600))
+    GEMINI_CACHE_MAX_ENTRIES = int(os.environ.get('GEMINI_CACHE_MAX_ENTRIES', 1000))
+    GEMINI_CACHE_MAX_BYTES = int(os.environ.get('GEMINI_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+
+    # 대화 기록 DynamoDB 일괄 저장 (배치 크기, 최대 대기 초, 큐 크기, 재시도 횟수)
+    CHAT_WRITE_BATCH_SIZE = int(os.environ.get('CHAT_WRITE_BATCH_SIZE', 25))
+    CHAT_WRITE_FLUSH_INTERVAL = float(os.environ.get('CHAT_WRITE_FLUSH_INTERVAL', 1.0))
+    CHAT_WRITE_QUEUE_SIZE = int(os.environ.get('CHAT_WRITE_QUEUE_SIZE', 10000))
+    CHAT_WRITE_MAX_RETRIES = int(os.environ.get('CHAT_WRITE_MAX_RETRIES', 5))
+
+    # 대화 기록 목록 (페이지 크기, 최대 페이지 크기, 미리보기 글자 수)
+    CHAT_HISTORY_PAGE_SIZE = int(os.environ.get('CHAT_HISTORY_PAGE_SIZE', 20))
+    CHAT_HISTORY_MAX_PAGE_SIZE = int(os.environ.get('CHAT_HISTORY_MAX_PAGE_SIZE', 100))
+    CHAT_HISTORY_PREVIEW_CHARS = int(os.environ.get('CHAT_HISTORY_PREVIEW_CHARS', 120))
+
+    # 사용자별 최신 대화 목록 캐시 (공유 캐시 서버가 있을 때만 사용)
+    CHAT_HISTORY_CACHE_TTL = int(os.environ.get('CHAT_HISTORY_CACHE_TTL', 300))
+
+    # 메인 배경 이미지 목록 (S3 backgrounds/, 갱신 주기 초)
+    S3_BACKGROUND_PREFIX = os.environ.get('S3_BACKGROUND_PREFIX', 'backgrounds/')
+    BACKGROUND_MANIFEST_REFRESH_INTERVAL = int(os.environ.get('BACKGROUND_MANIFEST_REFRESH_INTERVAL', 600))
+
+    # 헬스/레디니스 체크 (체크 주기, 결과 유효 시간, 체크별 타임아웃, 실패 시 준비 안 됨으로 볼 체크)
+    HEALTH_CHECK_INTERVAL = int(os.environ.get('HEALTH_CHECK_INTERVAL', 15))
+    HEALTH_MAX_STALENESS = int(os.environ.get('HEALTH_MAX_STALENESS', 60))
+    HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 3))
+    READINESS_REQUIRED_CHECKS = [c for c in os.environ.get('READINESS_REQUIRED_CHECKS', 'mysql').split(',') if c]
+
+    # 로그 (레벨, 형식 json/text, 카테고리별 debug/info 샘플링 비율 예: "search=0.1,chatbot=0.05,*=1")
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+    LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', '')
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""여러 외부 조회를 동시에 실행하고 전체 마감 시간 안에 끝난 결과만 모으는 헬퍼
+
+마감 시간을 넘긴 작업은 결과에서 빠지고 timed_out 에 이름이 남는다. 작업 자체는
+백그라운드에서 끝까지 실행되므로(캐시 채우기) 다음 요청은 그 결과를 재사용할 수 있다.
+작업이 많은 요청(즐겨찾기 일괄 검색)은 iter_fan_out 으로 동시 실행 수를 제한하고
+끝나는 대로 결과를 받는다.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """프로세스 공용 스레드 풀 (gunicorn fork 이후 워커별로 생성)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=Config.FANOUT_MAX_WORKERS, thread_name_prefix='fanout')
+    return _executor
+
+
+class DeadlineExceeded(Exception):
+    """iter_fan_out 에서 마감 시간 안에 끝나지 않은 작업의 오류"""
+
+
+class FanOutResult:
+    __slots__ = ('results', 'errors', 'timed_out', 'elapsed')
+
+    def __init__(self, results, errors, timed_out, elapsed):
+        self.results = results
+        self.errors = errors
+        self.timed_out = timed_out
+        self.elapsed = elapsed
+
+
+def fan_out(tasks, deadline=None):
+    """tasks: {이름: 인자 없는 함수}. deadline(초) 안에 끝난 결과만 돌려준다."""
+    deadline = Config.SEARCH_DEADLINE if deadline is None else deadline
+    start = time.monotonic()
+    executor = get_executor()
+    futures = {name: executor.submit(fn) for name, fn in tasks.items()}
+    if futures:
+        wait(futures.values(), timeout=deadline)
+
+    results, errors, timed_out = {}, {}, []
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            timed_out.append(name)
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            errors[name] = e
+    return FanOutResult(results, errors, timed_out, time.monotonic() - start)
+
+
+def iter_fan_out(tasks, deadline=None, max_concurrency=None):
+    """tasks: {이름: 인자 없는 함수} -> 끝나는 순서대로 (이름, 결과, 오류)
+
+    한 번에 max_concurrency 개까지만 스레드 풀에 넣고, 하나가 끝나면 다음 작업을 넣는다.
+    deadline(초)은 전체에 한 번 적용되며, 그때까지 끝나지 않았거나 시작하지 못한 작업은
+    오류 DeadlineExceeded 로 내보낸다(시작하지 못한 작업은 실행하지 않는다).
+    """
+    deadline = Config.SEARCH_DEADLINE if deadline is None else deadline
+    end = time.monotonic() + deadline
+    executor = get_executor()
+    pending = list(tasks.items())[::-1]
+    limit = max_concurrency or len(pending) or 1
+    running = {}
+    while pending or running:
+        while pending and len(running) < limit:
+            name, fn = pending.pop()
+            running[executor.submit(fn)] = name
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            yield name, result, error
+
+    for future, name in running.items():
+        future.cancel()
+        yield name, None, DeadlineExceeded(name)
+    for name, _ in reversed(pending):
+        yield name, None, DeadlineExceeded(name)
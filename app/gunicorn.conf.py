@@ -0,0 +1,31 @@
+"""gunicorn 설정
+
+워커당 동시 요청 수는 gthread 스레드 수다. async 뷰(/async/..., /api/async/...)도 요청이
+끝날 때까지 스레드 하나를 차지하므로 파드당 동시 요청 수는 workers x threads 로 같고,
+비동기 조회는 한 요청 안의 외부 API 대기를 겹치게 할 뿐이다. 값은 환경변수로 조정한다.
+Prometheus 메트릭은 워커가 여러 개이므로 multiprocess 모드로 기록한다(metrics.py).
+"""
+import os
+import shutil
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# 워커 프로세스가 prometheus_client 를 import 하기 전에 설정되어야 하므로 마스터에서 지정
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+
+
+def on_starting(server):
+    # 이전 실행의 워커별 메트릭 파일 제거
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
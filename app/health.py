@@ -0,0 +1,98 @@
+"""헬스/레디니스 체크
+
+/healthz 는 프로세스가 응답하는지만 보고, /readyz 는 백그라운드 스레드가 주기적으로
+실행한 의존성 체크(MySQL, DynamoDB, S3, 외부 API) 결과를 돌려준다. 프로브 요청이
+의존성을 직접 호출하지 않으므로 프로브가 몰려도 DB/외부 API 부하가 늘지 않는다.
+required 로 등록한 체크가 실패했거나 결과가 max_staleness 초보다 오래되면 준비되지
+않은 것으로 본다. 나머지 체크는 degraded 로만 표시한다(샘플/캐시로 응답 가능).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import log
+
+logger = log.get_logger('health')
+
+
+class HealthMonitor:
+    def __init__(self, interval, max_staleness, timeout=3.0, required=()):
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.timeout = timeout
+        self.required = set(required)
+        self._checks = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._executor = None
+
+    def register(self, name, fn):
+        """fn() 이 예외 없이 끝나면 정상. 반환값(dict)은 detail 로 함께 보여준다"""
+        self._checks[name] = fn
+
+    def run_once(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self._checks) * 2 or 1, thread_name_prefix='health')
+        started = time.monotonic()
+        futures = {name: self._executor.submit(self._run_check, fn) for name, fn in self._checks.items()}
+        wait(futures.values(), timeout=self.timeout)
+        now = time.time()
+        for name, future in futures.items():
+            if future.done():
+                result = future.result()
+            else:
+                result = {'ok': False, 'error': f'timeout ({self.timeout}s)', 'latency_ms': round(self.timeout * 1000)}
+            result['checked_at'] = now
+            with self._lock:
+                self._results[name] = result
+        return time.monotonic() - started
+
+    def _run_check(self, fn):
+        start = time.monotonic()
+        try:
+            detail = fn()
+            result = {'ok': True}
+            if detail:
+                result['detail'] = detail
+        except Exception as e:
+            result = {'ok': False, 'error': str(e)[:200]}
+        result['latency_ms'] = round((time.monotonic() - start) * 1000, 1)
+        return result
+
+    def start(self):
+        if self._thread is not None or self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='health-monitor', daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error('체크 실행 오류', error=e)
+            time.sleep(self.interval)
+
+    def status(self):
+        """-> (준비 여부, 체크별 결과). 아직 결과가 없으면 백그라운드 체크 시작 후 한 번 직접 실행"""
+        if not self._results:
+            self.run_once()
+        self.start()
+        now = time.time()
+        ready = True
+        checks = {}
+        with self._lock:
+            results = dict(self._results)
+        for name in self._checks:
+            result = dict(results.get(name) or {'ok': False, 'error': 'not checked'})
+            age = now - result['checked_at'] if 'checked_at' in result else None
+            result['age'] = round(age, 1) if age is not None else None
+            result['stale'] = age is None or age > self.max_staleness
+            result['required'] = name in self.required
+            if result['required'] and (not result['ok'] or result['stale']):
+                ready = False
+            checks[name] = result
+        return ready, checks
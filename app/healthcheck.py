@@ -3,7 +3,8 @@ import sys
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "http://localhost"
 
-endpoints = ["/", "/chatbot"]
+# /healthz: 프로세스 생존, /readyz: 의존성 상태 (503 이면 준비 안 됨)
+endpoints = ["/healthz", "/readyz"]
 
 success = True
 for ep in endpoints:
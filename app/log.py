@@ -0,0 +1,121 @@
+"""구조화 로그 (레벨, 카테고리별 샘플링, 지연 포맷)
+
+log = log.get_logger('search') 로 카테고리별 로거를 얻어 log.debug('event', key=value) 처럼
+이벤트 이름과 필드를 남긴다. 한 줄에 JSON 하나(LOG_FORMAT=json) 또는 사람이 읽는 텍스트로
+stdout 에 쓴다.
+
+- 레벨이 꺼져 있으면 필드를 만들지 않는다. 값 대신 인자 없는 함수를 넘기면 실제로 기록할
+  때만 호출하므로 응답 본문 덤프 같은 비싼 값은 lambda 로 넘긴다.
+- LOG_SAMPLE_RATES 로 카테고리별 debug/info 기록 비율을 줄일 수 있다(warning 이상은 항상 기록).
+"""
+import json
+import logging
+import random
+import sys
+import threading
+
+from config import Config
+
+ROOT = 'service'
+
+_lock = threading.Lock()
+_configured = False
+_sample_rates = {}
+
+
+def parse_sample_rates(spec):
+    """"search=0.1,chatbot=0.01" -> {'search': 0.1, 'chatbot': 0.01} (* 는 기본값)"""
+    rates = {}
+    for part in (spec or '').split(','):
+        name, sep, value = part.partition('=')
+        if not sep:
+            continue
+        try:
+            rates[name.strip()] = min(max(float(value), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'category': record.name.split('.', 1)[-1],
+            'event': record.getMessage(),
+        }
+        data.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        fields = ' '.join(f'{k}={v}' for k, v in getattr(record, 'fields', {}).items())
+        line = f"{record.levelname[0]} [{record.name.split('.', 1)[-1]}] {record.getMessage()} {fields}".rstrip()
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+def configure(level=None, fmt=None, sample_rates=None):
+    """앱 로거 설정 (첫 로그 기록 시 Config 값으로 자동 호출)"""
+    global _configured, _sample_rates
+    with _lock:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter() if (fmt or Config.LOG_FORMAT) == 'json' else TextFormatter())
+        root = logging.getLogger(ROOT)
+        root.handlers[:] = [handler]
+        root.setLevel(str(level or Config.LOG_LEVEL).upper())
+        root.propagate = False
+        _sample_rates = parse_sample_rates(Config.LOG_SAMPLE_RATES if sample_rates is None else sample_rates)
+        _configured = True
+
+
+class Logger:
+    def __init__(self, category):
+        self.category = category
+        self._logger = logging.getLogger(f'{ROOT}.{category}')
+
+    @property
+    def sample_rate(self):
+        return _sample_rates.get(self.category, _sample_rates.get('*', 1.0))
+
+    def enabled(self, level=logging.DEBUG):
+        if not _configured:
+            configure()
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level, event, fields, exc_info=False):
+        if not self.enabled(level):
+            return
+        if level < logging.WARNING:
+            rate = self.sample_rate
+            if rate < 1.0:
+                if random.random() >= rate:
+                    return
+                fields['sample_rate'] = rate
+        fields = {k: (v() if callable(v) else v) for k, v in fields.items()}
+        self._logger.log(level, event, extra={'fields': fields}, exc_info=exc_info)
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """except 블록 안에서 스택 트레이스와 함께 error 로 기록"""
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+def get_logger(category):
+    return Logger(category)
@@ -0,0 +1,195 @@
+"""Prometheus 메트릭 (/metrics)
+
+- 엔드포인트별 요청 수/지연 시간 히스토그램, 처리 중 요청 수
+- 외부 의존성별(TAGO 열차, ExpBus, Gemini, DynamoDB, S3, MySQL) 지연 시간/오류 수
+- 캐시별 적중/실패 수
+
+gunicorn 워커가 여러 개이면 PROMETHEUS_MULTIPROC_DIR 을 지정해 multiprocess 모드로
+동작한다(워커별 파일에 기록하고 /metrics 에서 합산). 디렉터리 초기화와 종료된 워커
+정리는 gunicorn.conf.py 에서 한다.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+# 외부 API 는 수 초 단위까지 보므로 기본 버킷보다 넓게
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30)
+
+REQUESTS = Counter('http_requests_total', 'HTTP 요청 수', ['endpoint', 'method', 'status'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP 요청 처리 시간', ['endpoint', 'method'],
+                            buckets=LATENCY_BUCKETS)
+IN_FLIGHT = Gauge('http_requests_in_flight', '처리 중인 HTTP 요청 수', ['endpoint'], multiprocess_mode='livesum')
+
+DEPENDENCY_LATENCY = Histogram('dependency_request_duration_seconds', '외부 의존성 호출 시간',
+                               ['dependency', 'operation'], buckets=LATENCY_BUCKETS)
+DEPENDENCY_ERRORS = Counter('dependency_errors_total', '외부 의존성 호출 오류 수', ['dependency', 'operation'])
+DEPENDENCY_IN_FLIGHT = Gauge('dependency_requests_in_flight', '진행 중인 외부 의존성 호출 수', ['dependency'],
+                             multiprocess_mode='livesum')
+
+CACHE_REQUESTS = Counter('cache_requests_total', '캐시 조회 수', ['cache', 'result'])
+
+# 서킷 브레이커 상태 (0 closed, 1 half-open, 2 open; 워커 중 가장 나쁜 상태)
+CIRCUIT_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+CIRCUIT_STATE = Gauge('circuit_breaker_state', '서킷 브레이커 상태', ['dependency'], multiprocess_mode='livemax')
+CIRCUIT_TRANSITIONS = Counter('circuit_breaker_transitions_total', '서킷 브레이커 상태 변경 수', ['dependency', 'state'])
+CIRCUIT_REJECTED = Counter('circuit_breaker_rejected_total', '서킷이 열려 호출하지 않은 수', ['dependency'])
+
+# API 키 할당량 (공유 버킷이면 모든 워커/파드 기준, 아니면 마지막으로 기록한 워커 기준)
+QUOTA_TOKENS = Gauge('quota_tokens_remaining', 'API 키 초당 버킷에 남은 토큰', ['dependency'],
+                     multiprocess_mode='livemostrecent')
+QUOTA_DAILY_REMAINING = Gauge('quota_daily_remaining', 'API 키 오늘 남은 호출 수', ['dependency'],
+                              multiprocess_mode='livemostrecent')
+QUOTA_REJECTED = Counter('quota_rejected_total', '할당량 부족으로 호출하지 않은 수', ['dependency', 'priority'])
+
+# upstream URL 경로 -> 의존성 이름
+UPSTREAM_DEPENDENCIES = (
+    ('/TrainInfoService/', 'tago_train'),
+    ('/ExpBusInfoService/', 'expbus'),
+)
+
+
+def upstream_dependency(url):
+    for marker, name in UPSTREAM_DEPENDENCIES:
+        if marker in url:
+            return name
+    return 'upstream_other'
+
+
+def observe_dependency(dependency, operation, elapsed, error=False):
+    DEPENDENCY_LATENCY.labels(dependency, operation).observe(elapsed)
+    if error:
+        DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+
+
+@contextmanager
+def track_dependency(dependency, operation='call'):
+    """with track_dependency('gemini', 'generate_content'): ... (예외는 오류로 집계 후 그대로 전달)"""
+    DEPENDENCY_IN_FLIGHT.labels(dependency).inc()
+    start = time.monotonic()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        DEPENDENCY_IN_FLIGHT.labels(dependency).dec()
+        observe_dependency(dependency, operation, time.monotonic() - start, error)
+
+
+def cache_result(cache, hit):
+    """hit: True(적중) / False(없음) / None(만료된 값 사용, stale)"""
+    CACHE_REQUESTS.labels(cache, 'stale' if hit is None else ('hit' if hit else 'miss')).inc()
+
+
+def circuit_state(dependency, state, changed=True):
+    CIRCUIT_STATE.labels(dependency).set(CIRCUIT_STATES[state])
+    if changed:
+        CIRCUIT_TRANSITIONS.labels(dependency, state).inc()
+
+
+def circuit_rejected(dependency):
+    CIRCUIT_REJECTED.labels(dependency).inc()
+
+
+def quota_remaining(dependency, tokens, daily_remaining=None):
+    QUOTA_TOKENS.labels(dependency).set(tokens)
+    if daily_remaining is not None:
+        QUOTA_DAILY_REMAINING.labels(dependency).set(daily_remaining)
+
+
+def quota_rejected(dependency, priority):
+    QUOTA_REJECTED.labels(dependency, priority).inc()
+
+
+def instrument_boto3(client, dependency):
+    """boto3 클라이언트의 API 호출마다 지연 시간/오류 기록 (botocore 이벤트 훅)"""
+    events = client.meta.events
+
+    # after-call-error 에는 model 이 없으므로 이벤트 이름(after-call.<서비스>.<작업>)에서 작업명을 얻는다
+    def before_call(context, **kwargs):
+        context['metrics_start'] = time.monotonic()
+
+    def after_call(context, event_name, http_response=None, **kwargs):
+        start = context.pop('metrics_start', None)
+        if start is not None:
+            error = http_response is not None and http_response.status_code >= 400
+            observe_dependency(dependency, event_name.rsplit('.', 1)[-1], time.monotonic() - start, error)
+
+    def after_call_error(context, event_name, **kwargs):
+        start = context.pop('metrics_start', None)
+        if start is not None:
+            observe_dependency(dependency, event_name.rsplit('.', 1)[-1], time.monotonic() - start, True)
+
+    events.register('before-call', before_call, unique_id=f'metrics-before-{dependency}')
+    events.register('after-call', after_call, unique_id=f'metrics-after-{dependency}')
+    events.register('after-call-error', after_call_error, unique_id=f'metrics-error-{dependency}')
+
+
+def instrument_sqlalchemy(engine, dependency='mysql'):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_start', []).append(time.monotonic())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_start')
+        if starts:
+            observe_dependency(dependency, 'query', time.monotonic() - starts.pop())
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get('metrics_start') if conn is not None else None
+        elapsed = time.monotonic() - starts.pop() if starts else 0
+        observe_dependency(dependency, 'query', elapsed, True)
+
+
+def init_app(app):
+    """요청마다 엔드포인트 이름(라우트 함수명)으로 요청 수/지연 시간/처리 중 요청 수 기록"""
+    from flask import g, request
+
+    def endpoint_label():
+        return request.endpoint or 'not_found'
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.monotonic()
+        IN_FLIGHT.labels(endpoint_label()).inc()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            endpoint = endpoint_label()
+            IN_FLIGHT.labels(endpoint).dec()
+            REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+            REQUEST_LATENCY.labels(endpoint, request.method).observe(time.monotonic() - start)
+        return response
+
+    @app.teardown_request
+    def _record_error(exc):
+        # 처리되지 않은 예외로 after_request 가 호출되지 않은 경우
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            endpoint = endpoint_label()
+            IN_FLIGHT.labels(endpoint).dec()
+            REQUESTS.labels(endpoint, request.method, '500').inc()
+            REQUEST_LATENCY.labels(endpoint, request.method).observe(time.monotonic() - start)
+
+
+def render():
+    """/metrics 응답 본문과 Content-Type"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    from prometheus_client import REGISTRY
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
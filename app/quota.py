@@ -0,0 +1,239 @@
+"""data.go.kr API 키 호출 할당량 (토큰 버킷)
+
+의존성(tago_train: TAGO_API_KEY, expbus: API_KEY)마다 초당 호출 수를 제한하는 토큰
+버킷과 하루 호출 수 카운터를 둔다. 공유 캐시 서버가 Lua 스크립트를 지원하면 버킷과
+카운터를 서버에 두어 모든 워커/파드가 같은 할당량을 나눠 쓴다. 그렇지 않으면(메모리 백엔드,
+LocalRespServer, 캐시 서버 장애) 프로세스 안에서만 세므로, 전체 한도를 넘지 않도록 초당/일일
+한도를 local_processes(워커 수 x 최대 파드 수)로 나눈 몫만 쓴다. 이때는 파드가 적게 떠 있어도
+각 프로세스가 자기 몫까지만 호출하므로 실제로 쓸 수 있는 할당량이 줄어든다.
+
+호출마다 우선순위가 있다. 기본은 interactive(사용자 검색)이고, 역 목록 갱신이나 API
+테스트처럼 미뤄도 되는 작업은 with quota.background(): 안에서 호출한다. background 호출은
+버킷/일일 할당량이 reserve 비율보다 많이 남아 있을 때만 허용해 남은 몫을 사용자 검색에
+양보한다. 토큰이 없으면 max_wait 초까지 기다리고, 그래도 없거나 일일 할당량을 다 쓰면
+QuotaExceeded 를 던진다(호출하는 쪽은 캐시/샘플 데이터로 응답).
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+
+import log
+import metrics
+import shared_cache
+
+INTERACTIVE, BACKGROUND = 'interactive', 'background'
+
+# data.go.kr 일일 할당량은 한국 시간 자정에 초기화
+KST = timezone(timedelta(hours=9))
+
+logger = log.get_logger('quota')
+
+_priority = ContextVar('quota_priority', default=INTERACTIVE)
+
+# KEYS[1] 버킷(hash: tokens, ts), KEYS[2] 오늘 호출 수
+# ARGV: 초당 토큰, 버킷 크기, 남겨 둘 토큰, 일일 한도(0=무제한), 남겨 둘 일일 호출 수, 카운터 TTL
+# -> {허용(1)/대기(0)/일일 한도 초과(-1), 남은 토큰, 오늘 호출 수, 대기 초}
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local min_tokens = tonumber(ARGV[3])
+local daily_limit = tonumber(ARGV[4])
+local min_daily = tonumber(ARGV[5])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local used = tonumber(redis.call('GET', KEYS[2]) or '0')
+local status = 0
+local wait = 0
+if daily_limit > 0 and daily_limit - used <= min_daily then
+  status = -1
+elseif tokens - 1 < min_tokens then
+  wait = (min_tokens + 1 - tokens) / rate
+else
+  tokens = tokens - 1
+  used = redis.call('INCR', KEYS[2])
+  if used == 1 then redis.call('EXPIRE', KEYS[2], tonumber(ARGV[6])) end
+  status = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {status, tostring(tokens), used, tostring(wait)}
+"""
+
+
+class QuotaExceeded(Exception):
+    """할당량이 없어 호출하지 않음"""
+
+    def __init__(self, name, priority, retry_after, daily=False):
+        reason = 'daily quota exhausted' if daily else 'rate limited'
+        super().__init__(f"{reason}: {name} ({priority}, retry after {retry_after:.1f}s)")
+        self.name = name
+        self.priority = priority
+        self.retry_after = retry_after
+        self.daily = daily
+
+
+@contextmanager
+def background():
+    """이 블록 안의 외부 API 호출은 background 우선순위로 계량"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+def today():
+    return datetime.now(KST).strftime('%Y%m%d')
+
+
+def seconds_until_reset():
+    now = datetime.now(KST)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class TokenBucketQuota:
+    def __init__(self, name, rate, burst=None, daily_limit=0, background_reserve=0.2, max_wait=0.5,
+                 background_max_wait=5.0, local_processes=1):
+        self.name = name
+        self.rate = rate
+        self.burst = burst or rate
+        self.daily_limit = daily_limit
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self.background_max_wait = background_max_wait
+        # 프로세스 안에서만 셀 때 쓰는 몫
+        self.local_processes = max(int(local_processes), 1)
+        self.local_rate = rate / self.local_processes
+        self.local_burst = max(self.burst / self.local_processes, 1.0)
+        self.local_daily_limit = max(daily_limit // self.local_processes, 1) if daily_limit else 0
+        self._lock = threading.Lock()
+        self._tokens = self.local_burst
+        self._ts = time.monotonic()
+        self._day = today()
+        self._used = 0
+        self.shared = False
+        self._local_warned = False
+        self.allowed = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.rejected = {INTERACTIVE: 0, BACKGROUND: 0}
+
+    def _limits(self, priority):
+        """우선순위별 (남겨 둘 토큰, 남겨 둘 일일 호출 수)"""
+        if priority == BACKGROUND:
+            return self.burst * self.background_reserve, int(self.daily_limit * self.background_reserve)
+        return 0, 0
+
+    def try_acquire(self, priority=None):
+        """토큰 하나 사용 시도 -> 대기할 초 (0 이면 사용함). 일일 한도 초과면 QuotaExceeded"""
+        priority = priority or current_priority()
+        min_tokens, min_daily = self._limits(priority)
+        result = shared_cache.backend.eval(
+            TOKEN_BUCKET_SCRIPT,
+            [('quota', self.name, 'bucket'), ('quota', self.name, self._today_key())],
+            [self.rate, self.burst, min_tokens, self.daily_limit, min_daily, int(seconds_until_reset()) + 3600],
+        )
+        if result is not None:
+            self.shared = True
+            status, tokens, used, wait = int(result[0]), float(result[1]), int(result[2]), float(result[3])
+            daily_limit = self.daily_limit
+        else:
+            if self.shared or not self._local_warned:
+                self._local_warned = True
+                logger.warning('공유 할당량을 쓸 수 없어 프로세스별 몫으로 제한', dependency=self.name,
+                               processes=self.local_processes, rate=self.local_rate, daily_limit=self.local_daily_limit)
+            self.shared = False
+            status, tokens, used, wait = self._local_acquire(priority)
+            daily_limit = self.local_daily_limit
+        metrics.quota_remaining(self.name, tokens, daily_limit - used if daily_limit else None)
+        if status == -1:
+            self._reject(priority)
+            raise QuotaExceeded(self.name, priority, seconds_until_reset(), daily=True)
+        if status == 1:
+            self.allowed[priority] += 1
+            return 0
+        return wait
+
+    def _today_key(self):
+        return f'day:{today()}'
+
+    def _local_acquire(self, priority):
+        # 이 프로세스의 몫(local_*) 기준으로 남겨 둘 양도 다시 계산
+        reserve = self.background_reserve if priority == BACKGROUND else 0
+        min_tokens, min_daily = self.local_burst * reserve, int(self.local_daily_limit * reserve)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.local_burst, self._tokens + (now - self._ts) * self.local_rate)
+            self._ts = now
+            day = today()
+            if day != self._day:
+                self._day, self._used = day, 0
+            if self.local_daily_limit and self.local_daily_limit - self._used <= min_daily:
+                return -1, self._tokens, self._used, 0
+            if self._tokens - 1 < min_tokens:
+                return 0, self._tokens, self._used, (min_tokens + 1 - self._tokens) / self.local_rate
+            self._tokens -= 1
+            self._used += 1
+            return 1, self._tokens, self._used, 0
+
+    def _max_wait(self, priority):
+        return self.background_max_wait if priority == BACKGROUND else self.max_wait
+
+    def acquire(self, priority=None):
+        """토큰을 얻을 때까지 최대 max_wait 초 대기 (못 얻으면 QuotaExceeded)"""
+        priority = priority or current_priority()
+        deadline = time.monotonic() + self._max_wait(priority)
+        while True:
+            wait = self.try_acquire(priority)
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                self._reject(priority)
+                raise QuotaExceeded(self.name, priority, wait)
+            time.sleep(wait)
+
+    async def acquire_async(self, priority=None):
+        priority = priority or current_priority()
+        deadline = time.monotonic() + self._max_wait(priority)
+        while True:
+            if shared_cache.backend.is_shared:
+                # 공유 캐시 eval 은 블로킹 네트워크 호출이라 공용 이벤트 루프를 막지 않도록 스레드에서
+                wait = await asyncio.to_thread(self.try_acquire, priority)
+            else:
+                wait = self.try_acquire(priority)
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                self._reject(priority)
+                raise QuotaExceeded(self.name, priority, wait)
+            await asyncio.sleep(wait)
+
+    def _reject(self, priority):
+        self.rejected[priority] += 1
+        metrics.quota_rejected(self.name, priority)
+        logger.debug('할당량 부족으로 호출 생략', dependency=self.name, priority=priority)
+
+    def stats(self):
+        with self._lock:
+            local = {'tokens': round(self._tokens, 2), 'used_today': self._used}
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'daily_limit': self.daily_limit,
+            'shared': self.shared,
+            'local_share': {'processes': self.local_processes, 'rate': round(self.local_rate, 3),
+                            'daily_limit': self.local_daily_limit},
+            'allowed': dict(self.allowed),
+            'rejected': dict(self.rejected),
+            'local': local,
+        }
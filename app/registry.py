@@ -0,0 +1,71 @@
+"""역/터미널 참조 데이터 레지스트리
+
+all_terminal_codes.json 과 KTX 역 코드표를 앱 시작 시 한 번만 읽어 이름 -> ID 색인과
+정렬된 이름 목록을 만들어 둔다. 라우트는 파일을 다시 읽지 않고 여기서 조회한다.
+"""
+import json
+import os
+
+TERMINAL_CODES_PATH = os.path.join(os.path.dirname(__file__), 'all_terminal_codes.json')
+
+# KTX 역 코드 매핑 (실제 TAGO API 역 코드로 업데이트)
+KTX_STATION_CODES = {
+    '서울': 'NAT010000', '용산': 'NAT010032', '노량진': 'NAT010058', '영등포': 'NAT010091',
+    '신도림': 'NAT010106', '청량리': 'NAT130126', '왕십리': 'NAT130104', '옥수': 'NAT130070',
+    '서빙고': 'NAT130036', '광운대': 'NAT130182', '상봉': 'NAT020040', '수서': 'NATH30000',
+    '부산': 'NAT014445', '구포': 'NAT014281', '사상': 'NAT014331', '화명': 'NAT014244',
+    '부전': 'NAT750046', '동래': 'NAT750106', '센텀': 'NAT750161', '신해운대': 'NAT750189',
+    '송정': 'NAT750254', '기장': 'NAT750329', '좌천': 'NAT750412',
+    '대전': 'NAT011668', '서대전': 'NAT030057', '신탄진': 'NAT011524', '흑석리': 'NAT030173',
+    '동대구': 'NAT013271', '대구': 'NAT013239', '서대구': 'NAT013189',
+    '광주송정': 'NAT031857', '광주': 'NAT883012', '서광주': 'NAT882936', '효천': 'NAT882904',
+    '울산(통도사)': 'NATH13717', '북울산': 'NAT750781', '남창': 'NAT750560', '덕하': 'NAT750653',
+    '태화강': 'NAT750726', '효문': 'NAT750760'
+}
+
+
+class PlaceRegistry:
+    def __init__(self, terminals, station_codes):
+        # 원본 순서 유지 (파일 순서에 의존하는 부분 검색용)
+        self.terminals = terminals
+        self._terminal_ids = {}
+        for terminal in terminals:
+            name = terminal['터미널명'].strip()
+            ids = self._terminal_ids.setdefault(name, [])
+            if terminal['터미널ID'] not in ids:
+                ids.append(terminal['터미널ID'])
+        self.terminal_names = sorted(self._terminal_ids)
+        self.terminals_sorted = sorted(terminals, key=lambda t: t['터미널명'])
+
+        self.station_codes = dict(station_codes)
+        # 화면 표시용 역 목록은 코드표 순서(주요 도시별)를 유지
+        self.station_names = list(self.station_codes)
+        self.station_names_sorted = sorted(self.station_codes)
+
+    @classmethod
+    def load(cls, path=TERMINAL_CODES_PATH, station_codes=KTX_STATION_CODES):
+        with open(path, encoding='utf-8') as f:
+            terminals = json.load(f)
+        return cls(terminals, station_codes)
+
+    def terminal_ids(self, name):
+        """터미널명 -> 터미널 ID 목록 (센트럴시티(서울)처럼 여러 개일 수 있음)"""
+        if not name:
+            return []
+        return self._terminal_ids.get(name.strip(), [])
+
+    def terminal_id(self, name):
+        ids = self.terminal_ids(name)
+        return ids[0] if ids else None
+
+    def find_terminal(self, keyword):
+        """이름에 keyword 가 포함된 첫 번째 터미널 (파일 순서)"""
+        return next((t for t in self.terminals if keyword in t['터미널명']), None)
+
+    def station_code(self, name):
+        if not name:
+            return None
+        return self.station_codes.get(name.strip())
+
+
+registry = PlaceRegistry.load()
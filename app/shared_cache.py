@@ -0,0 +1,383 @@
+"""파드/워커 간 공유 캐시 (Redis 프로토콜)
+
+SHARED_CACHE_URL(redis://host:port/db) 이 설정되어 있으면 Redis 호환 서버를 쓰고,
+없거나 redis 패키지가 없으면 프로세스 내 메모리 백엔드로 동작한다. 두 백엔드는
+같은 인터페이스(get/set/add/update/delete/eval/ping)를 가지며 값은 serializer 로 bytes 변환 후
+저장한다. eval 은 Lua 스크립트를 지원하는 서버에서만 동작하고, 그 외에는 None 을 돌려준다.
+update 는 읽고-고쳐-쓰기를 원자적으로 하며(WATCH/MULTI), 트랜잭션을 지원하지 않는 서버에서는
+키를 지워 다음 조회 때 다시 채우게 한다.
+
+캐시 서버 장애는 요청 실패로 이어지지 않도록 조회 실패(miss)로 처리하고,
+일정 시간 동안 서버 호출을 건너뛴다.
+
+로컬 개발/테스트용으로 최소한의 Redis 프로토콜 서버(LocalRespServer)를 포함한다.
+    python shared_cache.py 6379
+"""
+import json
+import pickle
+import socketserver
+import sys
+import threading
+import time
+
+import log
+import metrics
+from cache import TTLCache
+from config import Config
+
+logger = log.get_logger('shared_cache')
+
+try:
+    import redis
+except ImportError:  # 선택 의존성
+    redis = None
+
+
+class JsonSerializer:
+    name = 'json'
+
+    def dumps(self, value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data.decode('utf-8') if isinstance(data, bytes) else data)
+
+
+class PickleSerializer:
+    """신뢰할 수 있는 내부 캐시 서버에서만 사용"""
+    name = 'pickle'
+
+    def dumps(self, value):
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+SERIALIZERS = {
+    'json': JsonSerializer,
+    'pickle': PickleSerializer,
+}
+
+
+class MemoryBackend:
+    """서버가 설정되지 않았을 때 쓰는 프로세스 내 백엔드"""
+    is_shared = False
+
+    def __init__(self, serializer=None, max_entries=10000, max_bytes=64 * 1024 * 1024):
+        self.serializer = serializer or JsonSerializer()
+        self._cache = TTLCache('shared-fallback', ttl=3600, max_entries=max_entries, max_bytes=max_bytes)
+        self._add_lock = threading.Lock()
+
+    def get(self, key):
+        data = self._cache.get(key)
+        return None if data is None else self.serializer.loads(data)
+
+    def set(self, key, value, ttl):
+        self._cache.set(key, self.serializer.dumps(value), ttl=ttl)
+
+    def add(self, key, value, ttl):
+        """키가 없을 때만 저장 -> 저장 여부"""
+        with self._add_lock:
+            if self._cache.get(key) is not None:
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def update(self, key, fn, ttl):
+        """값이 있으면 fn(값) 으로 바꿔 저장 -> 저장한 값 (없거나 fn 이 None 을 돌려주면 None)"""
+        with self._add_lock:
+            current = self.get(key)
+            value = fn(current) if current is not None else None
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+    def eval(self, script, keys, args):
+        return None
+
+    def ping(self):
+        return True
+
+    def stats(self):
+        return dict(self._cache.stats(), backend='memory')
+
+
+class RedisBackend:
+    """Redis 프로토콜 서버 백엔드"""
+    is_shared = True
+
+    def __init__(self, url, serializer=None, prefix='project07:', timeout=0.25, retry_after=30, update_retries=5):
+        self.serializer = serializer or JsonSerializer()
+        self.prefix = prefix
+        self.retry_after = retry_after
+        self.client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._down_until = 0
+        self._scripts = {}
+        self.scripting = True  # EVAL 미지원 서버(LocalRespServer 등)면 False
+        self.transactions = True  # WATCH/MULTI 미지원 서버면 False
+        self.update_retries = update_retries
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key):
+        if isinstance(key, (tuple, list)):
+            key = ':'.join(str(k) for k in key)
+        return self.prefix + key
+
+    def _available(self):
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, e):
+        self.errors += 1
+        self._down_until = time.monotonic() + self.retry_after
+        logger.warning('캐시 서버 오류, 잠시 건너뜀', retry_after=self.retry_after, error=e)
+
+    def get(self, key):
+        if not self._available():
+            return None
+        try:
+            data = self.client.get(self._key(key))
+        except Exception as e:
+            self._failed(e)
+            return None
+        metrics.cache_result('shared', data is not None)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            return self.serializer.loads(data)
+        except Exception:
+            return None
+
+    def set(self, key, value, ttl):
+        if not self._available():
+            return
+        try:
+            self.client.set(self._key(key), self.serializer.dumps(value), ex=max(int(ttl), 1))
+        except Exception as e:
+            self._failed(e)
+
+    def add(self, key, value, ttl):
+        """키가 없을 때만 저장 (SET NX) -> 저장 여부 (서버 장애 시 False)"""
+        if not self._available():
+            return False
+        try:
+            return bool(self.client.set(self._key(key), self.serializer.dumps(value), ex=max(int(ttl), 1), nx=True))
+        except Exception as e:
+            self._failed(e)
+            return False
+
+    def update(self, key, fn, ttl):
+        """값이 있으면 fn(값) 으로 바꿔 저장 (WATCH 로 동시 변경 시 다시 시도) -> 저장한 값 또는 None
+
+        트랜잭션을 지원하지 않는 서버이거나 계속 충돌하면 키를 지워 다음 조회 때 다시 채우게 한다.
+        """
+        if not self._available():
+            return None
+        if not self.transactions:
+            self.delete(key)
+            return None
+        name = self._key(key)
+        try:
+            with self.client.pipeline() as pipe:
+                for _ in range(self.update_retries):
+                    try:
+                        pipe.watch(name)
+                        data = pipe.get(name)
+                        value = fn(self.serializer.loads(data)) if data is not None else None
+                        if value is None:
+                            pipe.unwatch()
+                            return None
+                        pipe.multi()
+                        pipe.set(name, self.serializer.dumps(value), ex=max(int(ttl), 1))
+                        pipe.execute()
+                        return value
+                    except redis.WatchError:
+                        continue
+        except redis.ResponseError as e:
+            self.transactions = False
+            logger.warning('캐시 서버가 트랜잭션을 지원하지 않음', error=e)
+        except Exception as e:
+            self._failed(e)
+            return None
+        self.delete(key)
+        return None
+
+    def delete(self, key):
+        if not self._available():
+            return
+        try:
+            self.client.delete(self._key(key))
+        except Exception as e:
+            self._failed(e)
+
+    def eval(self, script, keys, args):
+        """Lua 스크립트 실행 (EVALSHA, 없으면 EVAL). 서버 장애/미지원이면 None"""
+        if not self.scripting or not self._available():
+            return None
+        try:
+            if script not in self._scripts:
+                self._scripts[script] = self.client.register_script(script)
+            return self._scripts[script](keys=[self._key(k) for k in keys], args=args)
+        except redis.ResponseError as e:
+            # 스크립트를 지원하지 않는 서버: 캐시 조회는 계속 쓰고 스크립트만 사용 중지
+            self.scripting = False
+            logger.warning('캐시 서버가 스크립트를 지원하지 않음', error=e)
+            return None
+        except Exception as e:
+            self._failed(e)
+            return None
+
+    def ping(self):
+        try:
+            return bool(self.client.ping())
+        except Exception:
+            return False
+
+    def stats(self):
+        return {
+            'backend': 'redis',
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'available': self._available(),
+            'scripting': self.scripting,
+            'transactions': self.transactions,
+        }
+
+
+def create_backend(url=None, serializer=None):
+    serializer_cls = SERIALIZERS.get(serializer or Config.SHARED_CACHE_SERIALIZER, JsonSerializer)
+    url = Config.SHARED_CACHE_URL if url is None else url
+    if url and redis is not None:
+        return RedisBackend(
+            url,
+            serializer=serializer_cls(),
+            prefix=Config.SHARED_CACHE_PREFIX,
+            timeout=Config.SHARED_CACHE_TIMEOUT,
+        )
+    if url:
+        logger.warning('redis 패키지가 없어 메모리 백엔드를 사용합니다')
+    return MemoryBackend(serializer=serializer_cls())
+
+
+backend = create_backend()
+
+
+# --- 로컬 개발/테스트용 Redis 프로토콜 서버 -----------------------------------
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _reply(self, value):
+        if value is None:
+            self.wfile.write(b'$-1\r\n')
+        elif isinstance(value, bool):
+            self.wfile.write(b'+OK\r\n' if value else b'$-1\r\n')
+        elif isinstance(value, int):
+            self.wfile.write(b':%d\r\n' % value)
+        elif isinstance(value, Exception):
+            self.wfile.write(b'-ERR %s\r\n' % str(value).encode())
+        elif isinstance(value, str):
+            self.wfile.write(b'+%s\r\n' % value.encode())
+        else:
+            self.wfile.write(b'$%d\r\n%s\r\n' % (len(value), value))
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            try:
+                args = self._read_command()
+            except (ValueError, ConnectionError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            command = args[0].upper()
+            with self.server.lock:
+                self._reply(self.server.execute(command, args[1:], store))
+            self.wfile.flush()
+
+
+class LocalRespServer(socketserver.ThreadingTCPServer):
+    """GET/SET(EX/PX)/DEL/EXISTS/INCRBY/EXPIRE/TTL/PING 만 지원하는 최소 구현"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('127.0.0.1', 6379)):
+        super().__init__(address, _RespHandler)
+        self.store = {}  # key -> (value, expires_at or None)
+        self.lock = threading.Lock()
+
+    def _get(self, store, key):
+        entry = store.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del store[key]
+            return None
+        return entry[0]
+
+    def execute(self, command, args, store):
+        if command == b'PING':
+            return 'PONG'
+        if command in (b'CLIENT', b'SELECT', b'HELLO'):
+            return 'OK'
+        if command == b'GET':
+            return self._get(store, args[0])
+        if command == b'SET':
+            expires_at = None
+            options = [a.upper() for a in args[2:]]
+            for i, option in enumerate(options):
+                if option == b'EX':
+                    expires_at = time.monotonic() + int(args[3 + i])
+                elif option == b'PX':
+                    expires_at = time.monotonic() + int(args[3 + i]) / 1000
+            if b'NX' in options and self._get(store, args[0]) is not None:
+                return None
+            store[args[0]] = (args[1], expires_at)
+            return True
+        if command == b'DEL':
+            return sum(1 for key in args if store.pop(key, None) is not None)
+        if command == b'EXISTS':
+            return sum(1 for key in args if self._get(store, key) is not None)
+        if command in (b'INCR', b'INCRBY'):
+            current = int(self._get(store, args[0]) or 0) + (int(args[1]) if len(args) > 1 else 1)
+            expires_at = store.get(args[0], (None, None))[1]
+            store[args[0]] = (str(current).encode(), expires_at)
+            return current
+        if command == b'EXPIRE':
+            value = self._get(store, args[0])
+            if value is None:
+                return 0
+            store[args[0]] = (value, time.monotonic() + int(args[1]))
+            return 1
+        if command == b'TTL':
+            if self._get(store, args[0]) is None:
+                return -2
+            expires_at = store[args[0]][1]
+            return -1 if expires_at is None else int(expires_at - time.monotonic())
+        return Exception(f"unknown command '{command.decode(errors='replace')}'")
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 6379
+    print(f"로컬 Redis 프로토콜 서버 실행: 127.0.0.1:{port}")
+    LocalRespServer(('127.0.0.1', port)).serve_forever()
@@ -0,0 +1,125 @@
+"""동일 키 동시 호출 병합 (single-flight)
+
+같은 키로 동시에 들어온 호출 중 첫 번째만 실제로 함수를 실행하고, 나머지는
+그 결과(또는 예외)를 기다렸다가 그대로 받는다. 실행이 끝나면 키는 바로 해제되므로
+결과를 오래 보관하는 캐시와는 역할이 다르다.
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'waiters', 'futures')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.futures = []  # 비동기 대기자 (이벤트 루프, Future)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(True)
+
+
+class SingleFlight:
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key):
+        """-> (호출, 직접 실행할지 여부)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.executed += 1
+            return call, True
+
+    def _result(self, key, call, finished):
+        if not finished:
+            raise TimeoutError(f"{self.name}: '{key}' 결과 대기 시간 초과")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _finish(self, key, call):
+        with self._lock:
+            self._calls.pop(key, None)
+            call.event.set()
+            futures, call.futures = call.futures, []
+        for loop, future in futures:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                pass  # 이미 닫힌 루프
+
+    def do(self, key, fn, timeout=None):
+        """key 로 진행 중인 호출이 있으면 그 결과를 기다리고, 없으면 fn() 을 실행"""
+        call, leader = self._join(key)
+        if not leader:
+            return self._result(key, call, call.event.wait(timeout))
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    async def do_async(self, key, fn, timeout=None):
+        """do() 의 비동기 버전 (fn 은 코루틴 함수). 동기 호출과 같은 키를 공유한다
+
+        기다리던 쪽이 마감 시간으로 취소되어도 호출은 끝까지 실행되어 다른 대기자에게 결과를 준다.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            return self._result(key, call, await self._wait_async(call, timeout))
+        return await asyncio.shield(asyncio.ensure_future(self._run_async(key, call, fn)))
+
+    async def _wait_async(self, call, timeout):
+        """스레드를 잡지 않고 호출이 끝나기를 기다림 (_finish 가 Future 를 깨운다) -> 끝났는지 여부"""
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self._lock:
+            if call.event.is_set():
+                return True
+            call.futures.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if waiter in call.futures:
+                    call.futures.remove(waiter)
+
+    async def _run_async(self, key, call, fn):
+        try:
+            call.result = await fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            'name': self.name,
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': in_flight,
+        }
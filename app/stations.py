@@ -0,0 +1,188 @@
+"""열차역 목록 카탈로그 (/api/stations)
+
+도시별 getCtyAcctoTrainSttnList 호출을 동시에 실행해 역 목록을 만들고, 메모리에
+오래(기본 12시간) 보관하며 백그라운드 스레드가 주기적으로 갱신한다. 갱신 결과는
+공유 캐시와 스냅샷 파일에도 저장해 두어, 외부 API 장애나 파드 재시작 시에도
+마지막으로 받은 목록을 내보낸다.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import log
+import quota
+import shared_cache
+import transport
+from config import Config
+
+logger = log.get_logger('stations')
+
+STATION_LIST_URL = 'http://apis.data.go.kr/1613000/TrainInfoService/getCtyAcctoTrainSttnList'
+CITY_CODES = [11, 21, 25, 24, 22, 26]  # 서울, 부산, 대전, 광주, 대구, 울산
+SHARED_KEY = 'stations:catalogue'
+
+
+def fetch_city_stations(city_code):
+    params = {
+        'serviceKey': Config.TAGO_API_KEY,
+        '_type': 'json',
+        'cityCode': city_code
+    }
+    # 목록 갱신은 백그라운드 작업이므로 할당량이 부족하면 사용자 검색에 양보
+    with quota.background():
+        return [
+            {
+                'name': item.get('stationName') or item.get('nodename'),
+                'code': item.get('stationCode') or item.get('nodeid')
+            }
+            for item in transport.ItemPager(STATION_LIST_URL, params)
+        ]
+
+
+class StationCatalogue:
+    def __init__(self, city_codes, ttl, refresh_interval, snapshot_path=None, fallback=None, retry_interval=60,
+                 max_staleness=None):
+        self.city_codes = list(city_codes)
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.snapshot_path = snapshot_path
+        self.fallback = fallback or []
+        self.on_update = None
+        self._by_city = {}
+        self._stations = None
+        self.updated_at = None
+        self.source = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._last_attempt = float('-inf')
+
+    def get(self):
+        """역 목록 반환 (최초 호출 시 적재 후 백그라운드 갱신 시작)"""
+        if self._stations is None:
+            with self._lock:
+                if self._stations is None:
+                    self._initial_load()
+        self.start_background_refresh()
+        age = self.age()
+        expired = age is None or age > self.ttl
+        retry_due = time.monotonic() - self._last_attempt > self.retry_interval
+        if expired and retry_due and not self._refresh_lock.locked():
+            if age is not None and self.max_staleness and age > self.max_staleness:
+                # 허용 나이를 넘은 목록은 이 요청에서 바로 갱신 (실패하면 이전 목록 유지)
+                self.refresh()
+            else:
+                # 만료된(또는 기본값) 목록도 일단 내보내고 갱신은 백그라운드에서
+                threading.Thread(target=self.refresh, daemon=True).start()
+        return self._stations
+
+    def age(self):
+        """마지막 갱신 후 경과 초 (기본 목록이면 None)"""
+        return None if self.updated_at is None else max(time.time() - self.updated_at, 0)
+
+    def _initial_load(self):
+        data = shared_cache.backend.get(SHARED_KEY) or self._read_snapshot()
+        if data and data.get('by_city'):
+            # 오래된 스냅샷이라도 먼저 내보내고, 만료 여부는 get() 에서 판단해 백그라운드 갱신
+            self._apply({int(k): v for k, v in data['by_city'].items()}, data.get('updated_at'), 'snapshot')
+            return
+        if not self.refresh():
+            self._stations = list(self.fallback)
+            self.source = 'fallback'
+
+    def refresh(self):
+        """도시별 역 목록을 동시에 조회해 갱신 (실패한 도시는 이전 목록 유지)"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            self._last_attempt = time.monotonic()
+            by_city = dict(self._by_city)
+            succeeded = 0
+            with ThreadPoolExecutor(max_workers=len(self.city_codes)) as pool:
+                futures = {code: pool.submit(fetch_city_stations, code) for code in self.city_codes}
+                for code, future in futures.items():
+                    try:
+                        stations = future.result()
+                    except Exception as e:
+                        logger.warning('도시 역 목록 조회 오류', city=code, error=e)
+                        continue
+                    if stations:
+                        by_city[code] = stations
+                        succeeded += 1
+            if not succeeded:
+                return False
+            self._apply(by_city, time.time(), 'upstream')
+            self._save(by_city)
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def _apply(self, by_city, updated_at, source):
+        # 중복 제거 (역 이름 기준, 도시 코드 순서 유지)
+        unique = {}
+        for code in self.city_codes:
+            for station in by_city.get(code, []):
+                if station.get('name'):
+                    unique[station['name']] = station
+        self._by_city = by_city
+        self._stations = list(unique.values())
+        self.updated_at = updated_at
+        self.source = source
+        if self.on_update:
+            try:
+                self.on_update(self._stations)
+            except Exception as e:
+                logger.error('on_update 오류', error=e)
+
+    def _save(self, by_city):
+        data = {'by_city': {str(k): v for k, v in by_city.items()}, 'updated_at': self.updated_at}
+        shared_cache.backend.set(SHARED_KEY, data, Config.STATION_CATALOGUE_SHARED_TTL)
+        if not self.snapshot_path:
+            return
+        try:
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.error('스냅샷 저장 오류', error=e)
+
+    def _read_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning('스냅샷 읽기 오류', error=e)
+            return None
+
+    def start_background_refresh(self):
+        if self._thread is not None or self.refresh_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refresh_loop, name='station-catalogue', daemon=True)
+                self._thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error('백그라운드 갱신 오류', error=e)
+
+    def info(self):
+        age = self.age()
+        return {
+            'count': len(self._stations or []),
+            'source': self.source,
+            'updated_at': self.updated_at,
+            'age_seconds': None if age is None else int(age),
+            'stale': age is None or age > self.ttl,
+        }
@@ -0,0 +1,95 @@
+"""역/터미널 이름 자동완성 색인
+
+이름 전체와 초성 문자열을 각각 정렬된 배열로 만들어 두고 bisect 로 접두사 범위를
+찾는다. 색인은 참조 데이터가 바뀔 때만 다시 만들고, 조회는 O(log n + 결과 수)이다.
+"""
+from bisect import bisect_left
+
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_CHOSUNG_SET = set(CHOSUNG)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+
+def normalize(text):
+    return ''.join(text.split()).lower()
+
+
+def to_chosung(text):
+    """'서울경부' -> 'ㅅㅇㄱㅂ' (한글 음절 외 문자는 그대로)"""
+    result = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            result.append(CHOSUNG[(code - _HANGUL_BASE) // 588])
+        else:
+            result.append(ch)
+    return ''.join(result)
+
+
+def is_chosung_query(text):
+    return bool(text) and any(ch in _CHOSUNG_SET for ch in text)
+
+
+def matches_prefix(name, query):
+    """query 의 완성된 음절은 그대로, 초성은 name 의 같은 위치 음절의 초성과 비교 ('서ㅇ' -> 서울 O, 수원 X)"""
+    if len(name) < len(query):
+        return False
+    for q, ch in zip(query, name):
+        if q != ch and (q not in _CHOSUNG_SET or to_chosung(ch) != q):
+            return False
+    return True
+
+
+class PlaceIndex:
+    def __init__(self, places):
+        """places: (이름, 종류) 목록. 종류는 'station' / 'terminal'"""
+        seen = set()
+        entries = []
+        for name, kind in places:
+            if not name or (name, kind) in seen:
+                continue
+            seen.add((name, kind))
+            entries.append((name, kind))
+        self.size = len(entries)
+        self._by_name = sorted((normalize(name), name, kind) for name, kind in entries)
+        self._by_chosung = sorted((to_chosung(normalize(name)), name, kind) for name, kind in entries)
+        self._name_keys = [e[0] for e in self._by_name]
+        self._chosung_keys = [e[0] for e in self._by_chosung]
+
+    def suggest(self, query, kind=None, limit=10):
+        query = normalize(query or '')
+        if not query or limit <= 0:
+            return []
+        mixed = None
+        if is_chosung_query(query):
+            # 'ㅅㅇ', '서ㅇ' 처럼 초성이 섞인 입력은 초성 문자열로 범위를 찾고,
+            # 완성된 음절이 있으면 그 자리는 음절 그대로 일치하는 이름만 남긴다
+            keys, entries, prefix = self._chosung_keys, self._by_chosung, to_chosung(query)
+            if prefix != query:
+                mixed = query
+        else:
+            keys, entries, prefix = self._name_keys, self._by_name, query
+
+        exact, rest = [], []
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            key, name, entry_kind = entries[i]
+            if not key.startswith(prefix):
+                break
+            if kind and entry_kind != kind:
+                continue
+            if mixed and not matches_prefix(normalize(name), mixed):
+                continue
+            (exact if key == prefix else rest).append({'name': name, 'type': entry_kind})
+            if len(exact) >= limit or len(rest) >= limit * 4:
+                break
+        # 정확히 일치하는 이름을 먼저, 나머지는 짧은 이름 순
+        rest.sort(key=lambda s: len(s['name']))
+        return (exact + rest)[:limit]
+
+
+def build_index(registry, extra_stations=()):
+    places = [(name, 'station') for name in registry.station_names]
+    places.extend((name, 'station') for name in extra_stations)
+    places.extend((name, 'terminal') for name in registry.terminal_names)
+    return PlaceIndex(places)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# app/ 의 모듈은 평평한 구조(import shared_cache)이므로 app/ 을 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
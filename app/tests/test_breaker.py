@@ -0,0 +1,67 @@
+"""breaker.CircuitBreaker 상태 전이 테스트"""
+import time
+
+import pytest
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def open_breaker(**kwargs):
+    breaker = CircuitBreaker('test', window=4, min_calls=2, failure_ratio=0.5, slow_call=0, **kwargs)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record(False, 0.01)
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_opens_after_failures_and_rejects():
+    breaker = open_breaker(open_seconds=30)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_success_closes():
+    breaker = open_breaker(open_seconds=0.05)
+    time.sleep(0.06)
+    trial = breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 0.01, trial)
+    assert breaker.state == CLOSED
+
+
+def test_late_call_from_closed_is_not_a_trial():
+    breaker = CircuitBreaker('test', window=4, min_calls=2, failure_ratio=0.5, slow_call=0, open_seconds=0.05)
+    slow = breaker.before_call()
+    assert slow is None
+    for _ in range(2):
+        breaker.record(False, 0.01, breaker.before_call())
+    time.sleep(0.06)
+    trial = breaker.before_call()
+    # closed 때 시작된 느린 호출이 이제 성공해도 서킷을 닫지 않는다
+    breaker.record(True, 0.01, slow)
+    assert breaker.state == HALF_OPEN
+    breaker.record(False, 0.01, trial)
+    assert breaker.state == OPEN
+
+
+def test_half_open_failure_reopens():
+    breaker = open_breaker(open_seconds=0.05)
+    time.sleep(0.06)
+    trial = breaker.before_call()
+    breaker.record(False, 0.01, trial)
+    assert breaker.state == OPEN
+
+
+def test_released_trial_allows_next_call():
+    breaker = open_breaker(open_seconds=0.05)
+    time.sleep(0.06)
+    trial = breaker.before_call()
+    # 시험 호출이 할당량 부족/취소로 나가지 않았으면 자리를 돌려받아 바로 다시 시험할 수 있다
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.release(trial)
+    trial = breaker.before_call()
+    breaker.record(True, 0.01, trial)
+    assert breaker.state == CLOSED
@@ -0,0 +1,54 @@
+"""cache.TTLCache 만료/LRU/바이트 한도 테스트"""
+import time
+
+from cache import TTLCache, estimate_size
+
+
+def test_get_set_and_expiry():
+    cache = TTLCache('test', ttl=0.05)
+    cache.set('k', [1, 2])
+    assert cache.get('k') == [1, 2]
+    time.sleep(0.06)
+    assert cache.get('k') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TTLCache('test', ttl=60, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_limit_evicts_oldest():
+    value = 'x' * 10
+    size = estimate_size(value)
+    cache = TTLCache('test', ttl=60, max_bytes=size * 2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, value)
+    assert len(cache) == 2
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == size * 2
+
+
+def test_oversized_value_replaces_previous():
+    cache = TTLCache('test', ttl=60, max_bytes=100)
+    cache.set('k', [1])
+    cache.set('k', ['x' * 200])
+    assert cache.get('k') is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_stale_entry_until_stale_ttl():
+    cache = TTLCache('test', ttl=0.05, stale_ttl=0.1)
+    cache.set('k', 'v')
+    time.sleep(0.06)
+    assert cache.get('k') is None
+    entry = cache.get_entry('k')
+    assert entry.value == 'v' and not entry.fresh
+    time.sleep(0.1)
+    assert cache.get_entry('k') is None
@@ -0,0 +1,34 @@
+"""chat_history 커서 인코딩/검증 테스트"""
+import pytest
+
+from chat_history import InvalidCursor, decode_cursor, encode_cursor, preview
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({'user_id': 7, 'timestamp': 1700000000})
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 7) == {'user_id': '7', 'timestamp': 1700000000}
+
+
+def test_no_last_key_means_no_cursor():
+    assert encode_cursor(None) is None
+    assert encode_cursor({}) is None
+
+
+def test_cursor_of_other_user_rejected():
+    cursor = encode_cursor({'user_id': '7', 'timestamp': 1700000000})
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 8)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-base64!', 'e30', 'eyJ1c2VyX2lkIjoiNyJ9'])
+def test_malformed_cursor_rejected(cursor):
+    # e30 = {}, eyJ1c2VyX2lkIjoiNyJ9 = {"user_id":"7"}
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 7)
+
+
+def test_preview_truncates():
+    assert preview('abcdef', 3) == ('abc...', True)
+    assert preview('abc', 3) == ('abc', False)
+    assert preview(None, 3) == ('', False)
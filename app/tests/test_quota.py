@@ -0,0 +1,77 @@
+"""quota.TokenBucketQuota 프로세스별 몫 테스트 (공유 캐시 서버 없이 메모리 백엔드)"""
+import asyncio
+import time
+
+import pytest
+
+import quota
+import shared_cache
+from quota import BACKGROUND, INTERACTIVE, QuotaExceeded, TokenBucketQuota
+
+
+@pytest.fixture(autouse=True)
+def memory_backend(monkeypatch):
+    monkeypatch.setattr(shared_cache, 'backend', shared_cache.MemoryBackend())
+
+
+def test_local_limits_divided_by_processes():
+    bucket = TokenBucketQuota('test', rate=30, daily_limit=10000, local_processes=20)
+    assert bucket.local_rate == 1.5
+    assert bucket.local_burst == 1.5
+    assert bucket.local_daily_limit == 500
+    assert bucket.try_acquire(INTERACTIVE) == 0
+    assert bucket.shared is False
+    # 버킷 몫(1.5)을 다 쓰면 기다려야 한다
+    assert bucket.try_acquire(INTERACTIVE) > 0
+
+
+def test_local_daily_limit_enforced():
+    bucket = TokenBucketQuota('test', rate=1000, daily_limit=40, local_processes=20)
+    assert bucket.local_daily_limit == 2
+    bucket.acquire(INTERACTIVE)
+    bucket.acquire(INTERACTIVE)
+    with pytest.raises(QuotaExceeded) as exc:
+        bucket.acquire(INTERACTIVE)
+    assert exc.value.daily
+
+
+def test_background_reserve_uses_local_share():
+    bucket = TokenBucketQuota('test', rate=1000, daily_limit=100, background_reserve=0.2, local_processes=10)
+    # 몫 10건 중 2건은 사용자 검색에 남겨 둔다
+    with quota.background():
+        for _ in range(8):
+            bucket.acquire()
+        with pytest.raises(QuotaExceeded):
+            bucket.acquire()
+    bucket.acquire(INTERACTIVE)
+    assert bucket.stats()['rejected'][BACKGROUND] == 1
+
+
+def test_acquire_async_does_not_block_loop_on_shared_eval(monkeypatch):
+    class SlowSharedBackend(shared_cache.MemoryBackend):
+        is_shared = True
+
+        def eval(self, script, keys, args):
+            time.sleep(0.2)
+            return [1, 1, 1, 0]
+
+    monkeypatch.setattr(shared_cache, 'backend', SlowSharedBackend())
+    bucket = TokenBucketQuota('test', rate=10, daily_limit=100)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def acquire():
+        await asyncio.sleep(0.01)
+        await bucket.acquire_async(INTERACTIVE)
+
+    async def main():
+        await asyncio.gather(ticker(), acquire())
+
+    asyncio.run(main())
+    # eval 이 도는 동안에도 다른 코루틴이 계속 실행된다
+    assert ticks[-1] - ticks[0] < 0.15
+    assert bucket.shared is True
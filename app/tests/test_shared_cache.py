@@ -0,0 +1,165 @@
+"""shared_cache 백엔드 테스트 (RedisBackend 는 LocalRespServer 를 임시 포트로 띄워 사용)"""
+import datetime
+import socket
+import threading
+import time
+
+import pytest
+
+import shared_cache
+from shared_cache import JsonSerializer, LocalRespServer, MemoryBackend, PickleSerializer, RedisBackend
+
+
+def start_server(port=0):
+    server = LocalRespServer(('127.0.0.1', port))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def resp_server():
+    server = start_server()
+    yield server
+    stop_server(server)
+
+
+def redis_backend(server, serializer=None, retry_after=30):
+    host, port = server.server_address
+    return RedisBackend(f'redis://{host}:{port}/0', serializer=serializer, prefix='test:', retry_after=retry_after)
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def backend(request, resp_server):
+    if request.param == 'memory':
+        return MemoryBackend()
+    return redis_backend(resp_server)
+
+
+def test_get_set_delete(backend):
+    assert backend.get('missing') is None
+    backend.set(('timetable', 'train', 'NAT010000'), {'items': [1, 2, 3], '이름': '서울'}, 60)
+    assert backend.get(('timetable', 'train', 'NAT010000')) == {'items': [1, 2, 3], '이름': '서울'}
+    backend.delete(('timetable', 'train', 'NAT010000'))
+    assert backend.get(('timetable', 'train', 'NAT010000')) is None
+
+
+def test_add_only_when_missing(backend):
+    assert backend.add('lock', 'first', 60) is True
+    assert backend.add('lock', 'second', 60) is False
+    assert backend.get('lock') == 'first'
+    backend.delete('lock')
+    assert backend.add('lock', 'third', 60) is True
+
+
+def test_ttl_expiry(backend):
+    backend.set('short', 'value', 1)
+    backend.set('long', 'value', 60)
+    time.sleep(1.2)
+    assert backend.get('short') is None
+    assert backend.get('long') == 'value'
+    # 만료된 키에는 add 가 다시 성공한다
+    assert backend.add('short', 'again', 60) is True
+
+
+def test_update_memory_backend():
+    backend = MemoryBackend()
+    assert backend.update('list', lambda v: v + [1], 60) is None  # 없는 키는 만들지 않는다
+    backend.set('list', [0], 60)
+    assert backend.update('list', lambda v: v + [1], 60) == [0, 1]
+    assert backend.get('list') == [0, 1]
+    assert backend.update('list', lambda v: None, 60) is None
+    assert backend.get('list') == [0, 1]
+
+
+def test_update_memory_backend_concurrent():
+    backend = MemoryBackend()
+    backend.set('list', [], 60)
+    threads = [threading.Thread(target=backend.update, args=('list', lambda v, i=i: v + [i], 60)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(backend.get('list')) == list(range(20))
+
+
+def test_update_without_transactions_deletes_key(resp_server):
+    # LocalRespServer 는 WATCH/MULTI 를 지원하지 않으므로 키를 지워 다음 조회 때 다시 채운다
+    backend = redis_backend(resp_server)
+    backend.set('list', [0], 60)
+    assert backend.update('list', lambda v: v + [1], 60) is None
+    assert backend.transactions is False
+    assert backend.get('list') is None
+    assert backend.errors == 0
+
+
+def test_eval_unsupported_returns_none(backend):
+    assert backend.eval("return 1", ['key'], []) is None
+    if isinstance(backend, RedisBackend):
+        # 스크립트만 사용 중지하고 일반 조회는 계속 쓴다
+        assert backend.scripting is False
+        backend.set('after-eval', 1, 60)
+        assert backend.get('after-eval') == 1
+
+
+@pytest.mark.parametrize('serializer, value', [
+    (JsonSerializer(), {'items': [{'depPlandTime': 20240101073000, 'charge': 34000}], 'stored_at': 1700000000.5,
+                        'name': '센트럴시티(서울)'}),
+    (PickleSerializer(), {'key': ('bus', 'NAEK010', 'NAEK300'), 'at': datetime.datetime(2024, 1, 1, 7, 30)}),
+])
+def test_serializer_round_trip(resp_server, serializer, value):
+    assert serializer.loads(serializer.dumps(value)) == value
+    backend = redis_backend(resp_server, serializer=serializer)
+    backend.set('value', value, 60)
+    assert backend.get('value') == value
+
+
+def test_prefix_and_tuple_keys(resp_server):
+    backend = redis_backend(resp_server)
+    backend.set(('chat_history', 42), [1], 60)
+    assert b'test:chat_history:42' in resp_server.store
+
+
+def test_outage_is_miss_and_skipped_until_retry_after():
+    port = free_port()
+    backend = RedisBackend(f'redis://127.0.0.1:{port}/0', prefix='test:', retry_after=30)
+
+    # 서버가 없으면 예외 대신 miss 로 처리하고 retry_after 동안 호출하지 않는다
+    assert backend.get('key') is None
+    assert backend.errors == 1
+    assert backend.stats()['available'] is False
+    assert backend.add('key', 'value', 60) is False
+    backend.set('key', 'value', 60)
+    backend.delete('key')
+    assert backend.eval("return 1", ['key'], []) is None
+    assert backend.errors == 1
+
+    server = start_server(port)
+    try:
+        # 서버가 돌아와도 retry_after 가 지나기 전에는 건너뛴다
+        assert backend.get('key') is None
+        assert backend.errors == 1
+        assert server.store == {}
+
+        backend._down_until = 0  # retry_after 경과
+        backend.set('key', 'value', 60)
+        assert backend.get('key') == 'value'
+        assert backend.stats()['available'] is True
+    finally:
+        stop_server(server)
+
+
+def test_create_backend_falls_back_to_memory():
+    assert isinstance(shared_cache.create_backend(url=''), MemoryBackend)
+    assert isinstance(shared_cache.create_backend(url='redis://127.0.0.1:1/0'), RedisBackend)
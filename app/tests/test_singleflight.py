@@ -0,0 +1,107 @@
+"""singleflight.SingleFlight 테스트 (동기/비동기 호출이 같은 키를 공유)"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_run_once():
+    flight = SingleFlight('test')
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', load))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ['value'] * 5
+    assert len(calls) == 1
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_async_leader_shared_with_sync_caller():
+    flight = SingleFlight('test')
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 'value'
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do_async('key', load))
+        await asyncio.sleep(0.01)
+        sync_result = await asyncio.to_thread(flight.do, 'key', lambda: 'other')
+        return await leader, sync_result
+
+    assert asyncio.run(main()) == ('value', 'value')
+    assert len(calls) == 1
+
+
+def test_cancelled_async_caller_does_not_cancel_flight():
+    flight = SingleFlight('test')
+    finished = []
+
+    async def load():
+        await asyncio.sleep(0.1)
+        finished.append(1)
+        return 'value'
+
+    async def main():
+        caller = asyncio.ensure_future(flight.do_async('key', load))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.2)
+        return caller.cancelled()
+
+    assert asyncio.run(main()) is True
+    assert finished == [1]
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_async_waiters_do_not_hold_threads():
+    flight = SingleFlight('test')
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do('key', lambda: release.wait() and 'value'), daemon=True)
+    leader.start()
+    time.sleep(0.01)
+
+    async def main():
+        waiters = [asyncio.ensure_future(flight.do_async('key', None)) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        # 대기자는 Future 로만 기다리므로 기본 실행기(asyncio_N) 스레드를 쓰지 않는다
+        executor_threads = [t for t in threading.enumerate() if t.name.startswith('asyncio_')]
+        waiters[0].cancel()
+        release.set()
+        return executor_threads, await asyncio.gather(*waiters[1:])
+
+    try:
+        executor_threads, results = asyncio.run(main())
+    finally:
+        release.set()
+        leader.join()
+    assert executor_threads == []
+    assert results == ['value'] * 19
+
+
+def test_async_waiter_timeout():
+    flight = SingleFlight('test')
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do('key', release.wait), daemon=True)
+    leader.start()
+    time.sleep(0.01)
+    try:
+        with pytest.raises(TimeoutError):
+            asyncio.run(flight.do_async('key', None, timeout=0.05))
+    finally:
+        release.set()
+        leader.join()
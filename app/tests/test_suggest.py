@@ -0,0 +1,41 @@
+"""suggest.PlaceIndex 자동완성 테스트"""
+from suggest import PlaceIndex, matches_prefix, to_chosung
+
+PLACES = [('서울', 'station'), ('수원', 'station'), ('서대전', 'station'), ('동대구', 'station'),
+          ('서울경부', 'terminal'), ('동서울', 'terminal'), ('센트럴시티(서울)', 'terminal')]
+
+
+def names(suggestions):
+    return [s['name'] for s in suggestions]
+
+
+def test_to_chosung():
+    assert to_chosung('서울경부') == 'ㅅㅇㄱㅂ'
+    assert to_chosung('센트럴시티(서울)') == 'ㅅㅌㄹㅅㅌ(ㅅㅇ)'
+
+
+def test_prefix_and_exact_first():
+    index = PlaceIndex(PLACES)
+    assert names(index.suggest('서울')) == ['서울', '서울경부']
+    assert names(index.suggest('서울', kind='terminal')) == ['서울경부']
+    assert index.suggest('') == []
+
+
+def test_chosung_query():
+    index = PlaceIndex(PLACES)
+    assert set(names(index.suggest('ㅅㅇ'))) == {'서울', '수원', '서울경부'}
+    assert names(index.suggest('ㄷㄷㄱ')) == ['동대구']
+
+
+def test_mixed_query_keeps_complete_syllables():
+    index = PlaceIndex(PLACES)
+    # '서ㅇ' 은 첫 음절이 '서' 인 이름만 (수원 제외)
+    assert names(index.suggest('서ㅇ')) == ['서울', '서울경부']
+    assert names(index.suggest('ㄷ서')) == ['동서울']
+    assert index.suggest('수ㄷ') == []
+
+
+def test_matches_prefix():
+    assert matches_prefix('서울', '서ㅇ')
+    assert not matches_prefix('수원', '서ㅇ')
+    assert not matches_prefix('서', '서ㅇ')
@@ -0,0 +1,55 @@
+"""timetable 정규화/정렬/필터/페이지 테스트"""
+from timetable import TimetableRecord, normalize_buses, normalize_trains, parse_minutes, select
+
+
+def records():
+    # (출발, 도착, 요금)
+    rows = [(600, 750, 30000), (420, 560, None), (540, 600, 50000), (1410, 20, 20000)]
+    return [TimetableRecord('train', dep, arr, fare, number=str(i)) for i, (dep, arr, fare) in enumerate(rows)]
+
+
+def numbers(selected):
+    return [r.number for r in selected]
+
+
+def test_parse_minutes_formats():
+    assert parse_minutes(20240101073000) == 450
+    assert parse_minutes('202401011130') == 690
+    assert parse_minutes('07:05') == 425
+    assert parse_minutes('2460') is None
+    assert parse_minutes('') is None
+
+
+def test_normalize_drops_items_without_times():
+    trains = normalize_trains([{'depPlandTime': 20240101073000, 'arrPlandTime': 20240101101500, 'adultcharge': '59800'},
+                               {'depPlandTime': None}])
+    assert len(trains) == 1 and trains[0].fare == 59800 and trains[0].duration == 165
+    buses = normalize_buses([{'depPlandTime': 202401010700, 'arrPlandTime': 202401011130, 'companyNm': '동양고속'}])
+    assert buses[0].operator == '동양고속'
+
+
+def test_sort_keys():
+    assert numbers(select(records())[0]) == ['1', '2', '0', '3']
+    assert numbers(select(records(), sort='arrival')[0]) == ['3', '1', '2', '0']
+    # 요금 정보가 없는 레코드는 뒤로
+    assert numbers(select(records(), sort='fare')[0]) == ['3', '0', '2', '1']
+    # 자정을 넘겨 도착하는 경우 소요 시간은 50분
+    assert numbers(select(records(), sort='duration')[0]) == ['3', '2', '1', '0']
+    assert numbers(select(records(), sort='unknown')[0]) == ['1', '2', '0', '3']
+
+
+def test_filters():
+    selected, total = select(records(), dep_from=500, dep_to=700)
+    assert numbers(selected) == ['2', '0'] and total == 2
+    selected, total = select(records(), max_fare=30000)
+    assert numbers(selected) == ['0', '3'] and total == 2
+
+
+def test_paging():
+    selected, total = select(records(), page=2, page_size=3)
+    assert numbers(selected) == ['3'] and total == 4
+    selected, total = select(records(), page=0, page_size=2)
+    assert numbers(selected) == ['1', '2']
+    assert select(records(), page=3, page_size=2) == ([], 4)
+    # page_size 가 없으면 전체
+    assert len(select(records(), page=2)[0]) == 4
@@ -0,0 +1,144 @@
+"""transport 페이지 조회, 앞부분(limit) 조회 캐시, 만료 목록 재사용(SWR) 테스트"""
+import json
+import threading
+import time
+from itertools import islice
+
+import pytest
+
+import shared_cache
+import transport
+import upstream
+from config import Config
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+        self.text = json.dumps(data)
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """전체 total 건을 pageNo/numOfRows 대로 잘라 주는 가짜 외부 API -> 요청한 pageNo 목록"""
+    requested = []
+    total = 25
+
+    def get(url, params=None, **kwargs):
+        requested.append(params['pageNo'])
+        time.sleep(0.01)
+        size, no = params['numOfRows'], params['pageNo']
+        items = [{'depPlandTime': 20240101060000 + i} for i in range((no - 1) * size, min(no * size, total))]
+        return FakeResponse({'response': {'body': {'items': {'item': items}, 'totalCount': total}}})
+
+    monkeypatch.setattr(upstream, 'get', get)
+    transport.timetable_cache.clear()
+    yield requested
+    transport.timetable_cache.clear()
+
+
+def test_pager_reads_until_last_page(pages):
+    pager = transport.ItemPager('url', {}, page_size=10)
+    assert len(list(pager)) == 25
+    assert pages == [1, 2, 3]
+    assert pager.complete and pager.total_count == 25
+
+
+def test_pager_stops_early(pages):
+    pager = transport.ItemPager('url', {}, page_size=10)
+    assert len(list(islice(pager, 5))) == 5
+    assert pages == [1]
+    assert not pager.complete
+
+
+def test_pager_max_pages(pages):
+    pager = transport.ItemPager('url', {}, page_size=10, max_pages=2)
+    assert len(list(pager)) == 20
+    assert not pager.complete
+
+
+def test_first_items_coalesced_and_cached(pages):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        transport.fetch_train_items('A', 'B', '20240101', limit=3))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [len(r) for r in results] == [3] * 5
+    assert pages == [1]
+    transport.fetch_train_items('A', 'B', '20240101', limit=3)
+    assert pages == [1]
+    # 앞부분만 받았으므로 전체 목록으로는 캐시하지 않는다
+    assert len(transport.fetch_train_items('A', 'B', '20240101')) == 25
+
+
+def test_first_items_complete_stored_as_full_list(pages):
+    assert len(transport.fetch_train_items('A', 'B', '20240101', limit=30)) == 25
+    assert transport.lookup_cached(('train', 'A', 'B', '20240101')) is not transport.MISSING
+
+
+class SharedMemoryBackend(shared_cache.MemoryBackend):
+    is_shared = True
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    """공유 캐시(메모리) + TTL 100초, 빈 결과 10초, max staleness 1000초"""
+    backend = SharedMemoryBackend()
+    monkeypatch.setattr(shared_cache, 'backend', backend)
+    monkeypatch.setattr(Config, 'TIMETABLE_CACHE_TTL', 100)
+    monkeypatch.setattr(Config, 'TIMETABLE_EMPTY_CACHE_TTL', 10)
+    monkeypatch.setattr(Config, 'TIMETABLE_MAX_STALENESS', 1000)
+    transport.timetable_cache.clear()
+    yield backend
+    transport.timetable_cache.clear()
+
+
+def put_shared(backend, key, items, age):
+    backend.set(('timetable',) + key, {'items': items, 'stored_at': time.time() - age}, 3600)
+
+
+@pytest.mark.parametrize('items, age, fresh', [
+    ([1], 50, True),
+    ([1], 500, False),
+    ([1], 1500, None),
+    # 빈 결과는 10초만 신선하지만 max staleness 는 같다
+    ([], 50, False),
+    ([], 1500, None),
+])
+def test_lookup_entry_staleness_bounds(shared, items, age, fresh):
+    key = ('train', 'A', 'B', '20240101')
+    put_shared(shared, key, items, age)
+    entry = transport.lookup_entry(key)
+    if fresh is None:
+        assert entry is None
+    else:
+        assert entry.value == items and entry.fresh is fresh
+        assert transport.lookup_cached(key) == (items if fresh else transport.MISSING)
+
+
+def test_lookup_entry_prefers_newer_shared_copy(shared):
+    key = ('train', 'A', 'B', '20240101')
+    put_shared(shared, key, ['old'], 500)
+    assert transport.lookup_entry(key).value == ['old']
+    put_shared(shared, key, ['new'], 20)
+    entry = transport.lookup_entry(key)
+    assert entry.value == ['new'] and entry.fresh
+
+
+def test_stale_entry_served_and_revalidated_once(shared, monkeypatch):
+    key = ('train', 'A', 'B', '20240101')
+    put_shared(shared, key, ['old'], 500)
+    submitted = []
+    monkeypatch.setattr(transport, 'revalidate', lambda k, loader: submitted.append(k) or True)
+    freshness = transport.Freshness()
+    assert transport.cached_or_stale(key, lambda: ['new'], freshness) == ['old']
+    assert submitted == [key]
+    assert freshness.stale and freshness.revalidating
+    assert freshness.to_dict()['age_seconds'] >= 500
@@ -0,0 +1,27 @@
+"""upstream.response_ok 테스트 (data.go.kr 는 오류를 HTTP 200 + XML 로 보낸다)"""
+import json
+
+import pytest
+
+import upstream
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+@pytest.mark.parametrize('status_code, text, ok', [
+    (200, '{"response": {"header": {"resultCode": "00"}, "body": {}}}', True),
+    (200, '<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg>SERVICE ERROR</errMsg></cmmMsgHeader></OpenAPI_ServiceResponse>', False),
+    (200, '{"error": "unexpected"}', False),
+    (200, '[]', False),
+    (404, 'not found', True),
+    (502, 'bad gateway', False),
+])
+def test_response_ok(status_code, text, ok):
+    assert upstream.response_ok(FakeResponse(status_code, text)) is ok
@@ -0,0 +1,47 @@
+import shared_cache
+import transport
+import warmer
+
+
+class SharedMemoryBackend(shared_cache.MemoryBackend):
+    is_shared = True
+
+
+def make_warmer(budget):
+    routes = [('서울', '부산', 'ktx', 3), ('서울', '대전', 'ktx', 2)]
+    return warmer.CacheWarmer(lambda limit: routes, 60, days=2, budget=budget)
+
+
+def test_budget_counts_upstream_pages(monkeypatch):
+    monkeypatch.setattr(shared_cache, 'backend', SharedMemoryBackend())
+    monkeypatch.setattr(transport, 'timetable_requests',
+                        lambda dep, arr, date, kinds: [(('train', dep, arr, date), 'url', {})])
+    calls = []
+
+    def prefetch(key, url, params, pagers=None):
+        calls.append(key)
+        return 3
+
+    monkeypatch.setattr(transport, 'prefetch', prefetch)
+    summary = make_warmer(budget=5).run_once()
+    assert len(calls) == 2
+    assert summary['pages'] == 6
+    assert summary['stopped'] == 'budget'
+
+
+def test_cached_keys_do_not_use_budget(monkeypatch):
+    monkeypatch.setattr(shared_cache, 'backend', SharedMemoryBackend())
+    monkeypatch.setattr(transport, 'timetable_requests',
+                        lambda dep, arr, date, kinds: [(('train', dep, arr, date), 'url', {})])
+    monkeypatch.setattr(transport, 'prefetch', lambda key, url, params, pagers=None: 0)
+    summary = make_warmer(budget=1).run_once()
+    assert summary['fresh'] == 4
+    assert summary['pages'] == 0
+    assert summary['stopped'] is None
+
+
+def test_disabled_without_shared_backend(monkeypatch):
+    monkeypatch.setattr(shared_cache, 'backend', shared_cache.MemoryBackend())
+    w = make_warmer(budget=5)
+    assert not w._enabled()
+    assert w.stats()['enabled'] is False
@@ -0,0 +1,176 @@
+"""열차/버스 시간표 정규화 레코드
+
+TAGO 열차, ExpBus 버스 item 을 같은 형태(TimetableRecord)로 바꾼 뒤 정렬/필터/페이지
+처리를 하고, 화면용 dict 나 안내 문구는 레코드에서 만든다. 시각은 자정 기준 분(int),
+요금은 원 단위 int 로 두어 숫자로 비교한다.
+"""
+
+SORT_KEYS = ('departure', 'arrival', 'fare', 'duration')
+
+
+def parse_minutes(value):
+    """YYYYMMDDHHMM[SS](int/str) 또는 HHMM / HH:MM -> 자정 기준 분 (알 수 없으면 None)"""
+    if value is None or value == '':
+        return None
+    text = str(value).replace(':', '')
+    if not text.isdigit():
+        return None
+    if len(text) >= 12:
+        hour, minute = int(text[8:10]), int(text[10:12])
+    elif len(text) in (3, 4):
+        hour, minute = int(text[:-2]), int(text[-2:])
+    else:
+        return None
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def format_minutes(minutes):
+    if minutes is None:
+        return ''
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_fare(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TimetableRecord:
+    __slots__ = ('kind', 'dep_min', 'arr_min', 'fare', 'grade', 'operator', 'number', 'dep_place', 'arr_place')
+
+    def __init__(self, kind, dep_min, arr_min, fare=None, grade='', operator='', number='', dep_place='', arr_place=''):
+        self.kind = kind
+        self.dep_min = dep_min
+        self.arr_min = arr_min
+        self.fare = fare
+        self.grade = grade
+        self.operator = operator
+        self.number = number
+        self.dep_place = dep_place
+        self.arr_place = arr_place
+
+    @classmethod
+    def from_train_item(cls, item):
+        # TAGO 응답은 필드명이 camelCase / 소문자로 섞여 온다
+        grade = item.get('trainGradeName') or item.get('traingradename') or 'KTX'
+        return cls(
+            'train',
+            parse_minutes(item.get('depPlandTime') or item.get('depplandtime')),
+            parse_minutes(item.get('arrPlandTime') or item.get('arrplandtime')),
+            fare=parse_fare(item.get('adultCharge') or item.get('adultcharge')),
+            grade=grade,
+            operator='SR' if grade.startswith('SRT') else '코레일',
+            number=str(item.get('trainNo') or item.get('trainno') or ''),
+            dep_place=item.get('depPlaceName') or item.get('depplacename') or '',
+            arr_place=item.get('arrPlaceName') or item.get('arrplacename') or '',
+        )
+
+    @classmethod
+    def from_bus_item(cls, item):
+        return cls(
+            'bus',
+            parse_minutes(item.get('depPlandTime')),
+            parse_minutes(item.get('arrPlandTime')),
+            fare=parse_fare(item.get('charge')),
+            grade=item.get('gradeNm') or '',
+            operator=item.get('companyNm') or '',
+            dep_place=item.get('depPlaceNm') or '',
+            arr_place=item.get('arrPlaceNm') or '',
+        )
+
+    @property
+    def departure_time(self):
+        return format_minutes(self.dep_min)
+
+    @property
+    def arrival_time(self):
+        return format_minutes(self.arr_min)
+
+    @property
+    def duration(self):
+        if self.dep_min is None or self.arr_min is None:
+            return None
+        # 자정을 넘겨 도착하는 경우
+        return (self.arr_min - self.dep_min) % (24 * 60)
+
+    @property
+    def price(self):
+        return f"{self.fare:,}원" if self.fare is not None else '-'
+
+    def to_train_dict(self, departure='', destination=''):
+        return {
+            'type': self.grade,
+            'train_no': self.number,
+            'departure_time': self.departure_time,
+            'arrival_time': self.arrival_time,
+            'departure': self.dep_place or departure,
+            'arrival': self.arr_place or destination,
+            'price': self.price,
+            'fare': self.fare,
+            'departure_minutes': self.dep_min,
+            'duration': self.duration,
+            'operator': self.operator,
+            'available': True,
+            'seat_info': '예약가능'
+        }
+
+    def to_bus_dict(self):
+        return {
+            'company': self.operator,
+            'grade': self.grade,
+            'departure_time': self.departure_time,
+            'arrival_time': self.arrival_time,
+            'price': self.price,
+            'fare': self.fare,
+            'departure_minutes': self.dep_min,
+            'duration': self.duration,
+            'available': True
+        }
+
+    def summary(self):
+        """챗봇/즐겨찾기 안내용 한 줄"""
+        if self.kind == 'train':
+            return f"{self.grade} {self.departure_time}~{self.arrival_time} {self.price}"
+        return f"{self.departure_time}~{self.arrival_time} {self.operator} 버스"
+
+
+def normalize_trains(items):
+    """시각을 알 수 없는 item 은 제외"""
+    records = (TimetableRecord.from_train_item(item) for item in items or [])
+    return [r for r in records if r.dep_min is not None and r.arr_min is not None]
+
+
+def normalize_buses(items):
+    records = (TimetableRecord.from_bus_item(item) for item in items or [])
+    return [r for r in records if r.dep_min is not None and r.arr_min is not None]
+
+
+def _sort_key(sort):
+    if sort == 'arrival':
+        return lambda r: (r.arr_min, r.dep_min)
+    if sort == 'fare':
+        # 요금 정보가 없는 레코드는 뒤로
+        return lambda r: (r.fare is None, r.fare or 0, r.dep_min)
+    if sort == 'duration':
+        return lambda r: (r.duration, r.dep_min)
+    return lambda r: r.dep_min
+
+
+def select(records, dep_from=None, dep_to=None, max_fare=None, sort='departure', page=1, page_size=None):
+    """출발 시각 범위(분)/최대 요금으로 거르고 정렬한 뒤 한 페이지 반환 -> (레코드 목록, 전체 건수)"""
+    if dep_from is not None:
+        records = [r for r in records if r.dep_min >= dep_from]
+    if dep_to is not None:
+        records = [r for r in records if r.dep_min <= dep_to]
+    if max_fare is not None:
+        records = [r for r in records if r.fare is not None and r.fare <= max_fare]
+    records = sorted(records, key=_sort_key(sort if sort in SORT_KEYS else 'departure'))
+    total = len(records)
+    if page_size:
+        start = (max(page, 1) - 1) * page_size
+        records = records[start:start + page_size]
+    return records, total
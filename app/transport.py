@@ -0,0 +1,472 @@
+"""열차(TAGO)/고속버스(ExpBus) 시간표 조회
+
+라우트에서 직접 외부 API 를 부르지 않고 이 모듈의 fetch_* 함수를 사용한다.
+조회 결과(원본 item 목록)는 (교통수단, 출발 ID, 도착 ID, 날짜) 키로 프로세스 내
+캐시에 두고, 공유 캐시 서버가 설정되어 있으면 다른 파드와도 공유한다. 캐시에 없는
+키를 여러 요청이 동시에 찾으면 외부 API 호출은 한 번만 일어난다.
+
+외부 API 는 pageNo/numOfRows 로 나눠 받는다(ItemPager). 전체 목록은 마지막 페이지까지
+받아 캐시하고, 챗봇처럼 앞의 몇 건만 쓰는 호출(limit)은 필요한 만큼만 받는다.
+
+캐시가 만료되어도 저장 후 TIMETABLE_MAX_STALENESS 초 안이면 만료된 목록을 바로 돌려주고
+백그라운드에서 한 번만 다시 조회한다(stale-while-revalidate). 그보다 오래된 목록은 쓰지
+않는다. fetch_* 에 Freshness 를 넘기면 응답에 쓸 데이터 나이를 기록한다.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import fanout
+import log
+import quota
+import shared_cache
+import upstream
+from breaker import CircuitOpenError
+from cache import MISSING, CacheEntry, TTLCache
+from config import Config
+from quota import QuotaExceeded
+from registry import registry
+from singleflight import SingleFlight
+
+logger = log.get_logger('transport')
+
+TRAIN_URL = 'http://apis.data.go.kr/1613000/TrainInfoService/getStrtpntAlocFndTrainInfo'
+BUS_URL = 'http://apis.data.go.kr/1613000/ExpBusInfoService/getStrtpntAlocFndExpbusInfo'
+
+timetable_cache = TTLCache(
+    'timetable',
+    ttl=Config.TIMETABLE_CACHE_TTL,
+    max_entries=Config.TIMETABLE_CACHE_MAX_ENTRIES,
+    max_bytes=Config.TIMETABLE_CACHE_MAX_BYTES,
+    stale_ttl=Config.TIMETABLE_MAX_STALENESS,
+)
+timetable_flight = SingleFlight('timetable')
+
+# 백그라운드 재조회 (워커 프로세스마다 처음 필요할 때 생성)
+_revalidate_executor = None
+_revalidating = set()
+_revalidate_lock = threading.Lock()
+
+
+class Freshness:
+    """조회에 쓰인 캐시 목록 중 가장 오래된 것의 나이 (응답의 data_age)"""
+
+    def __init__(self):
+        self.stored_at = None
+        self.stale = False
+        self.revalidating = False
+        self._lock = threading.Lock()
+
+    def observe(self, stored_at, stale=False, revalidating=False):
+        with self._lock:
+            if self.stored_at is None or stored_at < self.stored_at:
+                self.stored_at = stored_at
+            self.stale = self.stale or stale
+            self.revalidating = self.revalidating or revalidating
+
+    def to_dict(self):
+        age = max(time.time() - self.stored_at, 0) if self.stored_at is not None else 0
+        return {'age_seconds': int(age), 'stale': self.stale, 'revalidating': self.revalidating}
+
+
+class UpstreamError(Exception):
+    """외부 API 가 200 이외의 상태 코드를 반환한 경우"""
+
+    def __init__(self, status_code, text=''):
+        super().__init__(f"upstream status {status_code}")
+        self.status_code = status_code
+        self.text = text
+
+
+def normalize_date(date):
+    """'YYYY-MM-DD' / 'YYYYMMDD' -> 'YYYYMMDD'"""
+    return str(date).replace('-', '')
+
+
+def extract_page(data):
+    """응답 JSON -> (item 목록, 전체 건수)
+
+    결과가 1건이면 item 이 dict 로, 없으면 items 가 빈 문자열로 오는 경우를 여기서 처리한다.
+    """
+    body = data.get('response', {}).get('body', {})
+    if not isinstance(body, dict):
+        return [], None
+    total = body.get('totalCount')
+    total = int(total) if str(total).isdigit() else None
+    items = body.get('items')
+    if not isinstance(items, dict):
+        return [], total
+    item = items.get('item', [])
+    if isinstance(item, dict):
+        return [item], total
+    return item or [], total
+
+
+def extract_items(data):
+    """응답 JSON 에서 item 목록 추출"""
+    return extract_page(data)[0]
+
+
+def page_params(params, page_no, page_size):
+    return dict(params, pageNo=page_no, numOfRows=page_size)
+
+
+def is_last_page(items, total, seen, page_size):
+    """seen: 이 페이지까지 받은 item 수"""
+    return len(items) < page_size or (total is not None and seen >= total)
+
+
+class ItemPager:
+    """pageNo 를 늘려 가며 item 을 하나씩 내보내는 반복자
+
+    다음 페이지는 앞 페이지를 다 소비했을 때만 요청하므로 islice 등으로 일찍 멈추면
+    그 뒤 페이지는 받지 않는다. complete 는 마지막 페이지까지 확인했는지 여부.
+    """
+
+    def __init__(self, url, params, page_size=None, max_pages=None):
+        self.url = url
+        self.params = params
+        self.page_size = page_size or Config.UPSTREAM_PAGE_SIZE
+        self.max_pages = max_pages or Config.UPSTREAM_MAX_PAGES
+        self.pages = 0
+        self.total_count = None
+        self.complete = False
+
+    def __iter__(self):
+        seen = 0
+        for page_no in range(1, self.max_pages + 1):
+            resp = upstream.get(self.url, params=page_params(self.params, page_no, self.page_size))
+            if resp.status_code != 200:
+                raise UpstreamError(resp.status_code, resp.text[:500])
+            items, self.total_count = extract_page(resp.json())
+            self.pages = page_no
+            seen += len(items)
+            # 마지막 페이지 여부는 item 을 내보내기 전에 판단 (도중에 멈춰도 complete 가 맞도록)
+            self.complete = is_last_page(items, self.total_count, seen, self.page_size)
+            yield from items
+            if self.complete:
+                return
+        logger.warning('최대 페이지 수 도달, 이후 결과 생략', max_pages=self.max_pages, operation=self.url.rsplit('/', 1)[-1])
+
+
+def fetch_all_items(url, params):
+    """마지막 페이지까지 받은 전체 item 목록"""
+    return list(ItemPager(url, params))
+
+
+def _ttl(items):
+    # 빈 결과는 짧게만 캐시 (운행 정보가 뒤늦게 등록되는 경우 대비)
+    return Config.TIMETABLE_CACHE_TTL if items else Config.TIMETABLE_EMPTY_CACHE_TTL
+
+
+def _max_staleness(items):
+    return max(Config.TIMETABLE_MAX_STALENESS, _ttl(items))
+
+
+def _store_local(key, items, stored_at):
+    age = max(time.time() - stored_at, 0)
+    fresh_for = max(_ttl(items) - age, 0)
+    stale_for = max(_max_staleness(items) - age - fresh_for, 0)
+    timetable_cache.set(key, items, ttl=fresh_for, stale_ttl=stale_for, stored_at=stored_at)
+
+
+def lookup_entry(key):
+    """프로세스 내 캐시 -> 공유 캐시 순으로 조회 -> CacheEntry (만료됐지만 max staleness 안이면 fresh=False)"""
+    entry = timetable_cache.get_entry(key)
+    if entry is not None and entry.fresh:
+        return entry
+    shared = shared_cache.backend
+    if shared.is_shared:
+        data = shared.get(('timetable',) + key)
+        if isinstance(data, dict) and 'items' in data:
+            items, stored_at = data['items'], data.get('stored_at') or time.time()
+            age = time.time() - stored_at
+            if age <= _max_staleness(items) and (entry is None or stored_at > entry.stored_at):
+                _store_local(key, items, stored_at)
+                entry = CacheEntry(items, stored_at, age <= _ttl(items))
+    return entry
+
+
+def lookup_cached(key):
+    """만료되지 않은 캐시 목록 (없으면 MISSING)"""
+    entry = lookup_entry(key)
+    return entry.value if entry is not None and entry.fresh else MISSING
+
+
+def store(key, items):
+    stored_at = time.time()
+    _store_local(key, items, stored_at)
+    shared = shared_cache.backend
+    if shared.is_shared:
+        shared.set(('timetable',) + key, {'items': items, 'stored_at': stored_at}, _max_staleness(items))
+
+
+def cached_or_stale(key, loader, freshness=None):
+    """캐시 목록 (만료됐으면 그대로 돌려주고 loader 로 백그라운드 재조회). 없으면 MISSING"""
+    entry = lookup_entry(key)
+    if entry is None:
+        return MISSING
+    revalidating = False if entry.fresh else revalidate(key, loader)
+    if freshness is not None:
+        freshness.observe(entry.stored_at, stale=not entry.fresh, revalidating=revalidating)
+    return entry.value
+
+
+def revalidate(key, loader):
+    """key 를 백그라운드에서 다시 조회 (이미 진행 중이면 새로 시작하지 않음) -> 재조회 진행 여부"""
+    global _revalidate_executor
+    with _revalidate_lock:
+        if key in _revalidating:
+            return True
+        if _revalidate_executor is None:
+            _revalidate_executor = ThreadPoolExecutor(
+                max_workers=Config.TIMETABLE_REVALIDATE_WORKERS, thread_name_prefix='revalidate')
+        _revalidating.add(key)
+    _revalidate_executor.submit(_revalidate, key, loader)
+    return True
+
+
+def _revalidate(key, loader):
+    try:
+        # 만료된 목록으로 이미 응답했으므로 할당량이 부족하면 사용자 검색에 양보
+        with quota.background():
+            timetable_flight.do(key, lambda: _refresh(key, loader))
+    except Exception as e:
+        logger.debug('백그라운드 재조회 실패', key=key, error=e)
+    finally:
+        with _revalidate_lock:
+            _revalidating.discard(key)
+
+
+def _refresh(key, loader):
+    items = loader()
+    store(key, items)
+    return items
+
+
+def _cached(key, loader, freshness=None):
+    items = cached_or_stale(key, loader, freshness)
+    if items is not MISSING:
+        return items
+    # 같은 경로/날짜의 동시 요청은 한 번만 외부 API 를 호출하고 결과를 나눠 받는다
+    items = timetable_flight.do(key, lambda: _load(key, loader))
+    if freshness is not None:
+        freshness.observe(time.time())
+    return items
+
+
+def _load(key, loader):
+    items = lookup_cached(key)
+    if items is not MISSING:
+        return items
+    return _refresh(key, loader)
+
+
+def first_key(key, limit):
+    """앞의 limit 건만 담는 캐시 키"""
+    return key + ('first', limit)
+
+
+def fetch_first_items(key, url, params, limit):
+    """앞의 limit 건만 받는다 (전체 결과가 limit 건 이하였으면 key 에 전체 목록으로도 캐시)"""
+    pager = ItemPager(url, params, page_size=limit)
+    items = list(islice(pager, limit))
+    if pager.complete:
+        store(key, items)
+    return items
+
+
+def _first_items(key, url, params, limit, freshness=None):
+    """앞의 limit 건만 필요할 때: 캐시에 전체 목록이 있으면 잘라 쓰고, 없으면 limit 건만 받는다
+
+    앞부분 목록은 first_key 로 따로 캐시하고 동시 요청도 합친다.
+    """
+    items = cached_or_stale(key, lambda: fetch_all_items(url, params), freshness)
+    if items is not MISSING:
+        return items[:limit]
+    return _cached(first_key(key, limit), lambda: fetch_first_items(key, url, params, limit), freshness)
+
+
+def train_params(dep_code, arr_code, date):
+    return {
+        'serviceKey': Config.TAGO_API_KEY,
+        '_type': 'json',
+        'depPlaceId': dep_code,
+        'arrPlaceId': arr_code,
+        'depPlandTime': date
+    }
+
+
+def bus_params(dep_id, arr_id, date):
+    return {
+        'serviceKey': Config.API_KEY,
+        'depTerminalId': dep_id,
+        'arrTerminalId': arr_id,
+        'depPlandTime': date,
+        '_type': 'json'
+    }
+
+
+def fetch_train_items(dep_code, arr_code, date, limit=None, freshness=None):
+    """출/도착역 기반 열차정보 목록 (limit 지정 시 앞의 limit 건)"""
+    date = normalize_date(date)
+    key = ('train', dep_code, arr_code, date)
+    params = train_params(dep_code, arr_code, date)
+    if limit:
+        return _first_items(key, TRAIN_URL, params, limit, freshness)
+    return _cached(key, lambda: fetch_all_items(TRAIN_URL, params), freshness)
+
+
+def fetch_bus_items(dep_id, arr_id, date, limit=None, freshness=None):
+    """출/도착지 기반 고속버스 정보 목록 (limit 지정 시 앞의 limit 건)"""
+    date = normalize_date(date)
+    key = ('bus', dep_id, arr_id, date)
+    params = bus_params(dep_id, arr_id, date)
+    if limit:
+        return _first_items(key, BUS_URL, params, limit, freshness)
+    return _cached(key, lambda: fetch_all_items(BUS_URL, params), freshness)
+
+
+def merge_bus_items(results, limit=None):
+    """터미널 조합별 결과를 출발시각 순으로 합친다"""
+    items = [item for result in results for item in result]
+    if len(results) > 1:
+        items.sort(key=lambda item: str(item.get('depPlandTime', '')))
+    return items[:limit] if limit else items
+
+
+def fetch_bus_items_between(dep_ids, arr_ids, date, limit=None, freshness=None):
+    """터미널 ID 가 여러 개인 이름(센트럴시티(서울) 등)은 모든 조합을 조회해 출발시각 순으로 합친다"""
+    return merge_bus_items([
+        fetch_bus_items(dep_id, arr_id, date, limit, freshness)
+        for dep_id in dep_ids
+        for arr_id in arr_ids
+    ], limit)
+
+
+def timetable_requests(departure, destination, date, kinds=('train', 'bus')):
+    """출발지/도착지 이름 -> 조회할 (캐시 키, URL, 파라미터) 목록 (찾을 수 없는 역/터미널은 제외)"""
+    date = normalize_date(date)
+    requests = []
+    if 'train' in kinds:
+        dep_code, arr_code = registry.station_code(departure), registry.station_code(destination)
+        if dep_code and arr_code:
+            requests.append((('train', dep_code, arr_code, date), TRAIN_URL, train_params(dep_code, arr_code, date)))
+    if 'bus' in kinds:
+        for dep_id in registry.terminal_ids(departure):
+            for arr_id in registry.terminal_ids(destination):
+                requests.append((('bus', dep_id, arr_id, date), BUS_URL, bus_params(dep_id, arr_id, date)))
+    return requests
+
+
+def prefetch(key, url, params, pagers=None):
+    """신선한 캐시 목록이 없으면 받아서 저장 -> 외부 API 에서 받은 페이지 수
+
+    이미 캐시에 있거나 다른 요청이 같은 키를 받는 중이면 0. pagers 목록을 주면 이번에
+    만든 ItemPager 를 담는다(도중에 오류가 나도 호출한 페이지 수를 셀 수 있도록).
+    """
+    if lookup_cached(key) is not MISSING:
+        return 0
+    pagers = [] if pagers is None else pagers
+
+    def loader():
+        pager = ItemPager(url, params)
+        pagers.append(pager)
+        return list(pager)
+
+    timetable_flight.do(key, lambda: _load(key, loader))
+    return sum(pager.pages for pager in pagers)
+
+
+def fetch_train_and_bus(departure, destination, date, deadline=None, limit=None, freshness=None):
+    """출발지/도착지 이름으로 열차와 버스를 동시에 조회 (전체 마감 시간 적용)
+
+    역/터미널로 찾을 수 없는 쪽은 조회하지 않는다. 결과는 fanout.FanOutResult 로
+    results['train'] / results['bus'] 에 item 목록이, 시간 초과된 쪽은 timed_out 에 담긴다.
+    limit 을 주면 각각 앞의 limit 건만 조회한다. freshness 에는 두 결과 중 오래된 쪽 나이가 남는다.
+    """
+    dep_code, arr_code = registry.station_code(departure), registry.station_code(destination)
+    dep_ids, arr_ids = registry.terminal_ids(departure), registry.terminal_ids(destination)
+    tasks = {}
+    if dep_code and arr_code:
+        tasks['train'] = lambda: fetch_train_items(dep_code, arr_code, date, limit, freshness)
+    if dep_ids and arr_ids:
+        tasks['bus'] = lambda: fetch_bus_items_between(dep_ids, arr_ids, date, limit, freshness)
+    result = fanout.fan_out(tasks, deadline)
+    for name, error in result.errors.items():
+        (logger.debug if isinstance(error, (CircuitOpenError, QuotaExceeded)) else logger.warning)('조회 오류', source=name, error=error)
+    if result.timed_out:
+        logger.warning('마감 시간 초과', timed_out=result.timed_out, departure=departure, destination=destination, date=date)
+    return result
+
+
+def fetch_request(key, url, params, freshness=None):
+    """timetable_requests 의 한 항목 조회 (캐시/동시 요청 합치기 적용)"""
+    return _cached(key, lambda: fetch_all_items(url, params), freshness)
+
+
+def fetch_routes(routes, date, deadline=None, max_concurrency=None):
+    """여러 경로(출발지, 도착지)의 열차/버스 조회 -> 경로가 끝나는 대로 (순번, FanOutResult, Freshness)
+
+    경로별 조회(열차 1건, 버스 터미널 조합별)를 한 목록으로 펼쳐 같은 캐시 키는 한 번만
+    조회하고, max_concurrency 개씩 실행한다. deadline 은 전체에 한 번 적용된다.
+    FanOutResult 는 fetch_train_and_bus 와 같은 모양이다(results['train'] / results['bus']).
+    """
+    start = time.monotonic()
+    plans, requests, waiting = [], {}, {}
+    for index, (departure, destination) in enumerate(routes):
+        kinds = {}
+        for key, url, params in timetable_requests(departure, destination, date):
+            kinds.setdefault(key[0], []).append(key)
+            requests.setdefault(key, (url, params))
+            waiting.setdefault(key, set()).add(index)
+        plans.append(kinds)
+
+    remaining = {index: {key for keys in kinds.values() for key in keys} for index, kinds in enumerate(plans)}
+    for index, keys in remaining.items():
+        if not keys:
+            # 역/터미널을 찾을 수 없는 경로는 바로 빈 결과
+            yield index, fanout.FanOutResult({}, {}, [], time.monotonic() - start), Freshness()
+
+    freshness = {key: Freshness() for key in requests}
+    tasks = {
+        key: (lambda key=key, url=url, params=params: fetch_request(key, url, params, freshness[key]))
+        for key, (url, params) in requests.items()
+    }
+    outcomes = {}
+    timed_out = 0
+    for key, items, error in fanout.iter_fan_out(tasks, deadline, max_concurrency):
+        outcomes[key] = (items, error)
+        if isinstance(error, fanout.DeadlineExceeded):
+            timed_out += 1
+        elif error is not None:
+            (logger.debug if isinstance(error, (CircuitOpenError, QuotaExceeded)) else logger.warning)('조회 오류', source=key[0], key=key, error=error)
+        for index in sorted(waiting[key]):
+            remaining[index].discard(key)
+            if not remaining[index]:
+                result, route_freshness = _route_result(plans[index], outcomes, freshness)
+                result.elapsed = time.monotonic() - start
+                yield index, result, route_freshness
+    if timed_out:
+        logger.warning('마감 시간 초과', timed_out=timed_out, requests=len(requests), routes=len(routes), date=date)
+
+
+def _route_result(kinds, outcomes, freshness):
+    """경로 하나의 조회 결과 (버스는 터미널 조합을 합치고, 하나라도 실패하면 그 교통수단은 결과에서 뺀다)"""
+    results, errors, timed_out = {}, {}, []
+    route_freshness = Freshness()
+    for kind, keys in kinds.items():
+        failed = [outcomes[key][1] for key in keys if outcomes[key][1] is not None]
+        if any(isinstance(error, fanout.DeadlineExceeded) for error in failed):
+            timed_out.append(kind)
+        elif failed:
+            errors[kind] = failed[0]
+        else:
+            items = [outcomes[key][0] for key in keys]
+            results[kind] = items[0] if kind == 'train' else merge_bus_items(items)
+            for key in keys:
+                f = freshness[key]
+                if f.stored_at is not None:
+                    route_freshness.observe(f.stored_at, f.stale, f.revalidating)
+    return fanout.FanOutResult(results, errors, timed_out, 0), route_freshness
@@ -0,0 +1,224 @@
+"""외부 API(data.go.kr 등) 호출용 공용 HTTP 클라이언트
+
+프로세스당 하나의 requests.Session 을 두고 호스트별 커넥션 풀과 keep-alive 로
+TCP 연결/DNS 조회를 재사용한다. gunicorn 이 fork 한 뒤 각 워커에서 처음 호출될 때
+세션이 만들어지므로 워커 간에 소켓이 공유되지 않는다.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from breaker import CircuitBreaker
+from config import Config
+from quota import QuotaExceeded, TokenBucketQuota
+
+_session = None
+_session_lock = threading.Lock()
+
+# 호스트별 호출 통계 (커넥션 재사용 여부는 urllib3 풀 카운터로 계산)
+_stats = {}
+_stats_lock = threading.Lock()
+
+# 의존성(tago_train, expbus 등)별 서킷 브레이커
+_breakers = {}
+
+# API 키별 호출 할당량 (의존성 -> (초당 호출 수, 일일 호출 수))
+QUOTA_LIMITS = {
+    'tago_train': (Config.QUOTA_TAGO_RATE, Config.QUOTA_TAGO_DAILY),
+    'expbus': (Config.QUOTA_EXPBUS_RATE, Config.QUOTA_EXPBUS_DAILY),
+}
+_quotas = {}
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=Config.UPSTREAM_POOL_CONNECTIONS,
+        pool_maxsize=Config.UPSTREAM_POOL_MAXSIZE,
+        max_retries=Config.UPSTREAM_MAX_RETRIES,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
+
+def get_session():
+    """프로세스 공용 세션 반환 (최초 호출 시 생성)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def default_timeout():
+    return (Config.UPSTREAM_CONNECT_TIMEOUT, Config.UPSTREAM_READ_TIMEOUT)
+
+
+def record(host, elapsed, error=False):
+    """호스트별 호출 결과 기록 (/readyz 의 외부 API 상태, /api/upstream_stats)"""
+    with _stats_lock:
+        entry = _stats.setdefault(host, {'requests': 0, 'errors': 0, 'total_time': 0.0, 'last_ok': None, 'last_error': None})
+        entry['requests'] += 1
+        entry['total_time'] += elapsed
+        if error:
+            entry['errors'] += 1
+            entry['last_error'] = time.time()
+        else:
+            entry['last_ok'] = time.time()
+
+
+def host_status(host):
+    """실제 호출 결과로 본 호스트 상태 (호출 기록이 없으면 None, 마지막 호출 성공 여부)"""
+    with _stats_lock:
+        entry = _stats.get(host)
+        if entry is None:
+            return None
+        return {
+            'ok': entry['last_error'] is None or (entry['last_ok'] or 0) > entry['last_error'],
+            'last_ok': entry['last_ok'],
+            'last_error': entry['last_error'],
+        }
+
+
+def circuit(dependency):
+    """의존성별 서킷 브레이커 (비활성화 시 None)"""
+    if not Config.CIRCUIT_BREAKER_ENABLED:
+        return None
+    breaker = _breakers.get(dependency)
+    if breaker is None:
+        with _stats_lock:
+            breaker = _breakers.get(dependency)
+            if breaker is None:
+                breaker = _breakers[dependency] = CircuitBreaker(
+                    dependency,
+                    window=Config.CIRCUIT_WINDOW,
+                    min_calls=Config.CIRCUIT_MIN_CALLS,
+                    failure_ratio=Config.CIRCUIT_FAILURE_RATIO,
+                    slow_call=Config.CIRCUIT_SLOW_CALL,
+                    open_seconds=Config.CIRCUIT_OPEN_SECONDS,
+                    half_open_calls=Config.CIRCUIT_HALF_OPEN_CALLS,
+                )
+    return breaker
+
+
+def quota(dependency):
+    """의존성(API 키)별 호출 할당량 (비활성화되었거나 한도가 없는 의존성이면 None)"""
+    if not Config.QUOTA_ENABLED or dependency not in QUOTA_LIMITS:
+        return None
+    bucket = _quotas.get(dependency)
+    if bucket is None:
+        with _stats_lock:
+            bucket = _quotas.get(dependency)
+            if bucket is None:
+                rate, daily_limit = QUOTA_LIMITS[dependency]
+                bucket = _quotas[dependency] = TokenBucketQuota(
+                    dependency,
+                    rate,
+                    daily_limit=daily_limit,
+                    background_reserve=Config.QUOTA_BACKGROUND_RESERVE,
+                    max_wait=Config.QUOTA_MAX_WAIT,
+                    background_max_wait=Config.QUOTA_BACKGROUND_MAX_WAIT,
+                    local_processes=Config.QUOTA_LOCAL_PROCESSES,
+                )
+    return bucket
+
+
+def response_ok(resp):
+    """외부 API 호출 성공 여부 (호스트 통계/서킷 브레이커용)
+
+    data.go.kr 는 게이트웨이/서비스 오류를 HTTP 200 + XML 본문으로 보내므로, 200 응답은
+    본문이 JSON 응답 봉투({"response": {...}})일 때만 성공으로 본다. 4xx 는 요청 쪽 문제라 성공으로 센다.
+    """
+    if resp.status_code >= 500:
+        return False
+    if resp.status_code != 200:
+        return True
+    try:
+        data = resp.json()
+    except ValueError:
+        return False
+    return isinstance(data, dict) and isinstance(data.get('response'), dict)
+
+
+def get(url, params=None, timeout=None, **kwargs):
+    """공용 세션으로 GET 요청 (timeout 미지정 시 설정값 사용)
+
+    서킷이 열려 있으면 breaker.CircuitOpenError, 할당량이 없으면 quota.QuotaExceeded 를
+    던지고 요청하지 않는다.
+    """
+    parts = urlsplit(url)
+    host = parts.netloc
+    dependency, operation = metrics.upstream_dependency(url), parts.path.rsplit('/', 1)[-1]
+    breaker = circuit(dependency)
+    trial = breaker.before_call() if breaker else None
+    bucket = quota(dependency)
+    if bucket:
+        try:
+            bucket.acquire()
+        except QuotaExceeded:
+            # 호출하지 않았으므로 half-open 시험 자리를 잡고 있지 않는다
+            if breaker:
+                breaker.release(trial)
+            raise
+    start = time.monotonic()
+    try:
+        resp = get_session().get(url, params=params, timeout=timeout or default_timeout(), **kwargs)
+    except requests.RequestException:
+        elapsed = time.monotonic() - start
+        record(host, elapsed, error=True)
+        metrics.observe_dependency(dependency, operation, elapsed, error=True)
+        if breaker:
+            breaker.record(False, elapsed, trial)
+        raise
+    elapsed = time.monotonic() - start
+    ok = response_ok(resp)
+    record(host, elapsed, error=not ok)
+    metrics.observe_dependency(dependency, operation, elapsed, error=not ok or resp.status_code >= 400)
+    if breaker:
+        breaker.record(ok, elapsed, trial)
+    return resp
+
+
+def get_stats():
+    """호스트별 요청 수, 새로 연 커넥션 수, 재사용 횟수, 평균 응답 시간"""
+    pools = {}
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            manager = adapter.poolmanager
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{pool.host}:{pool.port}" if pool.port else pool.host
+                pools[host] = {
+                    'connections_opened': pool.num_connections,
+                    'pool_requests': pool.num_requests,
+                    'connections_reused': max(pool.num_requests - pool.num_connections, 0),
+                }
+
+    with _stats_lock:
+        hosts = {}
+        for host, entry in _stats.items():
+            hosts[host] = {
+                'requests': entry['requests'],
+                'errors': entry['errors'],
+                'avg_time_ms': round(entry['total_time'] / entry['requests'] * 1000, 1) if entry['requests'] else 0,
+            }
+
+    total_requests = sum(p['pool_requests'] for p in pools.values())
+    total_reused = sum(p['connections_reused'] for p in pools.values())
+    return {
+        'pool_maxsize': Config.UPSTREAM_POOL_MAXSIZE,
+        'hosts': hosts,
+        'breakers': {name: breaker.stats() for name, breaker in list(_breakers.items())},
+        'quotas': {name: bucket.stats() for name, bucket in list(_quotas.items())},
+        'pools': pools,
+        'reuse_ratio': round(total_reused / total_requests, 3) if total_requests else 0,
+    }
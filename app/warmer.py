@@ -0,0 +1,203 @@
+"""시간표 캐시 예열 (즐겨찾기/검색이 많은 경로)
+
+즐겨찾기(Favorite)에 많이 등록된 경로와 최근 많이 검색된 경로를 모아 오늘부터 days 일
+동안의 열차/버스 시간표를 미리 캐시에 넣는다. 출근 시간대처럼 요청이 몰리는 시간
+(peak_hours, 한국 시간)에는 실행하지 않고, 한 번 실행할 때 외부 API 페이지 요청 수는
+budget 건으로 제한한다(할당량은 background 우선순위로 사용). 이미 신선한 캐시가 있는
+키는 건너뛴다.
+
+공유 캐시 서버가 있을 때만 실행한다. 주기마다 한 워커만 실행하고(SET NX 잠금), 각 워커가
+센 검색 횟수도 서버에 합쳐 모든 파드의 검색을 기준으로 경로를 고른다. 메모리 백엔드면
+잠금과 캐시가 프로세스마다 따로라 워커 수만큼 같은 조회를 반복하게 되므로 예열하지 않는다.
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import log
+import quota
+import shared_cache
+import transport
+from breaker import CircuitOpenError
+
+LOCK_KEY = ('warmer', 'lock')
+SEARCHES_KEY = ('warmer', 'searches')
+SEARCH_DECAY = 0.8  # 주기마다 이전 검색 횟수에 곱해 최근 검색에 가중치
+MAX_TRACKED_ROUTES = 500
+
+TRANSPORT_KINDS = {
+    'ktx': ('train',),
+    'ktx_srt': ('train',),
+    'srt': ('train',),
+    'bus': ('bus',),
+}
+
+logger = log.get_logger('warmer')
+
+
+def parse_hours(spec):
+    """"7-10,17-20" -> {7, 8, 9, 17, 18, 19} (끝 시각 제외)"""
+    hours = set()
+    for part in (spec or '').split(','):
+        start, sep, end = part.strip().partition('-')
+        try:
+            if sep:
+                hours.update(h % 24 for h in range(int(start), int(end)))
+            elif start:
+                hours.add(int(start) % 24)
+        except ValueError:
+            continue
+    return hours
+
+
+class CacheWarmer:
+    def __init__(self, favorite_routes, interval, days=3, top_routes=30, budget=200, peak_hours=(),
+                 search_ttl=7 * 24 * 3600):
+        """favorite_routes(limit) -> [(출발지, 도착지, 교통수단, 즐겨찾기 수), ...]"""
+        self.favorite_routes = favorite_routes
+        self.interval = interval
+        self.days = days
+        self.top_routes = top_routes
+        self.budget = budget
+        self.peak_hours = set(peak_hours)
+        self.search_ttl = search_ttl
+        self._searches = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._skip_logged = False
+        self.runs = 0
+        self.last_run = None
+
+    def record_search(self, departure, destination, transport_type=None):
+        """검색 한 번 기록 (다음 예열 때 경로 순위에 반영)"""
+        if not departure or not destination:
+            return
+        kinds = TRANSPORT_KINDS.get(transport_type, ('train', 'bus'))
+        with self._lock:
+            for kind in kinds:
+                self._searches[(departure.strip(), destination.strip(), kind)] += 1
+
+    def is_peak(self, now=None):
+        now = now or datetime.now(quota.KST)
+        return now.hour in self.peak_hours
+
+    def start(self):
+        if self._thread is not None or self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='cache-warmer', daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            # 워커/파드가 같은 시각에 깨지 않도록 약간씩 어긋나게
+            time.sleep(self.interval * random.uniform(0.9, 1.1))
+            try:
+                self._sync_searches()
+                if self.is_peak() or not self._enabled():
+                    continue
+                if not shared_cache.backend.add(LOCK_KEY, os.getpid(), self.interval * 0.8):
+                    continue
+                self.run_once()
+            except Exception as e:
+                logger.error('예열 실행 오류', error=e)
+
+    def _enabled(self):
+        if shared_cache.backend.is_shared:
+            return True
+        if not self._skip_logged:
+            self._skip_logged = True
+            logger.info('공유 캐시가 없어 예열하지 않음 (SHARED_CACHE_URL 설정 필요)')
+        return False
+
+    def _sync_searches(self, decay=1.0):
+        """이 워커가 센 검색 횟수를 공유 캐시에 합친다 (메모리 백엔드면 프로세스 안에서만 유지)
+
+        워커끼리 읽고-합쳐-쓰기가 겹치면 일부 횟수가 빠질 수 있지만 순위 용도라 허용한다.
+        """
+        with self._lock:
+            local, self._searches = self._searches, Counter()
+        merged = Counter()
+        for entry in shared_cache.backend.get(SEARCHES_KEY) or []:
+            merged[tuple(entry[:3])] = entry[3] * decay
+        merged.update(local)
+        top = [list(route) + [round(count, 2)] for route, count in merged.most_common(MAX_TRACKED_ROUTES) if count >= 0.5]
+        shared_cache.backend.set(SEARCHES_KEY, top, self.search_ttl)
+        return top
+
+    def popular_routes(self):
+        """(출발지, 도착지) -> 조회할 교통수단, 즐겨찾기와 검색 횟수 합으로 상위 top_routes 개"""
+        scores = Counter()
+        kinds = {}
+        for departure, destination, transport_type, count in self.favorite_routes(self.top_routes):
+            route = (departure.strip(), destination.strip())
+            scores[route] += count
+            kinds.setdefault(route, set()).update(TRANSPORT_KINDS.get(transport_type, ('train', 'bus')))
+        for departure, destination, kind, count in shared_cache.backend.get(SEARCHES_KEY) or []:
+            route = (departure, destination)
+            scores[route] += count
+            kinds.setdefault(route, set()).add(kind)
+        return [(route, kinds[route]) for route, _ in scores.most_common(self.top_routes)]
+
+    def run_once(self):
+        """인기 경로 x 날짜 시간표를 외부 API 페이지 budget 건까지 미리 조회 -> 실행 결과
+
+        budget 은 키를 조회하기 전에 확인하므로 마지막 키의 페이지 수만큼 넘을 수 있다
+        (목록을 중간에 끊으면 불완전한 시간표가 캐시되므로).
+        """
+        started = time.monotonic()
+        summary = {'routes': 0, 'keys': 0, 'fetched': 0, 'fresh': 0, 'errors': 0, 'pages': 0, 'stopped': None}
+        routes = self.popular_routes()
+        # 순위를 정한 뒤 이전 검색 횟수를 줄여 최근 검색이 더 반영되도록
+        self._sync_searches(decay=SEARCH_DECAY)
+        summary['routes'] = len(routes)
+        today = datetime.now(quota.KST).date()
+        # 가까운 날짜부터 (모든 경로의 오늘 -> 모든 경로의 내일 ...)
+        for offset in range(self.days):
+            date = (today + timedelta(days=offset)).strftime('%Y%m%d')
+            for (departure, destination), kinds in routes:
+                for key, url, params in transport.timetable_requests(departure, destination, date, kinds):
+                    if summary['pages'] >= self.budget:
+                        summary['stopped'] = 'budget'
+                        return self._finish(summary, started)
+                    summary['keys'] += 1
+                    pagers = []
+                    try:
+                        with quota.background():
+                            pages = transport.prefetch(key, url, params, pagers)
+                    except (quota.QuotaExceeded, CircuitOpenError) as e:
+                        # 할당량 부족/외부 API 장애: 남은 예열은 다음 주기로
+                        summary['pages'] += sum(pager.pages for pager in pagers)
+                        summary['stopped'] = type(e).__name__
+                        return self._finish(summary, started)
+                    except Exception as e:
+                        # 실패한 페이지 요청도 할당량을 쓰므로 함께 센다
+                        summary['errors'] += 1
+                        summary['pages'] += sum(pager.pages for pager in pagers) + 1
+                        logger.warning('예열 조회 오류', key=key, error=e)
+                        continue
+                    summary['pages'] += pages
+                    summary['fetched' if pages else 'fresh'] += 1
+        return self._finish(summary, started)
+
+    def _finish(self, summary, started):
+        summary['seconds'] = round(time.monotonic() - started, 2)
+        self.runs += 1
+        self.last_run = dict(summary, at=time.time())
+        logger.info('캐시 예열 완료', **summary)
+        return summary
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._searches)
+        return {
+            'runs': self.runs,
+            'last_run': self.last_run,
+            'pending_searches': pending,
+            'peak_now': self.is_peak(),
+            'enabled': shared_cache.backend.is_shared,
+        }